@@ -1,6 +1,7 @@
 # gui.py (PySide6 Version)
 
 import os
+import queue
 import sys
 import datetime
 
@@ -28,6 +29,7 @@ from PySide6.QtWidgets import (
 
 from src.app_controller import AppController
 from src.utils.config_manager import ConfigManager
+from src.utils.log_channel import INFO, WARNING, to_event
 
 
 class SkillWidget(QFrame):
@@ -120,14 +122,21 @@ class App(QMainWindow):
         self.setGeometry(100, 100, 1200, 700)
 
         self.config_manager = ConfigManager('config.yaml')
-        self.controller = AppController(self.config_manager.config_path)
+        engine_config = self.config_manager.get("engine", {}) or {}
+        self.controller = AppController(self.config_manager.config_path, engine_config)
         self.current_strategy_path = None
         self.current_strategy = {}
 
         self.setup_ui()
         self.load_strategy_from_config()
         self.process_log_queue()
-        self.process_yolo_data_queue()
+        self._detection_version = 0
+        self.process_detection_slot()
+        # 窗口显示后、事件循环空闲时再在后台预热/预加载，不推迟窗口的出现
+        if engine_config.get("prewarm", False):
+            QTimer.singleShot(0, self.controller.prewarm_engine)
+        elif engine_config.get("preload", False):
+            QTimer.singleShot(0, self.controller.preload_engine_modules)
 
     def setup_ui(self):
         main_widget = QWidget()
@@ -238,7 +247,7 @@ class App(QMainWindow):
             self.strategy_path_entry.setText(strategy_path)
             self.load_strategy_file(strategy_path)
         else:
-            self.log(f"警告: 默认策略文件 '{strategy_path}' 未找到。")
+            self.log(f"警告: 默认策略文件 '{strategy_path}' 未找到。", WARNING)
             QMessageBox.warning(
                 self, "未找到策略", f"无法找到默认策略文件: '{strategy_path}'\n\n将为您创建一个新的空策略。"
             )
@@ -290,6 +299,8 @@ class App(QMainWindow):
             self.strategy_path_entry.setText(save_path)
             QMessageBox.information(self, "成功", f"策略已成功保存到: {save_path}")
             self.log(f"策略已保存到: {save_path}")
+            if self.controller.reload_strategy(save_path):
+                self.log("已通知运行中的引擎重新加载策略。")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"保存策略文件失败: {e}")
 
@@ -331,31 +342,45 @@ class App(QMainWindow):
         self.stop_button.setEnabled(False)
         self.debug_checkbox.setEnabled(True)
 
-    def log(self, message):
-        self.controller.log(message)
+    def log(self, message, level=INFO):
+        self.controller.log(level, message)
 
     def process_log_queue(self):
         log_queue = self.controller.get_log_queue()
         try:
-            while not log_queue.empty():
-                message = log_queue.get_nowait()
-                if isinstance(message, dict) and message.get("type") == "debug_step":
-                    self.handle_debug_step(message)
-                else:
-                    self.log_textbox.append(str(message))
+            # 每个周期只取一项: 引擎发来的是一批日志（列表），GUI 进程自己的日志是单条
+            try:
+                item = log_queue.get_nowait()
+            except queue.Empty:
+                return
+            lines = []
+            for event in map(to_event, item if isinstance(item, list) else [item]):
+                if event.data is None:
+                    lines.append(event.message)
+                    continue
+                if lines:
+                    self.log_textbox.append("\n".join(lines))
+                    lines = []
+                if event.data.get("type") == "debug_step":
+                    self.handle_debug_step(event.data)
+            if lines:
+                self.log_textbox.append("\n".join(lines))
         finally:
             QTimer.singleShot(100, self.process_log_queue)
 
-    def process_yolo_data_queue(self):
-        yolo_data_queue = self.controller.get_yolo_data_queue()
+    def process_detection_slot(self):
+        detection_slot = self.controller.get_detection_slot()
         try:
-            while not yolo_data_queue.empty():
-                labels = yolo_data_queue.get_nowait()
+            # 只读取共享内存中的最新检测结果，没有新数据时什么也不做
+            snapshot = detection_slot.read(self._detection_version)
+            if snapshot is not None:
+                self._detection_version = snapshot.version
+                labels = detection_slot.labels_of(snapshot.detections)
                 current_time = datetime.datetime.now().strftime("%H:%M:%S")
-                text_to_set = f'[{current_time}] {", ".join(labels) or "无识别目标"}'
+                text_to_set = f'[{current_time}] #{snapshot.frame_seq} {", ".join(labels) or "无识别目标"}'
                 self.yolo_textbox.setText(text_to_set)
         finally:
-            QTimer.singleShot(100, self.process_yolo_data_queue)
+            QTimer.singleShot(100, self.process_detection_slot)
 
     def handle_debug_step(self, debug_data):
         spell = debug_data.get('spell')
@@ -368,16 +393,12 @@ class App(QMainWindow):
         msg_box.button(QMessageBox.No).setText('跳过')
         reply = msg_box.exec()
 
-        command_queue = self.controller.get_command_queue()
-        if reply == QMessageBox.Yes:
-            command_queue.put('execute')
-        else:
-            command_queue.put('skip')
+        self.controller.send_command('step' if reply == QMessageBox.Yes else 'skip')
 
     def closeEvent(self, event):
         reply = QMessageBox.question(self, "退出", "您确定要退出吗？", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.stop_automation()
+            self.controller.shutdown_engine()
             event.accept()
         else:
             event.ignore()
@@ -0,0 +1,85 @@
+"""
+截图后端微基准测试：对比 PIL ImageGrab 与 MIT-SHM (XShmGetImage) 的帧率和延迟。
+
+用法:
+    python scripts/bench_capture.py --xvfb                       # 启动一个临时 Xvfb 显示进行测试
+    python scripts/bench_capture.py --display :0 --region 0 1000 800 1080
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.implementations.frame_sources import ImageGrabFrameSource
+from src.implementations.xshm_source import XShmFrameSource
+
+
+def run_benchmark(frame_source, frames, warmup=5):
+    """连续截图 frames 次，返回每次截图的耗时（秒）。"""
+    buffer = np.empty(frame_source.get_frame_shape(), dtype=np.uint8)
+    for _ in range(warmup):
+        frame_source.read_into(buffer)
+
+    timings = np.empty(frames, dtype=np.float64)
+    for i in range(frames):
+        started = time.perf_counter()
+        frame_source.read_into(buffer)
+        timings[i] = time.perf_counter() - started
+    return timings
+
+
+def report(name, timings):
+    p50, p99 = np.percentile(timings, [50, 99]) * 1000
+    fps = len(timings) / timings.sum()
+    print(f"{name:<10} {fps:>9.1f} fps   p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms")
+
+
+def start_xvfb(display, resolution):
+    if not shutil.which('Xvfb'):
+        raise RuntimeError("未找到 Xvfb，请先安装 (例如 apt install xvfb)。")
+    process = subprocess.Popen(['Xvfb', display, '-screen', '0', f'{resolution}x24', '-nolisten', 'tcp'])
+    time.sleep(1)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="截图后端微基准测试")
+    parser.add_argument('--display', default=os.environ.get('DISPLAY', ':99'))
+    parser.add_argument('--region', type=int, nargs=4, metavar=('X1', 'Y1', 'X2', 'Y2'), default=None)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--xvfb', action='store_true', help="在 --display 上启动一个临时 Xvfb")
+    parser.add_argument('--resolution', default='1920x1080', help="Xvfb 的分辨率")
+    args = parser.parse_args()
+
+    xvfb = start_xvfb(args.display, args.resolution) if args.xvfb else None
+    os.environ['DISPLAY'] = args.display
+    try:
+        region = args.region
+        print(f"显示: {args.display}  区域: {region or '全屏'}  帧数: {args.frames}")
+        for name, factory in (
+            ('imagegrab', lambda: ImageGrabFrameSource({}, region)),
+            ('xshm', lambda: XShmFrameSource({'display': args.display}, region)),
+        ):
+            try:
+                frame_source = factory()
+            except Exception as e:
+                print(f"{name:<10} 无法初始化: {e}")
+                continue
+            try:
+                report(name, run_benchmark(frame_source, args.frames))
+            finally:
+                frame_source.cleanup()
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+
+
+if __name__ == '__main__':
+    main()
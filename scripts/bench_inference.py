@@ -0,0 +1,64 @@
+"""
+推理后端基准测试：在同一段回放画面上比较不同模型/后端的单帧延迟。
+
+用法:
+    python scripts/bench_inference.py sessions/frost_mage.wowcap \\
+        runs/detect/train/weights/best.pt runs/detect/train/weights/best.onnx \\
+        runs/detect/train/weights/best_openvino_model --frames 200 --threads 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.implementations.yolo_detector import get_skill_detector
+from src.utils.frame_recording import FrameRecording
+
+
+def run_benchmark(detector, frames, count, warmup=5):
+    """对前 count 帧（不足时循环）逐帧推理，返回每帧的耗时（秒）和检测总数。"""
+    for i in range(warmup):
+        detector.detect(frames[i % len(frames)])
+
+    timings = np.empty(count, dtype=np.float64)
+    detections = 0
+    for i in range(count):
+        frame = frames[i % len(frames)]
+        started = time.perf_counter()
+        detections += len(detector.detect(frame))
+        timings[i] = time.perf_counter() - started
+    return timings, detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推理后端基准测试")
+    parser.add_argument('recording', help="scripts/record_frames.py 录制的录像文件")
+    parser.add_argument('models', nargs='+', help="要比较的模型路径 (.pt / .onnx / *_openvino_model)")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=0, help="ONNX Runtime / OpenVINO 的 intra-op 线程数，0 为默认")
+    args = parser.parse_args()
+
+    recording = FrameRecording(args.recording)
+    # 先把帧读进内存，避免把磁盘读取计入推理延迟
+    frames = np.ascontiguousarray(recording.frames[:args.frames])
+    print(f"录像: {args.recording}  帧尺寸: {recording.frame_shape}  帧数: {args.frames}")
+
+    for model_path in args.models:
+        config = {'yolo_model_path': model_path, 'yolo_inference': {'intra_op_threads': args.threads}}
+        try:
+            detector = get_skill_detector(config)
+        except Exception as e:
+            print(f"{model_path}: 无法加载 ({e})")
+            continue
+        timings, detections = run_benchmark(detector, frames, args.frames)
+        mean, p50, p99 = timings.mean() * 1000, *(np.percentile(timings, [50, 99]) * 1000)
+        print(f"{model_path:<50} mean {mean:7.2f} ms   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   "
+              f"{1000 / mean:6.1f} fps   检测数 {detections}")
+
+
+if __name__ == '__main__':
+    main()
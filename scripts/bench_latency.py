@@ -0,0 +1,113 @@
+"""
+端到端延迟基准：用回放的录像驱动完整的引擎（截图 → 推理 → 决策 → 按键），报告各阶段延迟的 p50/p95/p99。
+
+同一段录像、同一份配置下的结果可以重复，适合作为延迟的回归指标。默认不发送真实按键（keystroke_sender 使用 null），
+引擎的调度和计时不受影响。
+
+用法:
+    python scripts/bench_latency.py sessions/frost_mage.wowcap --seconds 60
+    python scripts/bench_latency.py sessions/frost_mage.wowcap --speed 1 --json latency.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.app_controller import AppController
+from src.engine.automation_loop import LATENCY_STAGES
+from src.utils.log_channel import to_event
+
+
+def _events(log_queue, timeout):
+    """在 timeout 秒内逐条取出日志事件。"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            item = log_queue.get(timeout=0.05)
+        except Exception:
+            continue
+        for event in map(to_event, item if isinstance(item, list) else [item]):
+            yield event
+
+
+def wait_for_message(controller, prefix, timeout):
+    for event in _events(controller.get_log_queue(), timeout):
+        if event.message.startswith("错误") or "发生错误" in event.message:
+            print(event.message)
+        if event.message.startswith(prefix):
+            return True
+        if not controller.is_engine_running():
+            return False
+    return False
+
+
+def request_report(controller, reset, timeout=10):
+    controller.request_latency_report(reset)
+    for event in _events(controller.get_log_queue(), timeout):
+        if event.data and event.data.get('type') == 'latency_report':
+            return event.data['stages']
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端延迟基准")
+    parser.add_argument('recording', help="scripts/record_frames.py 录制的录像文件或截图目录")
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--mode', default='single_target')
+    parser.add_argument('--speed', type=float, default=1.0, help="回放速度，1 为实时（与游戏中的帧率一致）")
+    parser.add_argument('--warmup', type=float, default=5.0, help="开始统计之前运行的秒数")
+    parser.add_argument('--seconds', type=float, default=30.0, help="统计的秒数")
+    parser.add_argument('--send-keys', action='store_true', help="发送真实按键（默认不发送）")
+    parser.add_argument('--json', help="把结果写入 JSON 文件，便于比较")
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config['frame_source'] = dict(config.get('frame_source') or {}, type='replay', path=args.recording, speed=args.speed, loop=True)
+    if not args.send_keys:
+        config['keystroke_sender'] = dict(config.get('keystroke_sender') or {}, type='null')
+
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', dir='.', delete=False, encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+        config_path = f.name
+
+    controller = AppController(config_path, config.get('engine', {}) or {})
+    try:
+        controller.start_engine(False)
+        if not wait_for_message(controller, "自动化引擎已启动", 120):
+            print("引擎未能启动")
+            return 1
+        controller.send_command({"type": "mode", "mode": args.mode})
+        time.sleep(args.warmup)
+        request_report(controller, reset=True)
+        print(f"统计 {args.seconds:.0f} 秒...")
+        time.sleep(args.seconds)
+        stages = request_report(controller, reset=False)
+        if stages is None:
+            print("没有收到引擎的延迟报告")
+            return 1
+    finally:
+        controller.shutdown_engine()
+        os.remove(config_path)
+
+    print(f"{'阶段':8s} {'次数':>8s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'最大':>9s}  (ms)")
+    for stage, summary in stages.items():
+        if summary['count']:
+            print(f"{LATENCY_STAGES[stage]:8s} {summary['count']:8d} {summary['p50']:9.2f} {summary['p95']:9.2f} "
+                  f"{summary['p99']:9.2f} {summary['max']:9.2f}")
+        else:
+            print(f"{LATENCY_STAGES[stage]:8s} {0:8d}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'recording': args.recording, 'speed': args.speed, 'stages': stages}, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
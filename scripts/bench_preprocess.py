@@ -0,0 +1,82 @@
+"""
+预处理基准测试：比较旧的 PIL -> NumPy -> letterbox -> 转置 -> 归一化 的逐帧分配路径，
+与 LetterboxPreprocessor 写入常驻输入张量的路径，输出每帧耗时和每帧新分配的内存。
+
+用法:
+    python scripts/bench_preprocess.py [--width 2560 --height 1440] [--imgsz 640] [--frames 200]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.letterbox import LetterboxPreprocessor
+
+
+def legacy_preprocess(image, input_shape):
+    """模拟 ultralytics 对 PIL 输入的预处理：每一步都会分配新的数组"""
+    frame = np.asarray(image)[..., ::-1]  # PIL RGB -> BGR
+    height, width = input_shape
+    scale = min(height / frame.shape[0], width / frame.shape[1])
+    new_w, new_h = round(frame.shape[1] * scale), round(frame.shape[0] * scale)
+    resized = cv2.resize(np.ascontiguousarray(frame), (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    left, top = (width - new_w) // 2, (height - new_h) // 2
+    padded = cv2.copyMakeBorder(resized, top, height - new_h - top, left, width - new_w - left,
+                                cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    tensor = np.ascontiguousarray(np.stack([padded])[..., ::-1].transpose(0, 3, 1, 2))
+    return tensor.astype(np.float32) / 255.0
+
+
+def measure(preprocess, frames, count):
+    """返回 (每帧平均耗时 ms, 每帧平均分配字节数)"""
+    preprocess(frames[0])  # 预热，让常驻缓冲区在计时前分配好
+
+    started = time.perf_counter()
+    for i in range(count):
+        preprocess(frames[i % len(frames)])
+    elapsed = (time.perf_counter() - started) * 1000 / count
+
+    # NumPy 的数据缓冲区会登记到 tracemalloc，累加每帧的峰值即为每帧新分配的内存
+    tracemalloc.start()
+    allocated = 0
+    for i in range(count):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        preprocess(frames[i % len(frames)])
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, allocated / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预处理基准测试")
+    parser.add_argument('--width', type=int, default=2560)
+    parser.add_argument('--height', type=int, default=1440)
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+    images = [Image.fromarray(frame[..., ::-1]) for frame in frames]
+    input_shape = (args.imgsz, args.imgsz)
+    preprocessor = LetterboxPreprocessor(input_shape)
+
+    print(f"帧尺寸: {args.width}x{args.height}  输入尺寸: {args.imgsz}  帧数: {args.frames}")
+    for name, preprocess, inputs in (
+        ('PIL + 逐帧分配', lambda image: legacy_preprocess(image, input_shape), images),
+        ('LetterboxPreprocessor', preprocessor, frames),
+    ):
+        elapsed, allocated = measure(preprocess, inputs, args.frames)
+        print(f"{name:<24} {elapsed:7.2f} ms/帧   每帧分配 {allocated / 1024:10.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+条件规则基准测试：随机生成不同数量的带条件优先级规则，测量每帧评估整套规则的耗时。
+
+评估时所有技能都设为可用、所有条件都不成立，使每条规则的条件都会被求值（最坏情况）。
+
+用法:
+    python scripts/bench_rules.py [--skills 60] [--rules 1 10 50 100 500] [--frames 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.strategy_compiler import compile_strategy, mask_to_bits
+from src.utils.detections import SkillClassTable
+
+
+def random_condition(rng, skills, depth=2):
+    if depth == 0 or rng.random() < 0.3:
+        return f"{rng.choice(['ready', 'cooldown', 'detected'])}({rng.choice(skills)})"
+    operator = rng.choice(['and', 'or', 'not'])
+    if operator == 'not':
+        return f"not {random_condition(rng, skills, depth - 1)}"
+    return f"({random_condition(rng, skills, depth - 1)} {operator} {random_condition(rng, skills, depth - 1)})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="条件规则基准测试")
+    parser.add_argument('--skills', type=int, default=60)
+    parser.add_argument('--rules', type=int, nargs='+', default=[1, 10, 50, 100, 500])
+    parser.add_argument('--frames', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    skills = [f"skill_{i}" for i in range(args.skills)]
+    class_table = SkillClassTable([f"{skill}_{state}" for skill in skills for state in ('ready', 'cooldown')])
+    np_rng = np.random.default_rng(0)
+    states = [
+        (mask_to_bits(np.ones(args.skills, dtype=bool)),
+         mask_to_bits(np_rng.random(args.skills) < 0.5),
+         mask_to_bits(np_rng.random(args.skills) < 0.5))
+        for _ in range(64)
+    ]
+
+    print(f"技能数: {args.skills}  每组帧数: {args.frames}")
+    for count in args.rules:
+        # 每条条件都与 false 相与：所有规则的条件都会被求值但都不命中，即扫描整个列表的最坏情况
+        priority = [{'name': rng.choice(skills), 'key': '1',
+                     'condition': f"({random_condition(rng, skills)}) and false"}
+                    for _ in range(count)]
+        compiled = compile_strategy({'single_target_priority': priority}, class_table)
+
+        started = time.perf_counter()
+        for i in range(args.frames):
+            compiled.pick('single_target', *states[i % len(states)])
+        elapsed = (time.perf_counter() - started) / args.frames * 1e6
+        print(f"规则数 {count:5d}: 每帧 {elapsed:8.2f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+启动耗时基准：测量打开主窗口和引擎给出第一次检测结果的耗时，比较不同的进程启动方式。
+
+子命令:
+    window   在新的解释器中导入 gui 并显示主窗口，测量从启动解释器到窗口显示的耗时，
+             同时列出窗口显示时已经导入的重量级模块（应为空）
+    engine   启动引擎并切换模式，测量到引擎就绪（模型加载完成）和第一次检测结果的耗时
+
+用法:
+    python scripts/bench_startup.py window --runs 5 --offscreen
+    python scripts/bench_startup.py engine --start-method spawn --runs 3
+    python scripts/bench_startup.py engine --start-method forkserver --preload --idle 15 --runs 3
+
+使用 forkserver 时，第一次启动引擎会先启动 forkserver 并导入 preload_modules；
+--preload 模拟界面在空闲时提前完成这一步（--idle 为界面空闲的秒数），之后每次启动引擎都直接从 forkserver fork。
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src.utils.log_channel import ERROR, to_event
+
+HEAVY_MODULES = ('torch', 'ultralytics', 'cv2', 'onnxruntime', 'pynput')
+
+
+def window_child(args):
+    started = time.perf_counter()
+    from PySide6.QtWidgets import QApplication
+    import gui
+    imported = time.perf_counter()
+    app = QApplication(sys.argv)
+    window = gui.App()
+    window.show()
+    app.processEvents()
+    shown = time.perf_counter()
+    heavy = ",".join(name for name in HEAVY_MODULES if name in sys.modules) or "-"
+    print(f"ready {(imported - started) * 1000:.1f} {(shown - imported) * 1000:.1f} {heavy}", flush=True)
+    # 直接退出，不经过 closeEvent 的确认对话框
+    os._exit(0)
+
+
+def window(args):
+    env = dict(os.environ)
+    if args.offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+    for run in range(args.runs):
+        started = time.perf_counter()
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), '_window'], cwd=ROOT, env=env,
+                                 stdout=subprocess.PIPE, text=True)
+        line = ""
+        for line in child.stdout:
+            if line.startswith("ready"):
+                break
+        elapsed = (time.perf_counter() - started) * 1000
+        child.wait()
+        if not line.startswith("ready"):
+            print(f"第 {run + 1} 次: 窗口未能显示（退出码 {child.returncode}）")
+            continue
+        _, import_ms, show_ms, heavy = line.split()
+        print(f"第 {run + 1} 次: 窗口显示 {elapsed:7.1f} ms（导入 gui {import_ms} ms，创建并显示窗口 {show_ms} ms）"
+              f"  已导入的重量级模块: {heavy}")
+
+
+def _events(log_queue):
+    while not log_queue.empty():
+        item = log_queue.get()
+        for event in map(to_event, item if isinstance(item, list) else [item]):
+            if event.message:
+                yield event
+
+
+def _measure_engine(controller, mode, timeout):
+    """启动（或恢复）引擎，返回 (就绪耗时, 第一次检测耗时)，单位毫秒，未达到的为 None。"""
+    log_queue = controller.get_log_queue()
+    slot = controller.get_detection_slot()
+    after_version = slot.read().version if slot.read() else 0
+    ready = first = None
+
+    started = time.perf_counter()
+    controller.start_engine(False)
+    controller.send_command({"type": "mode", "mode": mode})
+    while time.perf_counter() - started < timeout:
+        for event in _events(log_queue):
+            if ready is None and event.message.startswith("自动化引擎已启动"):
+                ready = (time.perf_counter() - started) * 1000
+            elif event.level >= ERROR:
+                print(f"    {event.message}")
+        if slot.read(after_version) is not None:
+            first = (time.perf_counter() - started) * 1000
+            break
+        if not controller.is_engine_running():
+            break
+        time.sleep(0.001)
+    return ready, first
+
+
+def engine(args):
+    import multiprocessing
+    from src.app_controller import AppController
+    from src.utils.config_manager import ConfigManager
+
+    engine_config = dict(ConfigManager(args.config).get('engine', {}) or {})
+    if args.start_method:
+        engine_config['start_method'] = args.start_method
+    controller = AppController(args.config, engine_config)
+    print(f"启动方式: {multiprocessing.get_start_method()}")
+
+    if args.preload:
+        if controller.preload_engine_modules():
+            print(f"已在后台预加载 {', '.join(controller.preload_modules)}，等待 {args.idle:.0f} 秒（模拟界面空闲）")
+            time.sleep(args.idle)
+        else:
+            print("预加载只支持 forkserver 启动方式，忽略 --preload")
+
+    format_ms = lambda value: f"{value:8.1f} ms" if value is not None else "    未达到"
+    for run in range(args.runs):
+        ready, first = _measure_engine(controller, args.mode, args.timeout)
+        print(f"第 {run + 1} 次: 引擎就绪 {format_ms(ready)}  第一次检测 {format_ms(first)}")
+        controller.shutdown_engine()
+        # 清掉关闭时的日志，不计入下一次
+        list(_events(controller.get_log_queue()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    window_parser = subparsers.add_parser('window', help="测量打开主窗口的耗时")
+    window_parser.add_argument('--runs', type=int, default=3)
+    window_parser.add_argument('--offscreen', action='store_true', help="使用 Qt 的 offscreen 平台（无显示器时）")
+    window_parser.set_defaults(func=window)
+
+    subparsers.add_parser('_window').set_defaults(func=window_child)
+
+    engine_parser = subparsers.add_parser('engine', help="测量引擎第一次检测的耗时")
+    engine_parser.add_argument('--config', default='config.yaml')
+    engine_parser.add_argument('--start-method', choices=['spawn', 'forkserver', 'fork'])
+    engine_parser.add_argument('--preload', action='store_true', help="先在后台预加载 forkserver（仅 forkserver）")
+    engine_parser.add_argument('--idle', type=float, default=15.0, help="预加载后等待的秒数")
+    engine_parser.add_argument('--mode', default='single_target', help="切换到的模式，有模式时引擎才会发布检测结果")
+    engine_parser.add_argument('--runs', type=int, default=3)
+    engine_parser.add_argument('--timeout', type=float, default=60.0)
+    engine_parser.set_defaults(func=engine)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+技能栏 ROI 校准：在整屏截图上运行一次 YOLO，把每个技能槽位的位置按当前分辨率保存到 config.yaml。
+
+校准完成后（且 screen_capture_region 为 null 时），引擎只截取和分析这些槽位的外接区域。
+请在所有技能图标都显示在技能栏上时运行。
+
+用法:
+    python scripts/calibrate_action_bar.py [--delay 5] [--padding 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.action_bar_calibrator import ActionBarCalibrator
+from src.implementations.frame_sources import get_frame_source
+from src.implementations.yolo_detector import get_skill_detector
+from src.utils.config_manager import ConfigManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="技能栏 ROI 校准")
+    parser.add_argument('--delay', type=float, default=5.0, help="截图前的等待时间（秒），用于切换到游戏窗口")
+    parser.add_argument('--padding', type=int, default=4, help="外接区域四周额外保留的像素")
+    parser.add_argument('--config', default='config.yaml')
+    args = parser.parse_args()
+
+    config_manager = ConfigManager(args.config)
+    config = config_manager.get_config()
+
+    detector = get_skill_detector(config)
+    # 校准始终在整屏上进行
+    frame_source = get_frame_source(dict(config, screen_capture_region=None))
+    screen_size = frame_source.get_screen_size()
+    if not screen_size:
+        print("错误: 当前帧来源无法提供屏幕分辨率，无法校准。")
+        return
+
+    print(f"{args.delay} 秒后截图，请切换到游戏窗口...")
+    time.sleep(args.delay)
+    frame = np.empty(frame_source.get_frame_shape(), dtype=np.uint8)
+    if not frame_source.read_into(frame):
+        print("错误: 截图失败。")
+        return
+    frame_source.cleanup()
+
+    calibrator = ActionBarCalibrator(padding=args.padding)
+    calibration = calibrator.calibrate(detector.detect_skills(frame), screen_size)
+    if not calibration:
+        print("未检测到任何技能图标，校准失败。")
+        return
+
+    resolution = ActionBarCalibrator.resolution_key(screen_size)
+    print(f"分辨率 {resolution}: 截图区域 {calibration['region']}")
+    for slot in calibration['slots']:
+        print(f"  - {slot['name']}: {slot['box']}")
+    if calibrator.save(config_manager, screen_size, calibration):
+        print(f"校准结果已保存到 {args.config}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+使用 config.yaml 中配置的帧来源录制一段画面，写入内存映射的录像文件。
+
+录像可通过 frame_source: {type: replay, path: <录像文件>, speed: 1} 回放给引擎，
+从而在没有游戏和显示器的机器上复现、分析引擎行为。
+
+用法:
+    python scripts/record_frames.py sessions/frost_mage.wowcap --seconds 60
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.frame_grabber import FrameGrabber
+from src.implementations.frame_sources import get_frame_source
+from src.utils.config_manager import ConfigManager
+from src.utils.frame_recording import FrameRecorder
+
+
+class _PrintLog:
+    def put(self, message):
+        print(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录制帧来源的画面")
+    parser.add_argument('output', help="录像文件路径")
+    parser.add_argument('--seconds', type=float, default=30.0, help="录制时长（秒）")
+    parser.add_argument('--max-frames', type=int, default=10000, help="最多录制的帧数")
+    parser.add_argument('--config', default='config.yaml')
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config).get_config()
+    frame_source_config = config.get('frame_source', {}) or {}
+    grabber = FrameGrabber(get_frame_source(config), _PrintLog(), max_fps=frame_source_config.get('max_fps', 0))
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    print(f"开始录制 {args.seconds} 秒，按 [Ctrl+C] 提前结束...")
+    grabber.start()
+    last_seq = 0
+    deadline = time.perf_counter() + args.seconds
+    with FrameRecorder(args.output, grabber.ring.frames.shape[1:], args.max_frames) as recorder:
+        try:
+            while time.perf_counter() < deadline:
+                frame = grabber.get_latest_frame(last_seq, timeout=0.5)
+                if frame is None:
+                    continue
+                last_seq = frame.seq
+                written = recorder.write(frame.image, frame.timestamp)
+                grabber.release_frame()
+                if not written:
+                    print("已达到最大帧数。")
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            grabber.stop()
+        print(f"已录制 {recorder.count} 帧到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
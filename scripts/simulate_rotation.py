@@ -0,0 +1,143 @@
+"""
+离线循环模拟器：不需要游戏和模型，在虚拟时钟上评估策略。
+
+子命令:
+    batch    在多个工作进程中对每个策略、每个场景各运行一次模拟（默认使用 strategies/ 下的全部策略）
+    replay   用录制的逐帧检测结果回放一个策略
+    extract  用 config.yaml 中的检测器处理一段录像（scripts/record_frames.py），保存逐帧检测结果供 replay 使用
+
+用法:
+    python scripts/simulate_rotation.py batch --duration 300 --seeds 5 --miss-rates 0 0.05 --workers 8
+    python scripts/simulate_rotation.py batch strategies/frost_dk.yaml --scenarios scenarios.yaml
+    python scripts/simulate_rotation.py extract sessions/frost_mage.wowcap sessions/frost_mage.npz
+    python scripts/simulate_rotation.py replay sessions/frost_mage.npz strategies/frostfire_mage.yaml
+
+场景文件是一个列表，每项的字段见 rotation_simulator.Scenario，例如:
+    - {name: raid, mode: single_target, duration: 300, miss_rate: 0.02, cooldown_sweep: true}
+"""
+import argparse
+import glob
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.rotation_simulator import Scenario, simulate_strategy
+from src.utils.detection_stream import DetectionStream, save_detection_stream
+
+
+def _format_casts(casts, limit=4):
+    top = sorted(casts.items(), key=lambda item: -item[1])[:limit]
+    return ", ".join(f"{name}×{count}" for name, count in top)
+
+
+def print_result(result):
+    rejected = sum(result['rejected'].values())
+    print(f"{os.path.basename(result['strategy']):28s} {result['scenario']:30s} 施放 {result['total_casts']:5d}  "
+          f"无效按键 {rejected:3d}  空闲GCD {result['idle_gcds']:6.1f}  决策 {result['decision_us_mean']:6.1f}/"
+          f"{result['decision_us_p99']:6.1f} µs (均值/p99)  加速 {result['speedup']:7.0f}x  {_format_casts(result['casts'])}")
+
+
+def load_scenarios(args):
+    if args.scenarios:
+        with open(args.scenarios, 'r', encoding='utf-8') as f:
+            return [Scenario(**entry) for entry in yaml.safe_load(f)]
+    return [
+        Scenario(f"{mode}/miss={miss_rate}/seed={seed}", mode=mode, duration=args.duration, miss_rate=miss_rate,
+                 cooldown_sweep=args.cooldown_sweep, seed=seed)
+        for mode, miss_rate, seed in itertools.product(args.modes, args.miss_rates, range(args.seeds))
+    ]
+
+
+def _run_job(job):
+    strategy_path, scenario = job
+    try:
+        return simulate_strategy(strategy_path, scenario)
+    except Exception as e:
+        return {'strategy': strategy_path, 'scenario': scenario.name, 'error': str(e)}
+
+
+def batch(args):
+    strategies = args.strategies or sorted(glob.glob(os.path.join('strategies', '*.yaml')))
+    jobs = list(itertools.product(strategies, load_scenarios(args)))
+    print(f"{len(strategies)} 个策略 × {len(jobs) // max(len(strategies), 1)} 个场景，{args.workers or os.cpu_count()} 个工作进程")
+
+    started = time.perf_counter()
+    results = []
+    with multiprocessing.Pool(args.workers or None) as pool:
+        for result in pool.imap_unordered(_run_job, jobs):
+            results.append(result)
+    elapsed = time.perf_counter() - started
+
+    for result in sorted(results, key=lambda r: (r['strategy'], r['scenario'])):
+        if 'error' in result:
+            print(f"{os.path.basename(result['strategy']):28s} {result['scenario']:30s} 失败: {result['error']}")
+        else:
+            print_result(result)
+    simulated = sum(result.get('simulated_seconds', 0) for result in results)
+    print(f"\n共模拟 {simulated / 3600:.1f} 小时的战斗，耗时 {elapsed:.1f} 秒")
+
+
+def replay(args):
+    stream = DetectionStream(args.stream)
+    scenario = Scenario(os.path.basename(args.stream), mode=args.mode, duration=stream.duration,
+                        frame_interval=args.frame_interval, inference_latency=args.inference_ms / 1000.0)
+    print_result(simulate_strategy(args.strategy, scenario, stream))
+
+
+def extract(args):
+    from src.implementations.yolo_detector import get_skill_detector
+    from src.utils.config_manager import ConfigManager
+    from src.utils.frame_recording import FrameRecording
+
+    detector = get_skill_detector(ConfigManager(args.config).get_config())
+    recording = FrameRecording(args.recording)
+    frames = []
+    for i in range(len(recording)):
+        frames.append(detector.detect(recording.frames[i]))
+        if (i + 1) % 100 == 0:
+            print(f"已处理 {i + 1}/{len(recording)} 帧")
+    save_detection_stream(args.output, detector.class_table.labels, recording.timestamps, frames)
+    print(f"已保存 {len(frames)} 帧的检测结果到 {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线循环模拟器")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = subparsers.add_parser('batch', help="并行模拟多个策略和场景")
+    batch_parser.add_argument('strategies', nargs='*', help="策略文件，默认为 strategies/ 下的全部策略")
+    batch_parser.add_argument('--scenarios', help="场景文件（YAML 列表），提供时忽略下面的场景参数")
+    batch_parser.add_argument('--modes', nargs='+', default=['single_target', 'aoe'])
+    batch_parser.add_argument('--miss-rates', type=float, nargs='+', default=[0.0])
+    batch_parser.add_argument('--seeds', type=int, default=1)
+    batch_parser.add_argument('--duration', type=float, default=300.0, help="每次模拟的战斗时长（秒）")
+    batch_parser.add_argument('--cooldown-sweep', action='store_true', help="合成的检测结果带有冷却转圈估计")
+    batch_parser.add_argument('--workers', type=int, default=0, help="工作进程数，0 为 CPU 核数")
+    batch_parser.set_defaults(func=batch)
+
+    replay_parser = subparsers.add_parser('replay', help="回放录制的逐帧检测结果")
+    replay_parser.add_argument('stream', help="extract 生成的 .npz 文件")
+    replay_parser.add_argument('strategy')
+    replay_parser.add_argument('--mode', default='single_target')
+    replay_parser.add_argument('--frame-interval', type=float, default=1 / 60)
+    replay_parser.add_argument('--inference-ms', type=float, default=10.0)
+    replay_parser.set_defaults(func=replay)
+
+    extract_parser = subparsers.add_parser('extract', help="从录像中提取逐帧检测结果")
+    extract_parser.add_argument('recording', help="scripts/record_frames.py 录制的录像文件")
+    extract_parser.add_argument('output', help="输出的 .npz 文件")
+    extract_parser.add_argument('--config', default='config.yaml')
+    extract_parser.set_defaults(func=extract)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
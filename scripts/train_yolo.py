@@ -1,9 +1,52 @@
 
 import os
+import sys
 import shutil
 import random
+import time
 import yaml
-from ultralytics import YOLO
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.implementations.exported_detector import OnnxYoloDetector
+from src.utils.letterbox import letterbox_into
+
+
+def select_calibration_images(images, count, seed=0):
+    """按固定的种子从验证集中选出校准图片：同一数据集、同一种子总是得到相同的校准集（与列表的原始顺序无关）"""
+    images = sorted(images)
+    random.Random(seed).shuffle(images)
+    return images[:count]
+
+
+class ValImageCalibrationReader:
+    """
+    INT8 静态量化的校准数据：按推理时相同的 letterbox 预处理逐张读取验证集图片。
+    实现 onnxruntime.quantization.CalibrationDataReader 的 get_next 接口。
+    """
+
+    def __init__(self, image_paths, input_name, input_shape):
+        self.image_paths = image_paths
+        self.input_name = input_name
+        self.input_shape = input_shape
+        self._index = 0
+
+    def get_next(self):
+        while self._index < len(self.image_paths):
+            image = cv2.imread(self.image_paths[self._index])
+            self._index += 1
+            if image is None:
+                continue
+            tensor = np.empty(self.input_shape, dtype=np.float32)
+            letterbox_into(image, tensor)
+            return {self.input_name: tensor}
+        return None
+
+    def rewind(self):
+        self._index = 0
+
 
 class YOLOTrainer:
     def __init__(self, config_path="config.yaml"):
@@ -19,6 +62,8 @@ class YOLOTrainer:
         self.epochs = self.training_config.get("epochs", 50)
         self.model = self.training_config.get("model", "yolov8n.pt")
         self.imgsz = self.training_config.get("imgsz", 640)
+        self.export_formats = self.training_config.get("export_formats", [])
+        self.quantization_config = self.training_config.get("quantization", {})
 
     def _load_config(self, path):
         try:
@@ -88,6 +133,8 @@ class YOLOTrainer:
 
     def run_training(self, yaml_path):
         """启动YOLOv8训练"""
+        from ultralytics import YOLO
+
         print("--- 开始YOLOv8训练 ---")
         try:
             model = YOLO(self.model)
@@ -99,9 +146,139 @@ class YOLOTrainer:
                 name='train'
             )
             print("--- 训练成功完成 ---")
-            print(f"最佳模型已保存至: {results.save_dir}/weights/best.pt")
+            best_path = os.path.join(str(results.save_dir), 'weights', 'best.pt')
+            print(f"最佳模型已保存至: {best_path}")
+            return best_path
         except Exception as e:
             print(f"!!! 训练过程中发生错误: {e}")
+            return None
+
+    def export_model(self, weights_path):
+        """把训练好的 best.pt 导出为 CPU 推理用的格式（onnx / openvino）"""
+        from ultralytics import YOLO
+
+        exported = {}
+        for export_format in self.export_formats:
+            print(f"--- 开始导出 {export_format} 模型 ---")
+            try:
+                model = YOLO(weights_path)
+                exported[export_format] = model.export(format=export_format, imgsz=self.imgsz)
+                print(f"{export_format} 模型已导出至: {exported[export_format]}")
+            except Exception as e:
+                print(f"!!! 导出 {export_format} 模型时发生错误: {e}")
+        if exported:
+            print("在 config.yaml 中把 yolo_model_path 指向导出的模型即可使用对应的推理后端。")
+        return exported
+
+    def _val_images(self):
+        val_dir = os.path.join(self.dest_dir, 'images', 'val')
+        image_extensions = {'.jpg', '.jpeg', '.png'}
+        return sorted(
+            os.path.join(val_dir, f) for f in os.listdir(val_dir)
+            if os.path.splitext(f)[1].lower() in image_extensions
+        )
+
+    def _calibration_images(self):
+        return select_calibration_images(
+            self._val_images(),
+            self.quantization_config.get("calibration_images", 100),
+            self.quantization_config.get("seed", 0),
+        )
+
+    def quantize_model(self, onnx_path):
+        """用验证集图片校准，把导出的 FP32 ONNX 模型静态量化为 INT8 (QDQ 格式)"""
+        try:
+            import onnx
+            from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+            from onnxruntime.quantization.shape_inference import quant_pre_process
+        except ImportError as e:
+            print(f"!!! 量化需要 onnx 和 onnxruntime（pip install .[onnx]），跳过量化: {e}")
+            return None
+
+        print("--- 开始 INT8 静态量化 ---")
+        images = self._calibration_images()
+        if not images:
+            print("!!! 验证集中没有图片，无法校准，跳过量化。")
+            return None
+
+        model = onnx.load(onnx_path)
+        model_input = model.graph.input[0]
+        input_shape = [d.dim_value or self.imgsz for d in model_input.type.tensor_type.shape.dim]
+        input_shape[0] = 1
+
+        base, _ = os.path.splitext(onnx_path)
+        preprocessed_path = f"{base}_preprocessed.onnx"
+        int8_path = f"{base}_int8.onnx"
+        try:
+            # 导出的模型输入尺寸固定，不需要符号形状推理
+            quant_pre_process(onnx_path, preprocessed_path, skip_symbolic_shape=True)
+            quantize_static(
+                preprocessed_path,
+                int8_path,
+                ValImageCalibrationReader(images, model_input.name, input_shape),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=True,
+                calibrate_method=CalibrationMethod.MinMax,
+                nodes_to_exclude=self.quantization_config.get("nodes_to_exclude", []),
+            )
+        except Exception as e:
+            print(f"!!! 量化过程中发生错误: {e}")
+            return None
+        finally:
+            if os.path.exists(preprocessed_path):
+                os.remove(preprocessed_path)
+
+        # 保留 ultralytics 写入的元数据（类别名等），检测器和 YOLO().val() 都依赖它
+        quantized = onnx.load(int8_path)
+        del quantized.metadata_props[:]
+        quantized.metadata_props.extend(model.metadata_props)
+        onnx.save(quantized, int8_path)
+        print(f"INT8 模型已保存至: {int8_path}（使用 {len(images)} 张图片校准）")
+        return int8_path
+
+    def _measure_latency(self, model_path, images, warmup=5):
+        """通过引擎使用的检测器接口测量单帧平均延迟（毫秒）"""
+        detector = OnnxYoloDetector(model_path, imgsz=self.imgsz, config=self.config.get("yolo_inference", {}))
+        frames = [frame for frame in (cv2.imread(p) for p in images) if frame is not None]
+        for i in range(warmup):
+            detector.detect(frames[i % len(frames)])
+        started = time.perf_counter()
+        for frame in frames:
+            detector.detect(frame)
+        return (time.perf_counter() - started) * 1000 / len(frames)
+
+    def write_quantization_report(self, yaml_path, fp32_path, int8_path):
+        """对比 FP32 与 INT8 模型在验证集上的 mAP 和 CPU 延迟，写出量化报告"""
+        from ultralytics import YOLO
+
+        print("--- 开始评估量化效果 ---")
+        report = {'fp32_model': fp32_path, 'int8_model': int8_path}
+        for key, path in (('fp32', fp32_path), ('int8', int8_path)):
+            metrics = YOLO(path, task='detect').val(data=yaml_path, imgsz=self.imgsz, batch=1, device='cpu',
+                                                   plots=False, verbose=False)
+            report[f'{key}_map50'] = float(metrics.box.map50)
+            report[f'{key}_map50_95'] = float(metrics.box.map)
+
+        images = self._val_images()[:self.quantization_config.get("latency_images", 50)]
+        report['fp32_latency_ms'] = self._measure_latency(fp32_path, images)
+        report['int8_latency_ms'] = self._measure_latency(int8_path, images)
+        report['map50_delta'] = report['int8_map50'] - report['fp32_map50']
+        report['map50_95_delta'] = report['int8_map50_95'] - report['fp32_map50_95']
+        report['speedup'] = report['fp32_latency_ms'] / report['int8_latency_ms']
+
+        report_path = os.path.join(os.path.dirname(int8_path), 'quantization_report.yaml')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            yaml.dump(report, f, sort_keys=False, allow_unicode=True)
+
+        print(f"mAP50-95: FP32 {report['fp32_map50_95']:.4f} -> INT8 {report['int8_map50_95']:.4f} "
+              f"(变化 {report['map50_95_delta']:+.4f})")
+        print(f"延迟: FP32 {report['fp32_latency_ms']:.2f} ms -> INT8 {report['int8_latency_ms']:.2f} ms "
+              f"(加速 {report['speedup']:.2f}x)")
+        print(f"量化报告已保存至: {report_path}")
+        print("如需部署 INT8 模型，在 config.yaml 中把 yolo_model_path 指向它即可。")
+        return report
 
     def execute(self):
         """执行完整的训练流水线"""
@@ -122,7 +299,19 @@ class YOLOTrainer:
         yaml_file_path = self.create_dataset_yaml(class_names)
 
         # 4. 启动训练
-        self.run_training(yaml_file_path)
+        best_path = self.run_training(yaml_file_path)
+
+        # 5. 导出 CPU 推理模型
+        exported = self.export_model(best_path) if best_path and self.export_formats else {}
+
+        # 6. INT8 量化并生成对比报告
+        if self.quantization_config.get("enabled", False):
+            if 'onnx' not in exported:
+                print("!!! INT8 量化需要先导出 onnx 模型（export_formats 中包含 onnx），跳过量化。")
+                return
+            int8_path = self.quantize_model(exported['onnx'])
+            if int8_path:
+                self.write_quantization_report(yaml_file_path, exported['onnx'], int8_path)
 
 if __name__ == "__main__":
     trainer = YOLOTrainer()
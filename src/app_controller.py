@@ -1,48 +1,127 @@
+import multiprocessing
+import threading
 from multiprocessing import Queue
 from src.engine.automation_engine import AutomationEngine
+from src.utils.log_channel import INFO, WARNING, log_event
+from src.utils.shared_detection_slot import SharedDetectionSlot
+
+# forkserver 预加载的模块: 引擎进程启动时最慢的是导入 torch / ultralytics
+DEFAULT_PRELOAD_MODULES = ['numpy', 'cv2', 'torch', 'ultralytics']
+
 
 class AppController:
-    def __init__(self, config_path):
+    def __init__(self, config_path, engine_config=None):
+        """
+        :param engine_config: 配置中的 engine 部分，使用其中的 start_method 和 preload_modules。
+        """
+        engine_config = engine_config or {}
         self.config_path = config_path
+        self.start_method = engine_config.get('start_method')
+        self.preload_modules = engine_config.get('preload_modules', DEFAULT_PRELOAD_MODULES)
+        if self.start_method:
+            # 必须在创建队列和共享内存之前设置
+            multiprocessing.set_start_method(self.start_method, force=True)
+        if multiprocessing.get_start_method() == 'forkserver':
+            # 只记录模块列表，forkserver 第一次启动时才会导入
+            multiprocessing.set_forkserver_preload(self.preload_modules)
+        self._preload_thread = None
         self.log_queue = Queue()
-        self.yolo_data_queue = Queue()
+        self.detection_slot = SharedDetectionSlot()
         self.command_queue = Queue()
         self.automation_process = None
 
-    def start_engine(self, debug_mode):
-        if self.automation_process and self.automation_process.is_alive():
-            self.log("自动化引擎已在运行。")
-            return
+    def is_engine_running(self):
+        return bool(self.automation_process and self.automation_process.is_alive())
 
-        self.log("正在启动自动化引擎...")
+    def _launch_engine(self, debug_mode, start_paused):
         self.automation_process = AutomationEngine(
             self.config_path,
             self.log_queue,
-            self.yolo_data_queue,
+            self.detection_slot,
             self.command_queue,
-            debug_mode
+            debug_mode,
+            start_paused=start_paused
         )
         self.automation_process.start()
+
+    def preload_engine_modules(self):
+        """
+        在后台线程中启动 forkserver，由它导入 preload_modules。界面空闲时调用，
+        之后的引擎进程从已经导入了这些模块的 forkserver 中 fork 出来，不必再各自导入 torch 和 ultralytics。
+        启动方式不是 forkserver 时返回 False（spawn 下请使用 prewarm_engine）。
+        """
+        if multiprocessing.get_start_method() != 'forkserver':
+            return False
+        if self._preload_thread is None:
+            from multiprocessing import forkserver
+            self._preload_thread = threading.Thread(
+                target=forkserver.ensure_running, name="ForkserverPreload", daemon=True
+            )
+            self._preload_thread.start()
+        return True
+
+    def prewarm_engine(self):
+        """提前启动引擎进程并加载模型，保持暂停，之后 start_engine 只需恢复。"""
+        if not self.is_engine_running():
+            self.log(INFO, "正在预热自动化引擎...")
+            self._launch_engine(False, start_paused=True)
+
+    def start_engine(self, debug_mode):
+        if self.is_engine_running():
+            # 引擎进程已经在运行（预热或之前暂停），恢复即可，不必重新加载模型
+            self.send_command({"type": "resume", "debug": debug_mode})
+            return True
+
+        self.log(INFO, "正在启动自动化引擎...")
+        self._launch_engine(debug_mode, start_paused=False)
         return True
 
     def stop_engine(self):
-        if self.automation_process and self.automation_process.is_alive():
-            self.log("正在停止自动化引擎...")
+        """暂停引擎。引擎进程和模型保持加载，再次 start_engine 时立即恢复。"""
+        if self.is_engine_running():
+            self.send_command("pause")
+        else:
+            self.log(INFO, "自动化引擎未运行。")
+
+    def shutdown_engine(self, timeout=5):
+        """结束引擎进程: 设置 stop_event 让它正常退出，超时后才强制终止。"""
+        if not self.is_engine_running():
+            self.automation_process = None
+            return
+        self.log(INFO, "正在关闭自动化引擎...")
+        self.send_command("shutdown")
+        self.automation_process.stop()
+        self.automation_process.join(timeout)
+        if self.automation_process.is_alive():
+            self.log(WARNING, "自动化引擎未能在规定时间内退出，强制终止。")
             self.automation_process.terminate()
             self.automation_process.join()
-            self.automation_process = None
-            self.log("自动化引擎已停止。")
-        else:
-            self.log("自动化引擎未运行。")
+        self.automation_process = None
+        self.log(INFO, "自动化引擎已关闭。")
+
+    def send_command(self, command):
+        """向引擎发送指令（不等待引擎处理），引擎未运行时返回 False。"""
+        if not self.is_engine_running():
+            return False
+        self.command_queue.put(command)
+        return True
+
+    def reload_strategy(self, strategy_path=None):
+        """让运行中的引擎重新加载策略（不重启引擎、不重新加载模型）。引擎未运行时返回 False。"""
+        return self.send_command({"type": "reload", "path": strategy_path})
+
+    def request_latency_report(self, reset=False):
+        """让引擎报告各阶段的延迟分布（结果以 latency_report 事件和日志的形式出现在日志队列中）。"""
+        return self.send_command({"type": "latency", "reset": reset})
 
-    def log(self, message):
-        self.log_queue.put(message)
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
 
     def get_log_queue(self):
         return self.log_queue
 
-    def get_yolo_data_queue(self):
-        return self.yolo_data_queue
+    def get_detection_slot(self):
+        return self.detection_slot
 
     def get_command_queue(self):
         return self.command_queue
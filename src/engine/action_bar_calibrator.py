@@ -0,0 +1,98 @@
+import math
+
+from src.utils.detections import split_label
+
+class ActionBarCalibrator:
+    """
+    技能栏 ROI 校准。
+
+    在整屏画面上运行一次 YOLO，记录每个技能图标所在的槽位，并按屏幕分辨率
+    把槽位和它们的外接区域保存到 config.yaml 的 action_bar_slots 中。之后引擎只需
+    截取并分析该外接区域，而不是整个屏幕。
+    """
+
+    CONFIG_KEY = 'action_bar_slots'
+
+    def __init__(self, padding=4):
+        self.padding = padding
+
+    @staticmethod
+    def skill_name(label):
+        return split_label(label)[0]
+
+    @staticmethod
+    def resolution_key(screen_size):
+        width, height = screen_size
+        return f"{width}x{height}"
+
+    def calibrate(self, detections, screen_size):
+        """
+        根据整屏检测结果计算技能槽位。
+
+        :param detections: detect_skills 返回的检测结果（整屏坐标）。
+        :param screen_size: 屏幕的 (宽, 高)。
+        :return: {'region': [x1, y1, x2, y2], 'slots': [{'name': str, 'box': [x1, y1, x2, y2]}]}，
+                 没有检测到任何技能时返回 None。
+        """
+        best = {}
+        for detection in detections:
+            name = self.skill_name(detection['name'])
+            if name not in best or detection['confidence'] > best[name]['confidence']:
+                best[name] = detection
+        if not best:
+            return None
+
+        slots = sorted(
+            ({'name': name, 'box': [int(v) for v in detection['box']]} for name, detection in best.items()),
+            key=lambda slot: (slot['box'][1], slot['box'][0])
+        )
+        width, height = screen_size
+        region = [
+            max(0, min(slot['box'][0] for slot in slots) - self.padding),
+            max(0, min(slot['box'][1] for slot in slots) - self.padding),
+            min(width, max(slot['box'][2] for slot in slots) + self.padding),
+            min(height, max(slot['box'][3] for slot in slots) + self.padding),
+        ]
+        return {'region': region, 'slots': slots}
+
+    def save(self, config_manager, screen_size, calibration):
+        calibrations = dict(config_manager.get(self.CONFIG_KEY) or {})
+        calibrations[self.resolution_key(screen_size)] = calibration
+        config_manager.set(self.CONFIG_KEY, calibrations)
+        return config_manager.save()
+
+    @classmethod
+    def load(cls, config, screen_size):
+        """返回当前分辨率的校准结果，没有则返回 None。"""
+        if not screen_size:
+            return None
+        return (config.get(cls.CONFIG_KEY) or {}).get(cls.resolution_key(screen_size))
+
+
+def region_slot_boxes(calibration):
+    """把校准结果中的槽位坐标转换为相对于截图区域的坐标: [(name, (x1, y1, x2, y2)), ...]"""
+    left, top = calibration['region'][:2]
+    return [
+        (slot['name'], (slot['box'][0] - left, slot['box'][1] - top, slot['box'][2] - left, slot['box'][3] - top))
+        for slot in calibration['slots']
+    ]
+
+
+def crop_slots(frame, slot_boxes):
+    """按槽位裁剪帧，返回的是 frame 的视图而不是副本。"""
+    return [frame[y1:y2, x1:x2] for _, (x1, y1, x2, y2) in slot_boxes]
+
+
+def inference_size(region, screen_size, train_imgsz=640, stride=32):
+    """
+    计算只分析截图区域时的 YOLO 输入尺寸 [高, 宽]。
+
+    模型是在整屏截图缩放到 train_imgsz 后训练的，这里按同样的缩放比例缩小区域，
+    保持图标在输入中的像素大小与训练时一致，再向上取整到 stride 的倍数。
+    """
+    x1, y1, x2, y2 = region
+    scale = min(1.0, train_imgsz / max(screen_size))
+    return [
+        max(stride, math.ceil((y2 - y1) * scale / stride) * stride),
+        max(stride, math.ceil((x2 - x1) * scale / stride) * stride),
+    ]
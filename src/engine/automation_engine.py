@@ -1,62 +1,171 @@
+import os
 from multiprocessing import Process, Event
 
-from src.implementations.pynput_sender import get_keystroke_sender
-from src.implementations.yolo_detector import YoloDetector
-from src.engine.strategy_manager import StrategyManager
-from src.engine.mode_manager import ModeManager
-from src.engine.automation_loop import AutomationLoop
 from src.utils.config_manager import ConfigManager
+from src.utils.log_channel import ERROR, INFO, LogChannel, log_event
 
 class AutomationEngine(Process):
-    def __init__(self, config_path, log_queue, yolo_data_queue, command_queue, debug_mode):
+    def __init__(self, config_path, log_queue, detection_slot, command_queue, debug_mode, start_paused=False):
+        """
+        引擎进程只启动一次: 之后通过 command_queue 的 pause / resume 指令启停，模型始终保持加载；
+        shutdown 指令或 stop() 设置 _stop_event，让引擎正常退出。
+
+        :param start_paused: 预热: 加载模型后保持暂停，等待 resume 指令。
+        """
         super().__init__()
-        # config_path is no longer used here, but kept for compatibility with AppController for now
+        self.config_path = config_path
         self.log_queue = log_queue
-        self.yolo_data_queue = yolo_data_queue
+        self.detection_slot = detection_slot
         self.command_queue = command_queue
         self.debug_mode = debug_mode
+        self.start_paused = start_paused
         self._stop_event = Event()
 
     def run(self):
-        self.log("自动化引擎正在启动...")
-
-        config_manager = ConfigManager()
+        config_manager = ConfigManager(self.config_path)
         config = config_manager.get_config()
 
         if not config:
-            self.log("错误: 无法加载配置，引擎将停止。")
+            self.log(ERROR, "错误: 无法加载配置，引擎将停止。")
             return
 
+        # 引擎进程内的所有日志都经过缓冲、按级别过滤后成批发给 GUI
+        log_config = config.get('logging', {}) or {}
+        log_channel = LogChannel(
+            self.log_queue,
+            level=log_config.get('level', 'info'),
+            flush_interval=log_config.get('flush_interval_ms', 100) / 1000.0,
+            max_batch=log_config.get('max_batch', 256)
+        ).start()
+        self.log_queue = log_channel
+        try:
+            self._run(config)
+        finally:
+            log_channel.close()
+
+    def _run(self, config):
+        self.log(INFO, "自动化引擎正在启动...")
+
+        # 重量级的依赖（PyTorch / ultralytics / OpenCV / pynput）只在引擎进程中导入，
+        # GUI 导入本模块时不必等待它们
+        from src.implementations.keystroke_senders import get_keystroke_sender
+        from src.implementations.frame_sources import get_frame_source
+        from src.implementations.yolo_detector import get_skill_detector
+        from src.implementations.cascade_detector import CascadeDetector
+        from src.engine.strategy_manager import StrategyManager
+        from src.engine.strategy_reloader import StrategyReloader
+        from src.engine.mode_manager import ModeManager
+        from src.engine.automation_loop import AutomationLoop
+        from src.engine.frame_grabber import FrameGrabber
+        from src.engine.frame_diff_gate import FrameDiffGate
+        from src.engine.cooldown_sweep import CooldownSweepEstimator
+        from src.engine.skill_state_tracker import SkillStateTracker
+        from src.engine.action_bar_calibrator import ActionBarCalibrator, inference_size, region_slot_boxes
+
         # Initialize components
-        yolo_detector = YoloDetector(config.get('yolo_model_path'))
+        yolo_detector = get_skill_detector(config)
+        skill_detector = yolo_detector
         keystroke_sender = get_keystroke_sender(config)
-        strategy_manager = StrategyManager(self.log_queue)
+        strategy_manager = StrategyManager(self.log_queue, yolo_detector.class_table)
         mode_manager = ModeManager(self.log_queue)
+        self.detection_slot.set_labels(yolo_detector.class_table.labels)
+
+        frame_source = get_frame_source(config)
+        screen_size = frame_source.get_screen_size()
+        calibration = ActionBarCalibrator.load(config, screen_size)
+        if calibration and not config.get('screen_capture_region'):
+            # 只截取并分析校准得到的技能栏区域
+            frame_source.set_region(calibration['region'])
+            yolo_detector.imgsz = inference_size(
+                calibration['region'], screen_size, config.get('yolo_training', {}).get('imgsz', 640)
+            )
+            self.log(INFO, f"已加载技能栏校准 ({ActionBarCalibrator.resolution_key(screen_size)}): "
+                     f"{len(calibration['slots'])} 个槽位, 截图区域 {calibration['region']}, 推理尺寸 {yolo_detector.imgsz}")
+
+            cascade_config = config.get('cascade_detector', {}) or {}
+            if cascade_config.get('enabled', False):
+                templates_dir = cascade_config.get('templates_dir')
+                if templates_dir:
+                    templates_dir = os.path.join(templates_dir, ActionBarCalibrator.resolution_key(screen_size))
+                skill_detector = CascadeDetector(yolo_detector, region_slot_boxes(calibration), cascade_config, templates_dir)
+                self.log(INFO, "已启用级联检测器: 模板匹配优先，必要时回退到 YOLO")
 
-        screen_region = config.get('screen_capture_region')
+        frame_source_config = config.get('frame_source', {}) or {}
+        frame_grabber = FrameGrabber(
+            frame_source,
+            self.log_queue,
+            slots=frame_source_config.get('ring_buffer_slots', 3),
+            max_fps=frame_source_config.get('max_fps', 0)
+        )
+        frame_grabber.start()
+
+        gate_config = config.get('frame_diff_gate', {}) or {}
+        frame_diff_gate = None
+        if gate_config.get('enabled', False):
+            frame_diff_gate = FrameDiffGate(
+                threshold=gate_config.get('threshold', 8.0),
+                downsample=gate_config.get('downsample', 4),
+                block_size=gate_config.get('block_size', 8),
+                max_skip_frames=gate_config.get('max_skip_frames', 30)
+            )
+
+        sweep_config = config.get('cooldown_sweep', {}) or {}
+        cooldown_estimator = None
+        if sweep_config.get('enabled', False):
+            cooldown_estimator = CooldownSweepEstimator(
+                skill_detector.class_table,
+                angles=sweep_config.get('angles', 36),
+                radii=sweep_config.get('radii', 4),
+                min_contrast=sweep_config.get('min_contrast', 0.15)
+            )
+
+        tracker_config = config.get('skill_state_tracker', {}) or {}
+        skill_tracker = SkillStateTracker(
+            skill_detector.class_table,
+            smoothing=tracker_config.get('smoothing', 0.3),
+            cast_window=tracker_config.get('cast_window_ms', 1000) / 1000.0
+        )
+
+        reload_config = config.get('strategy_reload', {}) or {}
+        strategy_reloader = StrategyReloader(
+            strategy_manager,
+            self._stop_event,
+            self.log_queue,
+            watch_files=reload_config.get('watch_files', True),
+            poll_interval=reload_config.get('poll_interval_ms', 1000) / 1000.0
+        )
+        strategy_reloader.start()
 
         automation_loop = AutomationLoop(
-            yolo_detector=yolo_detector,
+            yolo_detector=skill_detector,
             keystroke_sender=keystroke_sender,
             strategy_manager=strategy_manager,
             mode_manager=mode_manager,
             log_queue=self.log_queue,
-            yolo_data_queue=self.yolo_data_queue,
+            detection_slot=self.detection_slot,
             command_queue=self.command_queue,
             debug_mode=self.debug_mode,
             stop_event=self._stop_event,
-            screen_region=screen_region
+            frame_grabber=frame_grabber,
+            frame_diff_gate=frame_diff_gate,
+            pipeline_config=config.get('pipeline', {}) or {},
+            cooldown_estimator=cooldown_estimator,
+            skill_tracker=skill_tracker,
+            strategy_reloader=strategy_reloader,
+            start_paused=self.start_paused,
+            keystroke_config=config.get('keystroke_sender', {}) or {}
         )
 
-        self.log("自动化引擎已启动")
+        self.log(INFO, "自动化引擎已启动" + ("（已预热，等待开始）" if self.start_paused else ""))
         automation_loop.run()
 
-        self.log("自动化引擎正在停止...")
+        self.log(INFO, "自动化引擎正在停止...")
+        frame_grabber.stop()
         mode_manager.stop_listener()
-        self.log("自动化引擎已停止")
+        self.log(INFO, "自动化引擎已停止")
 
-    def log(self, message):
-        self.log_queue.put(message)
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
 
     def stop(self):
         self._stop_event.set()
@@ -1,77 +1,324 @@
+import queue
+import threading
 import time
+from collections import namedtuple
+
+from src.engine.cast_selector import CastSelector
+from src.engine.keystroke_dispatcher import KeystrokeDispatcher
+from src.engine.pipeline import PipelineStage
+from src.utils.detections import empty_detections
+from src.utils.drop_queue import DropOldestQueue
+from src.utils.latency_histogram import LatencyHistogram
+from src.utils.log_channel import ERROR, INFO, WARNING, log_event
+
+# timestamp 是帧的采集时刻，inference_started / inferred_at 是推理开始和结束的时刻（都是 time.perf_counter()）
+FrameDetections = namedtuple('FrameDetections', ['seq', 'timestamp', 'detections', 'inference_started', 'inferred_at'])
+# 随按键任务提交给 KeystrokeDispatcher 的上下文
+CastRequest = namedtuple('CastRequest', ['spell', 'keybind', 'frame_timestamp', 'send_at', 'decided_at'])
+
+# 延迟统计的各个阶段，从帧的采集时刻一直到按下按键:
+#   frame_age   采集 → 推理开始（帧在环形缓冲区中等待）
+#   inference   推理开始 → 得到检测结果（含帧差门控和冷却转圈估计）
+#   decision    得到检测结果 → 决策完成（含检测队列中的等待）
+#   dispatch    提交按键 → 按键按下（含等待调度器安排的发送时刻）
+#   end_to_end  采集 → 按键按下
+LATENCY_STAGES = {
+    'frame_age': "取帧", 'inference': "推理", 'decision': "决策", 'dispatch': "按键", 'end_to_end': "端到端",
+}
+
 
 class AutomationLoop:
-    def __init__(self, yolo_detector, keystroke_sender, strategy_manager, mode_manager, log_queue, yolo_data_queue, command_queue, debug_mode, stop_event, screen_region):
+    """
+    引擎主循环，按流水线拆成四个阶段，各自运行在独立的线程中:
+
+    1. 采集: FrameGrabber 持续把帧写入环形缓冲区；
+    2. 推理: 取最新帧、经过帧差门控后运行检测器，结果放入检测队列；
+    3. 决策: 本线程，根据检测结果和策略选出要施放的技能，提交给按键线程；
+    4. 按键: KeystrokeDispatcher 在调度器安排的时刻精确地按下、释放按键，发送的耗时不会阻塞检测。
+
+    阶段之间的队列都是有界的、写满时丢弃最旧的数据，保证延迟有上限。
+    选择技能的逻辑在 CastSelector 中（离线模拟器也使用它）。
+    采样和按键的时机由 GcdScheduler 按公共冷却安排: GCD 中不做推理，
+    只在 GCD 结束前的窗口内密集采样，按键在法术队列窗口开始时发出。
+
+    另有一个指令线程读取 command_queue，任何指令都不会阻塞检测和决策:
+
+    - pause / resume: 暂停时停止截图、推理和按键，模型保持加载，恢复只需几毫秒；
+      resume 可以带 {"debug": bool} 切换调试模式；
+    - reload: 交给 StrategyReloader 在后台编译新策略，决策阶段在两次决策之间让它生效；
+    - step（兼容 execute）/ skip: 调试模式下执行或跳过等待确认的技能；
+    - mode: {"type": "mode", "mode": "aoe" / "single_target" / None}，与模式热键效果相同；
+    - latency: 报告各阶段延迟的 p50/p95/p99（见 LATENCY_STAGES），{"reset": true} 时报告后清零；
+    - shutdown: 设置 stop_event，各阶段退出后引擎进程正常结束。
+
+    指令可以是字符串，也可以是 {"type": 指令, ...} 的字典。
+    """
+
+    def __init__(self, yolo_detector, keystroke_sender, strategy_manager, mode_manager, log_queue, detection_slot, command_queue, debug_mode, stop_event, frame_grabber, frame_diff_gate=None, stats_interval=30, pipeline_config=None, cooldown_estimator=None, skill_tracker=None, strategy_reloader=None, start_paused=False, keystroke_config=None):
         self.yolo_detector = yolo_detector
         self.keystroke_sender = keystroke_sender
         self.strategy_manager = strategy_manager
         self.mode_manager = mode_manager
         self.log_queue = log_queue
-        self.yolo_data_queue = yolo_data_queue
+        self.detection_slot = detection_slot
         self.command_queue = command_queue
         self.debug_mode = debug_mode
         self._stop_event = stop_event
-        self.screen_region = screen_region
+        self.frame_grabber = frame_grabber
+        self._last_frame_seq = 0
+        self.frame_diff_gate = frame_diff_gate
+        self.cooldown_estimator = cooldown_estimator
+        self.class_table = yolo_detector.class_table
+        self.cast_selector = CastSelector(
+            self.class_table, strategy_manager, skill_tracker=skill_tracker, cooldown_estimator=cooldown_estimator
+        )
+        self.scheduler = self.cast_selector.scheduler
+        self.skill_tracker = self.cast_selector.skill_tracker
+        self.strategy_reloader = strategy_reloader
+        self._debug_commands = queue.Queue()
+        # 调试模式下等待确认的技能 (spell, keybind, frame_timestamp)
+        self._pending_step = None
+        self._paused = threading.Event()
+        self._last_detections = empty_detections()
+        self.stats_interval = stats_interval
+        self._next_stats_time = time.monotonic() + stats_interval
+
+        pipeline_config = pipeline_config or {}
+        self.detection_queue = DropOldestQueue(pipeline_config.get('detection_queue_depth', 1))
+        self.inference_stage = PipelineStage(
+            "Inference", self._infer_latest_frame, stop_event, log_queue, output_queue=self.detection_queue
+        )
+        keystroke_config = keystroke_config or {}
+        self.keystroke_dispatcher = KeystrokeDispatcher(
+            keystroke_sender, log_queue,
+            hold=keystroke_config.get('keypress_delay_ms', 50) / 1000.0,
+            spin_threshold=keystroke_config.get('spin_threshold_ms', 2) / 1000.0,
+            max_pending=pipeline_config.get('input_queue_depth', 1),
+            guard=lambda: not self._paused.is_set(),
+            on_press=self._record_press
+        )
+        self.latency = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+        self.command_stage = PipelineStage(
+            "Commands", self._handle_command, stop_event, log_queue, input_queue=command_queue, poll_timeout=0.5
+        )
+        if start_paused:
+            self._paused.set()
+            frame_grabber.pause()
+
+    @property
+    def paused(self):
+        return self._paused.is_set()
+
+    def _is_active(self):
+        return not self._paused.is_set() and self.mode_manager.current_mode != self.mode_manager.MODE_STOP and self.strategy_manager.compiled is not None
 
     def run(self):
-        while not self._stop_event.is_set():
-            if self.mode_manager.current_mode == self.mode_manager.MODE_STOP or not self.strategy_manager.current_strategy:
-                time.sleep(0.1)
-                continue
+        stages = (self.inference_stage, self.command_stage)
+        for stage in stages:
+            stage.start()
+        self.keystroke_dispatcher.start()
+        try:
+            while not self._stop_event.is_set():
+                if self.strategy_reloader is not None:
+                    # 在两次决策之间替换策略，推理阶段不受影响
+                    self.strategy_reloader.apply_pending()
+                # 推迟采样期间不会有检测结果进入决策，模式或策略切换要在这里及时取消推迟
+                self.cast_selector.sync(self.mode_manager.current_mode)
+                self._apply_debug_commands()
+                try:
+                    result = self.detection_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                try:
+                    self._decide(result)
+                except Exception as e:
+                    self.log(ERROR, f"引擎主循环发生错误: {e}")
+                    time.sleep(1)
+                self._report_stats()
+        finally:
+            self.keystroke_dispatcher.close()
+            for stage in stages:
+                stage.join(timeout=2)
 
+    def _infer_latest_frame(self):
+        """推理阶段: 对比上一次处理过的更新的帧运行检测，没有新帧或引擎处于停止模式时返回 None。"""
+        if not self._is_active():
+            self._stop_event.wait(0.1)
+            return None
+
+        now = time.perf_counter()
+        delay = self.scheduler.next_sample_time(now) - now
+        if delay > 0:
+            # 分段等待，以便及时响应模式切换和停止
+            self._stop_event.wait(min(delay, 0.1))
+            return None
+
+        # 只取比上一次处理过的更新的帧，截图由后台线程完成
+        frame = self.frame_grabber.get_latest_frame(self._last_frame_seq, timeout=0.5)
+        if frame is None:
+            return None
+        self._last_frame_seq = frame.seq
+        self.scheduler.on_sample(now)
+        inference_started = time.perf_counter()
+        try:
+            if self.frame_diff_gate is None or self.frame_diff_gate.should_infer(frame.image):
+                self._last_detections = self.yolo_detector.detect(frame.image)
+            detections = self._last_detections
+            if self.cooldown_estimator is not None:
+                # 冷却转圈每帧都在变化，即使门控复用了检测结果也要在当前帧上重新估计
+                detections = self.cooldown_estimator.annotate(
+                    frame.image, detections.copy(), frame.timestamp, self.scheduler.gcd_end
+                )
+        finally:
+            self.frame_grabber.release_frame()
+        inferred_at = time.perf_counter()
+        self.latency['frame_age'].record(inference_started - frame.timestamp)
+        self.latency['inference'].record(inferred_at - inference_started)
+        return FrameDetections(frame.seq, frame.timestamp, detections, inference_started, inferred_at)
+
+    def _decide(self, result):
+        """决策阶段: 根据一帧的检测结果选择要施放的技能，交给按键阶段。"""
+        if not self._is_active():
+            return
+        # 只写入共享内存中的最新值，GUI 自己按需读取
+        self.detection_slot.publish(result.seq, result.timestamp, result.detections)
+        spell_to_cast, spell_keybind = self.cast_selector.select(
+            self.mode_manager.current_mode, result.timestamp, result.detections, time.perf_counter()
+        )
+        self.latency['decision'].record(time.perf_counter() - result.inferred_at)
+        if not (spell_to_cast and spell_keybind):
+            return
+
+        if self.debug_mode:
+            if self._pending_step is not None:
+                # 上一个技能还在等待确认，检测继续进行，但不再提出新的技能
+                return
+            self._pending_step = (spell_to_cast, spell_keybind, result.timestamp)
+            self.log(INFO, f"[调试] 等待确认，准备施放: {spell_to_cast} (按键: {spell_keybind})")
+            self.log_queue.put({"type": "debug_step", "spell": spell_to_cast, "keybind": spell_keybind})
+        else:
+            self.log(INFO, f"模式: {self.mode_manager.current_mode.upper()} | 施放: {spell_to_cast}")
+            self._queue_cast(spell_to_cast, spell_keybind, result.timestamp)
+
+    def _handle_command(self, command):
+        """指令阶段: 分发 command_queue 中的指令。"""
+        if isinstance(command, dict):
+            command_type = command.get('type')
+        else:
+            command, command_type = {}, command
+        if command_type == 'pause':
+            self.pause()
+        elif command_type == 'resume':
+            self.resume(command.get('debug'))
+        elif command_type == 'reload':
+            if self.strategy_reloader is None:
+                self.log(WARNING, "未启用策略热加载，忽略 reload 指令")
+                return
+            self.strategy_reloader.request_reload(command.get('path'))
+        elif command_type in ('step', 'execute', 'skip'):
+            # 由决策阶段处理，避免与决策并发修改调度器
+            self._debug_commands.put(command_type)
+        elif command_type == 'mode':
+            if not self.mode_manager.set_mode(command.get('mode')):
+                self.log(WARNING, f"未知模式: {command.get('mode')}")
+        elif command_type == 'latency':
+            self.report_latency(command.get('reset', False))
+        elif command_type == 'shutdown':
+            self.log(INFO, "收到关闭指令")
+            self._stop_event.set()
+        else:
+            self.log(WARNING, f"未知指令: {command_type}")
+
+    def pause(self):
+        """暂停截图、推理和按键，已排队的按键不再发送。模型和各阶段线程保持运行。"""
+        if self._paused.is_set():
+            return
+        self._paused.set()
+        self.frame_grabber.pause()
+        self.detection_queue.clear()
+        self.keystroke_dispatcher.cancel()
+        self._pending_step = None
+        self.scheduler.reset()
+        self.log(INFO, "自动化引擎已暂停")
+
+    def resume(self, debug_mode=None):
+        if debug_mode is not None:
+            self.debug_mode = bool(debug_mode)
+        if not self._paused.is_set():
+            return
+        self.frame_grabber.resume()
+        self._paused.clear()
+        self.log(INFO, "自动化引擎已恢复" + (" (调试模式)" if self.debug_mode else ""))
+
+    def _apply_debug_commands(self):
+        """决策阶段: 处理调试确认指令，执行或丢弃等待确认的技能。"""
+        while True:
             try:
-                detected_objects = self.yolo_detector.detect_skills(self.screen_region)
-                ready_skills = {obj['name'].replace('_ready', '') for obj in detected_objects if obj['name'].endswith('_ready')}
-                all_detected_labels = [obj['name'] for obj in detected_objects]
-                self.yolo_data_queue.put(all_detected_labels)
+                command = self._debug_commands.get_nowait()
+            except queue.Empty:
+                return
+            if self._pending_step is None:
+                continue
+            spell, keybind, frame_timestamp = self._pending_step
+            self._pending_step = None
+            if command == 'skip':
+                self.log(INFO, "[调试] 指令: 跳过")
+            else:
+                self.log(INFO, "[调试] 指令: 执行")
+                self._queue_cast(spell, keybind, frame_timestamp)
+            # 等待确认期间的检测结果已经过时
+            self.detection_queue.clear()
 
-                if not ready_skills:
-                    time.sleep(0.1)
-                    continue
+    def _queue_cast(self, spell, keybind, frame_timestamp):
+        decided_at = time.perf_counter()
+        send_at = self.cast_selector.commit(spell, decided_at)
+        self.keystroke_dispatcher.send_key(keybind, send_at, CastRequest(spell, keybind, frame_timestamp, send_at, decided_at))
+
+    def _record_press(self, request, pressed_at):
+        """按键线程: 技能的按键按下后记录按键和端到端延迟。调试模式下包含人工确认的时间，不计入。"""
+        if request is None or self.debug_mode:
+            return
+        self.latency['dispatch'].record(pressed_at - request.decided_at)
+        self.latency['end_to_end'].record(pressed_at - request.frame_timestamp)
+
+    def get_latency_stats(self):
+        return {stage: histogram.summary() for stage, histogram in self.latency.items()}
+
+    def report_latency(self, reset=False):
+        """把各阶段的延迟分布写入日志，并发送 {"type": "latency_report", "stages": ...} 事件。"""
+        stats = self.get_latency_stats()
+        for stage, summary in stats.items():
+            self.log(INFO, f"延迟 {LATENCY_STAGES[stage]}: " + (
+                f"p50 {summary['p50']:.2f} / p95 {summary['p95']:.2f} / p99 {summary['p99']:.2f} ms, "
+                f"最大 {summary['max']:.2f} ms ({summary['count']} 次)" if summary['count'] else "暂无数据"
+            ))
+        self.log_queue.put({"type": "latency_report", "stages": stats})
+        if reset:
+            for histogram in self.latency.values():
+                histogram.reset()
+        return stats
+
+    def _report_stats(self):
+        if time.monotonic() < self._next_stats_time:
+            return
+        self._next_stats_time = time.monotonic() + self.stats_interval
+        if self.frame_diff_gate is not None:
+            stats = self.frame_diff_gate.get_stats()
+            self.log(INFO, f"帧差门控: 跳过率 {stats['skip_rate']:.1%} ({stats['skips']}/{stats['checks']})")
+        detection_stats, input_stats = self.detection_queue.get_stats(), self.keystroke_dispatcher.get_stats()
+        self.log(INFO, f"流水线: 推理 {self.inference_stage.processed} 帧, 丢弃检测结果 {detection_stats['dropped']}, "
+                 f"按键 {input_stats['completed']} 次, 丢弃按键 {input_stats['dropped']}")
+        end_to_end = self.latency['end_to_end'].summary()
+        if end_to_end['count']:
+            self.log(INFO, f"端到端延迟（采集 → 按键）: p50 {end_to_end['p50']:.1f} / p99 {end_to_end['p99']:.1f} ms")
+        delay, press = input_stats['queue_delay_ms'], input_stats['press_ms']
+        if delay['count']:
+            self.log(INFO, f"按键时序: 排队延迟 p50 {delay['p50']:.2f} / p99 {delay['p99']:.2f} ms, "
+                     f"按住时长 p50 {press['p50']:.2f} / p99 {press['p99']:.2f} ms")
+        self.log(INFO, "技能状态: " + ", ".join(f"{key}={value}" for key, value in self.skill_tracker.get_stats().items()))
+        if hasattr(self.yolo_detector, 'get_stats'):
+            stats = self.yolo_detector.get_stats()
+            self.log(INFO, "检测器: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
 
-                spell_to_cast, spell_keybind = self._find_spell_to_cast(ready_skills)
-
-                if spell_to_cast and spell_keybind:
-                    if self.debug_mode:
-                        self.log(f"[调试] 暂停，准备施放: {spell_to_cast} (按键: {spell_keybind})")
-                        self.log_queue.put({"type": "debug_step", "spell": spell_to_cast, "keybind": spell_keybind})
-
-                        command = self.command_queue.get()
-                        if command == 'execute':
-                            self.log("[调试] 指令: 执行")
-                            self.keystroke_sender.send_key(spell_keybind)
-                            time.sleep(self.strategy_manager.global_cooldown)
-                        else:
-                            self.log("[调试] 指令: 跳过")
-                            time.sleep(0.1)
-                    else:
-                        self.log(f"模式: {self.mode_manager.current_mode.upper()} | 施放: {spell_to_cast}")
-                        self.keystroke_sender.send_key(spell_keybind)
-                        time.sleep(self.strategy_manager.global_cooldown)
-                else:
-                    time.sleep(0.1)
-
-            except Exception as e:
-                self.log(f"引擎主循环发生错误: {e}")
-                time.sleep(1)
-
-    def _find_spell_to_cast(self, ready_skills):
-        if self.mode_manager.current_mode not in [self.mode_manager.MODE_AOE, self.mode_manager.MODE_SINGLE]:
-            return None, None
-
-        priority_map = {
-            self.mode_manager.MODE_AOE: 'aoe_priority',
-            self.mode_manager.MODE_SINGLE: 'single_target_priority'
-        }
-        priority_list = self.strategy_manager.current_strategy.get(priority_map[self.mode_manager.current_mode], [])
-
-        for spell in priority_list:
-            spell_name = spell['name']
-            if spell_name in ready_skills:
-                bindings = self.strategy_manager.current_strategy.get('bindings', {})
-                keybind = bindings.get(spell['key'], spell['key'])
-                return spell_name, keybind
-        return None, None
-
-    def log(self, message):
-        self.log_queue.put(message)
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
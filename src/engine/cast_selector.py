@@ -0,0 +1,85 @@
+from src.engine.gcd_scheduler import GcdScheduler
+from src.engine.skill_state_tracker import SkillStateTracker
+from src.engine.strategy_compiler import mask_to_bits
+from src.utils.detections import STATE_COOLDOWN
+
+class CastSelector:
+    """
+    决策逻辑：根据一帧的检测结果和当前策略选出要施放的技能。
+
+    引擎主循环和离线模拟器（rotation_simulator）共用这一份逻辑。本类不读取系统时钟，
+    所有时刻都由调用方传入，因此可以在虚拟时钟上以远快于实时的速度运行。
+    """
+
+    def __init__(self, class_table, strategy_manager, scheduler=None, skill_tracker=None, cooldown_estimator=None):
+        self.class_table = class_table
+        self.strategy_manager = strategy_manager
+        self.scheduler = scheduler or GcdScheduler(strategy_manager.global_cooldown, strategy_manager.scheduler_config)
+        self.skill_tracker = skill_tracker or SkillStateTracker(class_table)
+        self.cooldown_estimator = cooldown_estimator
+        self._synced_strategy = None
+        self._synced_mode = None
+
+    def sync(self, mode):
+        """同步策略和模式。两者任一发生变化时，之前按旧的优先级列表推迟的采样立即取消。"""
+        self.sync_strategy()
+        if mode != self._synced_mode:
+            self.scheduler.clear_deferral()
+            self._synced_mode = mode
+
+    def sync_strategy(self):
+        """策略切换后，按新策略的 global_cooldown、scheduler 和 cooldowns 配置重新设置调度器。"""
+        strategy = self.strategy_manager.compiled
+        if strategy is not self._synced_strategy:
+            self.scheduler.configure(self.strategy_manager.global_cooldown, self.strategy_manager.scheduler_config)
+            self.scheduler.clear_deferral()
+            if self.cooldown_estimator is not None:
+                self.cooldown_estimator.set_cooldowns(self.strategy_manager.cooldowns, self.strategy_manager.global_cooldown)
+            self.skill_tracker.set_prior_cooldowns(self.strategy_manager.cooldowns)
+            # 公共冷却转圈引起的短暂“冷却”不应被当作技能的冷却时长
+            self.skill_tracker.min_cooldown = self.strategy_manager.global_cooldown * 1.2
+            self._synced_strategy = strategy
+
+    def select(self, mode, timestamp, detections, now):
+        """
+        :param mode: 当前模式（ModeManager.MODE_AOE / MODE_SINGLE）。
+        :param timestamp: 检测结果对应的帧的时刻。
+        :param now: 做决策的时刻。
+        :return: (spell_name, keybind)，本帧不应施放任何技能时为 (None, None)。
+        """
+        self.sync(mode)
+        self.skill_tracker.observe(timestamp, detections)
+        # 按技能 id 计算剩余冷却，不做任何字符串处理；在法术队列窗口内就能转好的技能也视为可用，提前按键
+        etas = self.class_table.skill_etas(detections)
+        castable = etas <= self.scheduler.spell_queue * 1000.0
+
+        if not castable.any():
+            self._defer_sampling(mode, now)
+            return None, None
+        if not self.scheduler.can_decide(now):
+            return None, None
+        return self._find_spell_to_cast(mode, castable, detections)
+
+    def commit(self, spell, now):
+        """确认施放 select 选出的技能，返回调度器安排的按键发送时刻。"""
+        send_at = self.scheduler.schedule_cast(now)
+        self.skill_tracker.on_cast(self.class_table.skill_id(spell), send_at)
+        return send_at
+
+    def _defer_sampling(self, mode, now):
+        """当前没有可施放的技能: 如果能预测优先级列表中每个技能何时转好，就睡到最早转好的那一个之前。"""
+        skill_ids = self.strategy_manager.compiled.skill_ids(mode)
+        # 有任何一个技能无法预测（未见过、冷却时长未知），tracker 返回 None，继续按 idle_poll 采样
+        ready_at = self.skill_tracker.next_interesting_time(skill_ids)
+        if ready_at is not None:
+            self.scheduler.defer_until(ready_at - self.scheduler.spell_queue, now)
+
+    def _find_spell_to_cast(self, mode, ready_skills, detections):
+        """:param ready_skills: ready_skills[skill_id] 为 True 表示该技能可用（或即将可用）。"""
+        compiled = self.strategy_manager.compiled
+        cooldown_bits = detected_bits = 0
+        if compiled.has_conditions:
+            cooldown_bits = mask_to_bits(self.class_table.detected_skills(detections, STATE_COOLDOWN))
+            detected_bits = mask_to_bits(self.class_table.detected_skills(detections))
+        # 编译好的优先级表上做一次位掩码扫描
+        return compiled.pick(mode, mask_to_bits(ready_skills), cooldown_bits, detected_bits)
@@ -0,0 +1,112 @@
+import numpy as np
+
+from src.utils.detections import STATE_COOLDOWN
+
+class CooldownSweepEstimator:
+    """
+    根据冷却转圈估计技能剩余冷却时间。
+
+    游戏在冷却中的图标上覆盖一层半透明的暗色扇形，从 12 点方向顺时针逐渐缩小：
+    已经过去的部分恢复明亮，剩余的部分仍然偏暗。对每个 _cooldown 检测框，
+    在图标内按极坐标网格（angles 个方向 × radii 个半径）采样亮度，得到沿顺时针方向的
+    亮度曲线，再用“前段亮、后段暗”的阶跃函数拟合，暗段所占的比例即剩余冷却比例。
+    所有检测框的采样和拟合都是一次性向量化完成的。
+
+    剩余比例乘以策略中配置的技能冷却时长（cooldowns）得到 eta_ms；
+    没有配置冷却时长、或者图标内看不出明暗分界（例如刚进入冷却时整个图标都是暗的）时为 NaN。
+
+    公共冷却（GCD）期间每个图标上都有 GCD 的转圈，它的剩余比例乘以技能的完整冷却时长没有意义
+    （60 秒的技能在 GCD 还剩 10% 时会被估计为 6 秒）。因此 GCD 进行中时，与 GCD 剩余比例相符、
+    或者估计值不比 GCD 剩余时间更长的转圈都按 GCD 处理，eta_ms 取 GCD 的剩余时间。
+    """
+
+    def __init__(self, class_table, angles=36, radii=4, min_contrast=0.15, gcd_tolerance=None):
+        """
+        :param class_table: 检测器的 SkillClassTable。
+        :param angles: 沿圆周的采样方向数，决定估计的分辨率（1 / angles）。
+        :param radii: 每个方向上的采样点数，取图标半径的 50%-90%，避开中心的倒计时数字。
+        :param min_contrast: 暗段相对亮段至少要暗这么多（比例），才认为找到了分界。
+        :param gcd_tolerance: 剩余比例与 GCD 的剩余比例相差不超过这个值时视为 GCD 转圈，默认为两个采样方向。
+        """
+        self.class_table = class_table
+        self.angles = angles
+        self.min_contrast = min_contrast
+        self.gcd_tolerance = 2.0 / angles if gcd_tolerance is None else gcd_tolerance
+        self.global_cooldown = None
+        theta = (np.arange(angles) + 0.5) / angles * 2 * np.pi
+        radius = np.linspace(0.5, 0.9, radii)
+        # 相对图标中心、以半宽/半高为单位的采样偏移，形状 (angles, radii)
+        self._dx = np.sin(theta)[:, None] * radius
+        self._dy = -np.cos(theta)[:, None] * radius
+        self.cooldown_ms = np.full(len(class_table.skill_names), np.nan, dtype=np.float32)
+
+    def set_cooldowns(self, cooldowns, global_cooldown=None):
+        """
+        :param cooldowns: 策略中的 {技能名: 冷却秒数}。
+        :param global_cooldown: 策略的 GCD 时长（秒），用于识别 GCD 转圈。
+        """
+        self.global_cooldown = global_cooldown
+        self.cooldown_ms[:] = np.nan
+        for name, seconds in (cooldowns or {}).items():
+            skill_id = self.class_table.skill_id(name)
+            if skill_id >= 0:
+                self.cooldown_ms[skill_id] = float(seconds) * 1000.0
+
+    def remaining_fraction(self, frame, boxes):
+        """
+        估计每个图标的剩余冷却比例。
+
+        :param frame: (H, W, 3) uint8 帧。
+        :param boxes: (N, 4) 的图标框 x1, y1, x2, y2。
+        :return: 长度为 N 的 float32 数组，取值 [0, 1]，无法判断时为 NaN。
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        if len(boxes) == 0:
+            return np.empty(0, dtype=np.float32)
+        cx, cy = (boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2
+        half_w, half_h = (boxes[:, 2] - boxes[:, 0]) / 2, (boxes[:, 3] - boxes[:, 1]) / 2
+        xs = np.clip(cx[:, None, None] + half_w[:, None, None] * self._dx, 0, frame.shape[1] - 1).astype(np.intp)
+        ys = np.clip(cy[:, None, None] + half_h[:, None, None] * self._dy, 0, frame.shape[0] - 1).astype(np.intp)
+        # (N, angles): 每个方向上的平均亮度
+        profile = frame[ys, xs].mean(axis=(2, 3), dtype=np.float32)
+
+        # 对所有分界位置 k（前 k 个方向亮，其余暗）同时计算两段的均值和平方误差
+        k = np.arange(1, self.angles)
+        cumsum = np.cumsum(profile, axis=1)
+        cumsum_sq = np.cumsum(profile * profile, axis=1)
+        total, total_sq = cumsum[:, -1:], cumsum_sq[:, -1:]
+        bright_sum, bright_sq = cumsum[:, :-1], cumsum_sq[:, :-1]
+        dark_sum, dark_sq = total - bright_sum, total_sq - bright_sq
+        bright_mean, dark_mean = bright_sum / k, dark_sum / (self.angles - k)
+        error = (bright_sq - bright_sum * bright_mean) + (dark_sq - dark_sum * dark_mean)
+
+        valid = (bright_mean - dark_mean) >= self.min_contrast * np.maximum(bright_mean, 1.0)
+        error = np.where(valid, error, np.inf)
+        best = error.argmin(axis=1)
+        fraction = (self.angles - k[best]) / self.angles
+        return np.where(np.isfinite(error[np.arange(len(boxes)), best]), fraction, np.nan).astype(np.float32)
+
+    def annotate(self, frame, detections, now=None, gcd_end=None):
+        """
+        为检测结果中处于冷却状态、且配置了冷却时长的技能填写 eta_ms（就地修改）。
+
+        :param now: 帧的时刻；与 gcd_end 一起提供时，GCD 进行中的转圈按 GCD 处理（见类的说明）。
+        :param gcd_end: 调度器预测的 GCD 结束时刻。
+        """
+        class_ids = detections['class_id']
+        skill_ids = self.class_table.skill_ids[class_ids]
+        duration = self.cooldown_ms[skill_ids]
+        rows = np.flatnonzero((self.class_table.states[class_ids] == STATE_COOLDOWN) & ~np.isnan(duration))
+        if not len(rows):
+            return detections
+        fraction = self.remaining_fraction(frame, detections['box'][rows])
+        eta = fraction * duration[rows]
+        gcd_remaining = (gcd_end - now) if now is not None and gcd_end is not None else 0.0
+        if gcd_remaining > 0 and self.global_cooldown:
+            gcd_fraction = min(gcd_remaining / self.global_cooldown, 1.0)
+            gcd_ms = gcd_remaining * 1000.0
+            # 只有明显不是 GCD 转圈、并且比 GCD 剩余时间更长的估计才可信；看不出分界（NaN）时同样按 GCD 处理
+            trusted = (np.abs(fraction - gcd_fraction) > self.gcd_tolerance) & (eta > gcd_ms)
+            eta = np.where(trusted, eta, gcd_ms)
+        detections['eta_ms'][rows] = eta
+        return detections
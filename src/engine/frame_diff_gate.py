@@ -0,0 +1,72 @@
+import numpy as np
+
+class FrameDiffGate:
+    """
+    帧差门控：在 YOLO 推理之前做一次廉价的变化检测。
+
+    把当前帧降采样后与上一次推理时的帧逐块比较，只要没有任何一块的平均差异
+    超过阈值，就认为画面没有变化，调用方可以直接复用上一次的检测结果。
+    与“上一次推理时的帧”而不是“上一帧”比较，这样缓慢累积的变化（如冷却转圈）
+    最终也会触发推理。
+    """
+
+    def __init__(self, threshold=8.0, downsample=4, block_size=8, max_skip_frames=30):
+        """
+        :param threshold: 块平均像素差（0-255）的阈值，超过即视为画面变化。
+        :param downsample: 降采样步长，只比较每 downsample 个像素中的一个。
+        :param block_size: 降采样后每个比较块的边长。
+        :param max_skip_frames: 连续跳过这么多帧后强制推理一次，0 表示不限制。
+        """
+        self.threshold = threshold
+        self.downsample = max(1, downsample)
+        self.block_size = max(1, block_size)
+        self.max_skip_frames = max_skip_frames
+        self._reference = None
+        self._diff = None
+        self._consecutive_skips = 0
+        self.checks = 0
+        self.skips = 0
+
+    @property
+    def skip_rate(self):
+        return self.skips / self.checks if self.checks else 0.0
+
+    def should_infer(self, frame):
+        """判断该帧是否需要重新推理；需要时会把它记为新的参考帧。"""
+        self.checks += 1
+        # 绿色通道的跨步视图足以代表亮度变化，且不产生复制
+        thumb = frame[::self.downsample, ::self.downsample, 1]
+
+        if self._reference is None or self._reference.shape != thumb.shape:
+            self._reference = thumb.copy()
+            self._diff = np.empty(thumb.shape, dtype=np.int16)
+            self._consecutive_skips = 0
+            return True
+
+        np.subtract(thumb, self._reference, out=self._diff, dtype=np.int16)
+        np.abs(self._diff, out=self._diff)
+        if self._max_block_mean(self._diff) > self.threshold or (
+            self.max_skip_frames and self._consecutive_skips >= self.max_skip_frames
+        ):
+            np.copyto(self._reference, thumb)
+            self._consecutive_skips = 0
+            return True
+
+        self._consecutive_skips += 1
+        self.skips += 1
+        return False
+
+    def _max_block_mean(self, diff):
+        b = self.block_size
+        rows, cols = diff.shape[0] // b, diff.shape[1] // b
+        if rows == 0 or cols == 0:
+            return float(diff.mean())
+        blocks = diff[:rows * b, :cols * b].reshape(rows, b, cols, b)
+        return float(blocks.sum(axis=(1, 3)).max()) / (b * b)
+
+    def get_stats(self):
+        return {'checks': self.checks, 'skips': self.skips, 'skip_rate': self.skip_rate}
+
+    def reset(self):
+        self._reference = None
+        self._consecutive_skips = 0
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from src.utils.frame_ring_buffer import FrameRingBuffer
+from src.utils.log_channel import ERROR, log_event
+
+class FrameGrabber(threading.Thread):
+    """后台采集线程：持续从 FrameSource 读取帧并写入预分配的环形缓冲区。"""
+
+    def __init__(self, frame_source, log_queue, slots=3, max_fps=0):
+        super().__init__(name="FrameGrabber", daemon=True)
+        self.frame_source = frame_source
+        self.log_queue = log_queue
+        self.ring = FrameRingBuffer(frame_source.get_frame_shape(), slots)
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self._stop_event = threading.Event()
+        self._paused = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self._paused.is_set():
+                self._stop_event.wait(0.05)
+                continue
+            if self.frame_source.lockstep and not self.ring.wait_consumed(timeout=0.1):
+                continue
+            started = time.perf_counter()
+            slot, buffer = self.ring.acquire_write_slot()
+            try:
+                if self.frame_source.read_into(buffer):
+                    # 以帧数据就绪的时刻作为时间戳（回放来源会在 read_into 中自行等待）
+                    self.ring.commit(slot, time.perf_counter())
+                else:
+                    self._stop_event.wait(0.01)
+            except Exception as e:
+                self.log(ERROR, f"截图线程发生错误: {e}")
+                self._stop_event.wait(1)
+                continue
+
+            remaining = self.min_interval - (time.perf_counter() - started)
+            if remaining > 0:
+                self._stop_event.wait(remaining)
+
+    def get_latest_frame(self, after_seq=0, timeout=None):
+        """返回比 after_seq 更新的最新帧（零拷贝视图），超时返回 None。"""
+        return self.ring.read_latest(after_seq, timeout)
+
+    def release_frame(self):
+        self.ring.release()
+
+    def pause(self):
+        """暂停截图（引擎暂停时调用），线程和缓冲区保持不变。"""
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=2)
+        self.frame_source.cleanup()
+
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
@@ -0,0 +1,91 @@
+import threading
+
+class GcdScheduler:
+    """
+    按公共冷却（GCD）安排采样和按键时机的调度器。
+
+    根据上一次施放的时间预测 GCD 的结束时刻，把时间轴分成三段:
+
+    - GCD 中、尚未进入窗口: 不采样，直接睡到窗口开始；
+    - GCD 结束前 window_ms 内: 每 dense_poll_ms 采样一次，准备下一个技能；
+    - GCD 已结束: 每 idle_poll_ms 采样一次，等待有技能可用。
+
+    决策在窗口内就可以做出，按键则安排在法术队列窗口（GCD 结束前 spell_queue_ms）开始时发送，
+    这样下一个技能能在 GCD 结束的瞬间施放。各项参数可以在策略文件的 scheduler 中配置。
+    所有时间均为 time.perf_counter() 的秒数。
+    """
+
+    DEFAULTS = {
+        'idle_poll_ms': 50,
+        'dense_poll_ms': 0,
+        'window_ms': 150,
+        'spell_queue_ms': 100,
+        'max_defer_ms': 2000,
+    }
+
+    def __init__(self, global_cooldown=1.5, config=None):
+        self._lock = threading.Lock()
+        self.gcd_end = 0.0
+        self.last_cast = None
+        self.last_sample = 0.0
+        self.wake_at = 0.0
+        self.configure(global_cooldown, config)
+
+    def configure(self, global_cooldown, config=None):
+        """设置 GCD 时长和 scheduler 配置（策略切换时调用）。"""
+        config = dict(self.DEFAULTS, **(config or {}))
+        self.global_cooldown = global_cooldown
+        self.idle_poll = config['idle_poll_ms'] / 1000.0
+        self.dense_poll = config['dense_poll_ms'] / 1000.0
+        # 窗口至少要覆盖法术队列窗口，否则决策会晚于应当发送按键的时刻
+        self.spell_queue = min(config['spell_queue_ms'] / 1000.0, global_cooldown)
+        self.window = max(config['window_ms'] / 1000.0, self.spell_queue)
+        self.max_defer = config['max_defer_ms'] / 1000.0
+
+    def next_sample_time(self, now):
+        """返回下一次应当采样（推理）的时刻，不晚于 now 表示应当立即采样。"""
+        gcd_end = self.gcd_end
+        window_start = max(gcd_end, self.wake_at) - self.window
+        if now < window_start:
+            return window_start
+        interval = self.dense_poll if now < gcd_end else self.idle_poll
+        return self.last_sample + interval
+
+    def defer_until(self, ready_at, now):
+        """
+        预计在 ready_at 之前不会有技能可用: 在 ready_at 前的窗口开始之前不再采样。
+
+        预测可能出错（例如技能被重置），因此最多推迟到 now 之后 max_defer 秒，届时重新采样并重新预测。
+        """
+        self.wake_at = min(ready_at, now + self.max_defer)
+
+    def clear_deferral(self):
+        """取消 defer_until，恢复按 GCD 采样（模式或策略切换后，之前的预测不再适用）。"""
+        self.wake_at = 0.0
+
+    def on_sample(self, now):
+        self.last_sample = now
+
+    def can_decide(self, now):
+        """是否已经进入可以选择下一个技能的窗口。"""
+        return now >= self.gcd_end - self.window
+
+    def schedule_cast(self, now):
+        """
+        为即将施放的技能安排发送时刻，并据此预测新的 GCD 结束时刻。
+
+        :return: 应当发送按键的时刻（不早于 now，也不早于法术队列窗口的开始）。
+        """
+        with self._lock:
+            send_at = max(now, self.gcd_end - self.spell_queue)
+            self.wake_at = 0.0
+            # 在法术队列窗口内按下的技能会在当前 GCD 结束时才开始施放
+            self.gcd_end = max(send_at, self.gcd_end) + self.global_cooldown
+            self.last_cast = send_at
+            return send_at
+
+    def reset(self):
+        with self._lock:
+            self.gcd_end = 0.0
+            self.wake_at = 0.0
+            self.last_cast = None
@@ -0,0 +1,194 @@
+import collections
+import threading
+import time
+
+from src.utils.log_channel import ERROR, log_event
+from src.utils.precise_timer import DEFAULT_SPIN_THRESHOLD, sleep_until
+
+PRESS = 'press'
+RELEASE = 'release'
+
+# 一个按键任务: steps 是按时间排列的 (相对 send_at 的秒数, PRESS/RELEASE, 按键)，
+# context 由调用者附带（例如引擎的 CastRequest），generation 用于判断任务是否已被 cancel()
+KeyJob = collections.namedtuple('KeyJob', ['steps', 'send_at', 'enqueued_at', 'context', 'generation'])
+
+
+def parse_keybind(keybind):
+    """把 "shift+1" 这样的组合键拆成 ['shift', '1']，单个按键（包括 "+" 本身）返回只有一项的列表。"""
+    if '+' in keybind.strip('+'):
+        return [key.strip() for key in keybind.split('+')]
+    return [keybind]
+
+
+def chord_steps(keys, hold):
+    """组合键: 依次按下 keys，hold 秒后逆序释放。"""
+    return [(0.0, PRESS, key) for key in keys] + [(hold, RELEASE, key) for key in reversed(keys)]
+
+
+def sequence_steps(keybinds, hold, gap):
+    """按键序列: 依次点按每个按键（可以是组合键），相邻两次之间间隔 gap 秒。"""
+    steps = []
+    offset = 0.0
+    for keybind in keybinds:
+        steps.extend((offset + step_offset, action, key) for step_offset, action, key in chord_steps(parse_keybind(keybind), hold))
+        offset += hold + gap
+    return steps
+
+
+def _percentiles(samples):
+    """样本（秒）的分布，单位毫秒。"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000.0
+    return {'count': len(ordered), 'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': ordered[-1] * 1000.0}
+
+
+class KeystrokeDispatcher(threading.Thread):
+    """
+    按键发送线程。决策线程只把按键任务放入队列就返回，按下、按住和释放都在本线程中完成，不会阻塞检测和决策。
+
+    - 队列是 collections.deque，append / popleft 本身是原子的，提交任务不需要加锁；
+      队列长度有上限，写满时最旧的任务被挤掉（与流水线其他队列一样只保留最新的）；
+    - 每个按下和释放的时刻都用 sleep_until 先睡眠再忙等，误差在亚毫秒级；
+    - 组合键和按键序列作为一个任务提交，用 press_key / release_key 逐步执行；
+    - cancel() 丢弃所有排队的任务并中止正在执行的任务，已经按下的按键会立即释放，不会卡键；
+    - 统计排队延迟（任务应当开始的时刻到实际按下第一个键）和实际按住时长的分布。
+    """
+
+    def __init__(self, keystroke_sender, log_queue, hold=0.05, spin_threshold=DEFAULT_SPIN_THRESHOLD, max_pending=1,
+                 guard=None, on_press=None, sample_size=1024):
+        """
+        :param hold: 每个按键按住的时长（秒）。
+        :param max_pending: 最多排队的任务数。
+        :param guard: 每个任务开始前调用，返回 False 时丢弃该任务（例如引擎已暂停）。
+        :param on_press: 任务的第一个键按下后以 (context, 按下的时刻) 调用，用于统计端到端延迟。
+        :param sample_size: 统计分布时保留的最近样本数。
+        """
+        super().__init__(name="KeystrokeDispatcher", daemon=True)
+        self.keystroke_sender = keystroke_sender
+        self.log_queue = log_queue
+        self.hold = hold
+        self.spin_threshold = spin_threshold
+        self.guard = guard
+        self.on_press = on_press
+        self._jobs = collections.deque(maxlen=max_pending)
+        self._wakeup = threading.Event()
+        self._interrupt = threading.Event()
+        self._closed = threading.Event()
+        self._generation = 0
+        self._queue_delays = collections.deque(maxlen=sample_size)
+        self._press_durations = collections.deque(maxlen=sample_size)
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.cancelled = 0
+        self.keys_pressed = 0
+
+    def submit(self, steps, send_at=None, context=None):
+        """
+        提交一个按键任务，立即返回。
+
+        :param steps: 见 KeyJob，通常由 chord_steps / sequence_steps 生成。
+        :param send_at: 开始执行的 time.perf_counter() 时刻，None 表示立即。
+        """
+        now = time.perf_counter()
+        job = KeyJob(sorted(steps, key=lambda step: step[0]), now if send_at is None else send_at, now, context, self._generation)
+        # 只有一个提交者（决策线程）时计数是准确的；与本线程同时 popleft 时最多多计一次
+        if len(self._jobs) == self._jobs.maxlen:
+            self.dropped += 1
+        self._jobs.append(job)
+        self.submitted += 1
+        self._wakeup.set()
+
+    def send_key(self, keybind, send_at=None, context=None):
+        """点按一个按键或组合键（如 "shift+1"）。"""
+        self.submit(chord_steps(parse_keybind(keybind), self.hold), send_at, context)
+
+    def send_sequence(self, keybinds, send_at=None, gap=0.0, context=None):
+        """把多个按键作为一个任务依次点按。"""
+        self.submit(sequence_steps(keybinds, self.hold, gap), send_at, context)
+
+    def cancel(self):
+        """丢弃排队的任务并中止正在执行的任务（已按下的按键会被释放）。"""
+        self._generation += 1
+        self.cancelled += len(self._jobs)
+        self._jobs.clear()
+        self._interrupt.set()
+
+    def pending(self):
+        return len(self._jobs)
+
+    def close(self, timeout=2):
+        """中止当前任务并结束线程。"""
+        self._closed.set()
+        self.cancel()
+        self._wakeup.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        while not self._closed.is_set():
+            try:
+                job = self._jobs.popleft()
+            except IndexError:
+                self._wakeup.wait(0.5)
+                self._wakeup.clear()
+                continue
+            # 先清除打断标记再检查 generation: 之后发生的 cancel() 仍然能打断这个任务
+            self._interrupt.clear()
+            if job.generation != self._generation:
+                continue
+            if self.guard is not None and not self.guard():
+                self.cancelled += 1
+                continue
+            try:
+                self._execute(job)
+            except Exception as e:
+                self.log(ERROR, f"发送按键时发生错误: {e}")
+
+    def _execute(self, job):
+        pressed = {}
+        started = False
+        base = job.send_at
+        try:
+            for offset, action, key in job.steps:
+                if not sleep_until(base + offset, self.spin_threshold, self._interrupt) or job.generation != self._generation:
+                    self.cancelled += 1
+                    return
+                if not started:
+                    # 后续步骤以实际开始的时刻为准，第一步晚了也不会缩短按住的时长
+                    base = time.perf_counter() - offset
+                if action == PRESS:
+                    self.keystroke_sender.press_key(key)
+                    now = time.perf_counter()
+                    pressed[key] = now
+                    self.keys_pressed += 1
+                    if not started:
+                        started = True
+                        self._queue_delays.append(now - max(job.send_at, job.enqueued_at))
+                        if self.on_press is not None:
+                            self.on_press(job.context, now)
+                else:
+                    self.keystroke_sender.release_key(key)
+                    if key in pressed:
+                        self._press_durations.append(time.perf_counter() - pressed.pop(key))
+            self.completed += 1
+        finally:
+            # 任务被中止或发送出错时，释放所有仍然按下的键
+            for key in reversed(list(pressed)):
+                self.keystroke_sender.release_key(key)
+
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
+
+    def get_stats(self):
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'cancelled': self.cancelled,
+            'keys': self.keys_pressed,
+            'queue_delay_ms': _percentiles(list(self._queue_delays)),
+            'press_ms': _percentiles(list(self._press_durations)),
+        }
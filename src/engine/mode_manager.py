@@ -1,5 +1,6 @@
 from pynput import keyboard
 from src.utils.config_manager import ConfigManager
+from src.utils.log_channel import INFO, WARNING, log_event
 
 class ModeManager:
     MODE_AOE = "aoe"
@@ -26,29 +27,41 @@ class ModeManager:
         if key_name in key_to_mode:
             mode_action = key_to_mode[key_name]
             if mode_action == 'aoe_mode':
-                self.current_mode = self.MODE_AOE
-                self.log(f"切换到AOE模式")
+                self.set_mode(self.MODE_AOE)
             elif mode_action == 'single_target_mode':
-                self.current_mode = self.MODE_SINGLE
-                self.log(f"切换到单体模式")
+                self.set_mode(self.MODE_SINGLE)
             elif mode_action == 'stop_casting':
-                self.current_mode = self.MODE_STOP
-                self.log("停止自动释放技能")
+                self.set_mode(self.MODE_STOP)
+
+    def set_mode(self, mode):
+        """切换模式（热键或 command_queue 的 mode 指令），mode 无效时返回 False。"""
+        if mode == self.MODE_AOE:
+            self.current_mode = self.MODE_AOE
+            self.log(INFO, f"切换到AOE模式")
+        elif mode == self.MODE_SINGLE:
+            self.current_mode = self.MODE_SINGLE
+            self.log(INFO, f"切换到单体模式")
+        elif mode == self.MODE_STOP:
+            self.current_mode = self.MODE_STOP
+            self.log(INFO, "停止自动释放技能")
+        else:
+            return False
+        return True
 
     def start_listener(self):
         if not self.mode_switch_keys:
-            self.log("警告: 未在配置中找到模式切换按键。")
+            self.log(WARNING, "警告: 未在配置中找到模式切换按键。")
             return
         self.listener = keyboard.Listener(on_press=self.on_key_press)
         self.listener.start()
-        self.log("键盘监听器已启动")
+        self.log(INFO, "键盘监听器已启动")
         for mode, key in self.mode_switch_keys.items():
-            self.log(f"按 {key.upper()} 切换到 {mode.replace('_', ' ')}")
+            self.log(INFO, f"按 {key.upper()} 切换到 {mode.replace('_', ' ')}")
 
     def stop_listener(self):
         if self.listener:
             self.listener.stop()
             self.listener = None
 
-    def log(self, message):
-        self.log_queue.put(message)
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
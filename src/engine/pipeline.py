@@ -0,0 +1,46 @@
+import queue
+import threading
+
+from src.utils.log_channel import ERROR, log_event
+
+class PipelineStage(threading.Thread):
+    """
+    流水线中的一个阶段：循环地从输入队列取出数据交给 work 处理，把非 None 的结果放入输出队列。
+
+    没有输入队列的阶段是源阶段，work 不带参数调用（例如从环形缓冲区取最新帧做推理）。
+    各阶段运行在独立的线程中，阶段之间用 DropOldestQueue 连接，
+    因此下游变慢时只会丢掉过时的数据，上游永远不会被阻塞。
+    """
+
+    def __init__(self, name, work, stop_event, log_queue, input_queue=None, output_queue=None, poll_timeout=0.1):
+        super().__init__(name=name, daemon=True)
+        self.work = work
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.poll_timeout = poll_timeout
+        self.log_queue = log_queue
+        self._stop_event = stop_event
+        self.processed = 0
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.input_queue is None:
+                    result = self.work()
+                else:
+                    try:
+                        item = self.input_queue.get(timeout=self.poll_timeout)
+                    except queue.Empty:
+                        continue
+                    result = self.work(item)
+                if result is None and self.input_queue is None:
+                    continue
+                self.processed += 1
+                if result is not None and self.output_queue is not None:
+                    self.output_queue.put(result)
+            except Exception as e:
+                self.log(ERROR, f"流水线阶段 {self.name} 发生错误: {e}")
+                self._stop_event.wait(1)
+
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
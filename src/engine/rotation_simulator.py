@@ -0,0 +1,231 @@
+import bisect
+import collections
+import math
+import time
+
+import numpy as np
+import yaml
+
+from src.engine.cast_selector import CastSelector
+from src.engine.strategy_compiler import PRIORITY_KEYS
+from src.engine.strategy_manager import StrategyManager
+from src.utils.detections import STATE_COOLDOWN, STATE_READY, SkillClassTable, make_detections
+
+# 一次模拟的场景参数:
+#   mode               模式（'aoe' / 'single_target'）
+#   duration           模拟的时长（秒）
+#   frame_interval     帧间隔（秒），只有整数帧的时刻才能采样
+#   inference_latency  从取帧到得到检测结果的耗时（秒）
+#   miss_rate          每个检测框被漏检的概率（仅合成冷却模型）
+#   cooldown_sweep     合成冷却模型是否为冷却中的技能给出 eta_ms（模拟冷却转圈估计）
+#   seed               漏检的随机种子
+Scenario = collections.namedtuple(
+    'Scenario', ['name', 'mode', 'duration', 'frame_interval', 'inference_latency', 'miss_rate', 'cooldown_sweep', 'seed'],
+    defaults=('single_target', 300.0, 1 / 60, 0.01, 0.0, False, 0)
+)
+
+# 游戏允许提前按下下一个技能的法术队列窗口（秒）
+GAME_SPELL_QUEUE = 0.4
+
+
+class _CollectLog:
+    """收集 StrategyManager 的日志，模拟时不输出。"""
+
+    def __init__(self):
+        self.messages = []
+
+    def put(self, message):
+        self.messages.append(message)
+
+
+def strategy_class_table(strategy):
+    """为没有模型的模拟构造类别表: 策略中出现的每个技能都有 _ready 和 _cooldown 两个类别。"""
+    skills = []
+    for key in PRIORITY_KEYS.values():
+        for spell in strategy.get(key, []) or []:
+            if spell.get('name') not in skills:
+                skills.append(spell.get('name'))
+    for name in strategy.get('cooldowns', {}) or {}:
+        if name not in skills:
+            skills.append(name)
+    return SkillClassTable([f"{skill}_{state}" for skill in skills for state in ('ready', 'cooldown')])
+
+
+class SyntheticCooldownModel:
+    """
+    合成的检测结果来源: 按策略的 cooldowns 模拟每个技能的冷却，生成与模型输出相同格式的检测结果。
+
+    没有配置冷却时长的技能只受公共冷却限制。按下冷却中的技能不会生效（由 press 返回 False）。
+    """
+
+    def __init__(self, class_table, cooldowns, miss_rate=0.0, cooldown_sweep=False, seed=0):
+        self.class_table = class_table
+        self.miss_rate = miss_rate
+        self.cooldown_sweep = cooldown_sweep
+        self.rng = np.random.default_rng(seed)
+        n = len(class_table.skill_names)
+        self.cooldowns = np.zeros(n)
+        for name, seconds in (cooldowns or {}).items():
+            skill_id = class_table.skill_id(name)
+            if skill_id >= 0:
+                self.cooldowns[skill_id] = float(seconds)
+        self.ready_at = np.zeros(n)
+        self.ready_class = np.array([class_table.class_id(i, STATE_READY) for i in range(n)], dtype=np.int32)
+        self.cooldown_class = np.array([class_table.class_id(i, STATE_COOLDOWN) for i in range(n)], dtype=np.int32)
+        # 每个技能一个固定的图标位置
+        self.boxes = np.array([[i * 40, 0, i * 40 + 36, 36] for i in range(n)], dtype=np.int32).reshape(-1, 4)
+
+    def detections(self, now):
+        cooling = self.ready_at > now
+        class_ids = np.where(cooling, self.cooldown_class, self.ready_class)
+        visible = class_ids >= 0
+        if self.miss_rate > 0:
+            visible &= self.rng.random(len(class_ids)) >= self.miss_rate
+        detections = make_detections(class_ids[visible], np.ones(int(visible.sum()), dtype=np.float32), self.boxes[visible])
+        if self.cooldown_sweep:
+            eta = (self.ready_at[visible] - now) * 1000.0
+            detections['eta_ms'] = np.where(cooling[visible], eta, np.nan)
+        return detections
+
+    def press(self, skill_id, cast_time):
+        if skill_id < 0 or self.ready_at[skill_id] > cast_time + 1e-9:
+            return False
+        self.ready_at[skill_id] = cast_time + self.cooldowns[skill_id]
+        return True
+
+
+class RecordedDetections:
+    """回放录制的逐帧检测结果（见 detection_stream）。按键不会影响回放的内容（开环）。"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.class_table = SkillClassTable(stream.labels)
+        self.times = (stream.timestamps - stream.timestamps[0]).tolist()
+
+    def detections(self, now):
+        index = max(bisect.bisect_right(self.times, now) - 1, 0)
+        return self.stream[index]
+
+    def press(self, skill_id, cast_time):
+        return True
+
+
+class RotationSimulator:
+    """
+    在虚拟时钟上运行引擎的决策逻辑（CastSelector + GcdScheduler + StrategyManager 编译好的策略）。
+
+    只在调度器要求采样的帧上生成检测结果，GCD 和冷却期间直接跳过，因此比实时快几千倍。
+    模拟器同时扮演游戏: 按键在法术队列窗口之外按下、或技能仍在冷却时不会生效，
+    GCD 结束后没有技能施放的时间记为空闲。
+    """
+
+    def __init__(self, strategy_manager, class_table, source, scenario):
+        self.strategy_manager = strategy_manager
+        self.class_table = class_table
+        self.source = source
+        self.scenario = scenario
+        self.selector = CastSelector(class_table, strategy_manager)
+
+    def run(self):
+        scenario = self.scenario
+        scheduler = self.selector.scheduler
+        self.selector.sync_strategy()
+        global_cooldown = self.strategy_manager.global_cooldown
+        frame_interval = scenario.frame_interval
+
+        casts = collections.Counter()
+        rejected = collections.Counter()
+        pending = collections.deque()
+        latencies = []
+        game = {'gcd_end': 0.0, 'idle': 0.0}
+
+        def press(send_at, spell):
+            if send_at < game['gcd_end'] - GAME_SPELL_QUEUE:
+                rejected['early'] += 1
+                return
+            cast_time = max(send_at, game['gcd_end'])
+            if cast_time >= scenario.duration:
+                return
+            if not self.source.press(self.class_table.skill_id(spell), cast_time):
+                rejected['cooldown'] += 1
+                return
+            game['idle'] += cast_time - game['gcd_end']
+            game['gcd_end'] = cast_time + global_cooldown
+            casts[spell] += 1
+
+        started = time.perf_counter()
+        frame = 0
+        while frame * frame_interval < scenario.duration:
+            now = frame * frame_interval
+            sample_at = scheduler.next_sample_time(now)
+            if sample_at > now:
+                frame = max(frame + 1, math.ceil(sample_at / frame_interval - 1e-9))
+                continue
+            while pending and pending[0][0] <= now:
+                press(*pending.popleft())
+
+            scheduler.on_sample(now)
+            detections = self.source.detections(now)
+            decided_at = now + scenario.inference_latency
+            decision_started = time.perf_counter()
+            spell, keybind = self.selector.select(scenario.mode, now, detections, decided_at)
+            if spell and keybind:
+                pending.append((self.selector.commit(spell, decided_at), spell))
+            latencies.append(time.perf_counter() - decision_started)
+            # 推理阶段处理完这一帧之前不会取下一帧
+            frame = max(frame + 1, math.ceil(decided_at / frame_interval - 1e-9))
+
+        while pending:
+            press(*pending.popleft())
+        game['idle'] += max(scenario.duration - game['gcd_end'], 0.0)
+        wall_time = time.perf_counter() - started
+
+        latencies = np.array(latencies) * 1e6
+        return {
+            'scenario': scenario.name,
+            'mode': scenario.mode,
+            'casts': dict(casts),
+            'total_casts': sum(casts.values()),
+            'rejected': dict(rejected),
+            'idle_time': game['idle'],
+            'idle_gcds': game['idle'] / global_cooldown,
+            'decisions': len(latencies),
+            'decision_us_mean': float(latencies.mean()) if len(latencies) else 0.0,
+            'decision_us_p99': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            'simulated_seconds': scenario.duration,
+            'wall_seconds': wall_time,
+            'speedup': scenario.duration / wall_time if wall_time > 0 else float('inf'),
+        }
+
+
+def load_strategy_manager(strategy_path, class_table):
+    """加载并编译一个策略文件，失败时抛出 ValueError（附带 StrategyManager 的日志）。"""
+    log = _CollectLog()
+    # 不读取当前目录下的 config.yaml，只加载要模拟的策略
+    strategy_manager = StrategyManager(log, class_table, load_initial=False)
+    if not strategy_manager.load_strategy(strategy_path):
+        raise ValueError(log.messages[-1])
+    return strategy_manager
+
+
+def simulate_strategy(strategy_path, scenario, stream=None):
+    """
+    对一个策略文件运行一次模拟，可以在工作进程中调用。
+
+    :param stream: DetectionStream，提供时回放录制的检测结果，否则使用合成冷却模型。
+    :return: RotationSimulator.run() 的结果，附加 'strategy' 字段。
+    """
+    if stream is not None:
+        source = RecordedDetections(stream)
+        class_table = source.class_table
+        strategy_manager = load_strategy_manager(strategy_path, class_table)
+    else:
+        with open(strategy_path, 'r', encoding='utf-8') as f:
+            class_table = strategy_class_table(yaml.safe_load(f) or {})
+        strategy_manager = load_strategy_manager(strategy_path, class_table)
+        source = SyntheticCooldownModel(
+            class_table, strategy_manager.cooldowns, scenario.miss_rate, scenario.cooldown_sweep, scenario.seed
+        )
+    result = RotationSimulator(strategy_manager, class_table, source, scenario).run()
+    result['strategy'] = strategy_path
+    return result
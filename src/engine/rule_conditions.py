@@ -0,0 +1,106 @@
+import re
+
+# 条件语言:
+#   expr  := term ('or' term)*
+#   term  := factor ('and' factor)*
+#   factor:= 'not' factor | '(' expr ')' | 'true' | 'false' | FUNC '(' NAME ')'
+#   FUNC  := ready | cooldown | detected
+# 例如: "cooldown(pillar_of_frost) and not detected(rime)"
+#
+# 条件在加载策略时编译成一个 Python 函数 predicate(ready_bits, cooldown_bits, detected_bits)，
+# 每个原子条件都是对位掩码的一次按位与，整条规则只有一次函数调用的开销。
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|([A-Za-z_][A-Za-z0-9_]*))')
+
+# 原子条件 -> predicate 的参数名
+FUNCTIONS = {
+    'ready': 'r',
+    'cooldown': 'c',
+    'detected': 'd',
+}
+
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise ValueError(f"无法解析的字符 '{text[position]}' (位置 {position})")
+        tokens.append(match.group(match.lastindex))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """递归下降解析，直接生成 Python 表达式源码"""
+
+    def __init__(self, tokens, resolve):
+        self.tokens = tokens
+        self.position = 0
+        self.resolve = resolve
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"期望 '{expected or '表达式'}'，实际为 '{token or '结尾'}'")
+        self.position += 1
+        return token
+
+    def parse(self):
+        source = self.expr()
+        if self.peek() is not None:
+            raise ValueError(f"多余的内容 '{self.peek()}'")
+        return source
+
+    def expr(self):
+        parts = [self.term()]
+        while self.peek() == 'or':
+            self.take()
+            parts.append(self.term())
+        return parts[0] if len(parts) == 1 else '(' + ' or '.join(parts) + ')'
+
+    def term(self):
+        parts = [self.factor()]
+        while self.peek() == 'and':
+            self.take()
+            parts.append(self.factor())
+        return parts[0] if len(parts) == 1 else '(' + ' and '.join(parts) + ')'
+
+    def factor(self):
+        token = self.take()
+        if token == 'not':
+            return f'(not {self.factor()})'
+        if token == '(':
+            source = self.expr()
+            self.take(')')
+            return source
+        if token in ('true', 'false'):
+            return 'True' if token == 'true' else 'False'
+        if token in FUNCTIONS:
+            self.take('(')
+            name = self.take()
+            if name in ('(', ')'):
+                raise ValueError(f"{token}() 需要一个技能名")
+            self.take(')')
+            return f'({FUNCTIONS[token]} & {self.resolve(name)})'
+        raise ValueError(f"未知的条件 '{token}'")
+
+
+def compile_condition(text, skill_bit):
+    """
+    把条件文本编译为 predicate(ready_bits, cooldown_bits, detected_bits) -> bool。
+
+    :param text: 条件文本。
+    :param skill_bit: 技能名 -> 位掩码的函数，技能不存在时应返回 0（条件恒为假）。
+    :raises ValueError: 条件有语法错误。
+    """
+    source = _Parser(_tokenize(str(text)), skill_bit).parse()
+    # 源码只由解析器生成（关键字、括号和整数常量），不包含任何用户输入的原文
+    predicate = eval(compile(f'lambda r, c, d: bool({source})', '<condition>', 'eval'), {'__builtins__': {'bool': bool}})
+    predicate.source = text
+    return predicate
@@ -0,0 +1,134 @@
+import collections
+
+import numpy as np
+
+from src.utils.detections import STATE_COOLDOWN, STATE_READY, STATE_UNKNOWN
+
+Transition = collections.namedtuple('Transition', ['timestamp', 'skill', 'old_state', 'new_state'])
+
+
+class SkillStateTracker:
+    """
+    按技能 id 跟踪每个技能的状态，并预测它什么时候转好。
+
+    由检测结果和发出的按键驱动:
+    - 记录每个技能的状态转换（可用 <-> 冷却）；
+    - 技能从可用变为冷却时，如果不久前刚按过它的按键，以按键时刻作为冷却的开始；
+    - 冷却结束时，用观测到的冷却时长更新该技能学到的冷却时长（指数平滑），
+      短于 min_cooldown 的转换（例如公共冷却转圈）不参与学习；
+    - 冷却中的技能按 “冷却开始 + 学到的冷却时长” 预测转好的时刻，
+      检测结果中带有 eta_ms（冷却转圈估计）时以它为准。
+
+    主循环在没有可施放的技能时询问 next_interesting_time，在那之前不必再做推理。
+    所有时间均为 time.perf_counter() 的秒数。
+    """
+
+    def __init__(self, class_table, smoothing=0.3, cast_window=1.0, min_cooldown=0.0, history=256):
+        """
+        :param class_table: 检测器的 SkillClassTable。
+        :param smoothing: 学习冷却时长时新观测值的权重。
+        :param cast_window: 按键后这么久内进入冷却，才认为冷却是由这次按键触发的（秒）。
+        :param min_cooldown: 短于该时长的冷却不参与学习（秒），通常设为略大于公共冷却。
+        :param history: 保留最近多少条状态转换记录。
+        """
+        self.class_table = class_table
+        self.smoothing = smoothing
+        self.cast_window = cast_window
+        self.min_cooldown = min_cooldown
+        n = len(class_table.skill_names)
+        self.state = np.full(n, STATE_UNKNOWN, dtype=np.int8)
+        self.last_seen = np.full(n, np.nan)
+        self.last_cast = np.full(n, np.nan)
+        self.cooldown_started = np.full(n, np.nan)
+        self.prior_cooldown = np.full(n, np.nan)
+        self.learned_cooldown = np.full(n, np.nan)
+        self.predicted_ready = np.full(n, np.nan)
+        self.transitions = collections.deque(maxlen=history)
+        self.transition_count = 0
+
+    def set_prior_cooldowns(self, cooldowns):
+        """用策略中配置的 {技能名: 冷却秒数} 作为还没学到冷却时长时的先验。"""
+        self.prior_cooldown[:] = np.nan
+        for name, seconds in (cooldowns or {}).items():
+            skill_id = self.class_table.skill_id(name)
+            if skill_id >= 0:
+                self.prior_cooldown[skill_id] = float(seconds)
+
+    def cooldown_of(self, skill_id):
+        """返回技能的冷却时长：学到的值优先，其次是先验，未知时为 NaN。"""
+        learned = self.learned_cooldown[skill_id]
+        return learned if not np.isnan(learned) else self.prior_cooldown[skill_id]
+
+    def _cooldowns(self):
+        return np.where(np.isnan(self.learned_cooldown), self.prior_cooldown, self.learned_cooldown)
+
+    def on_cast(self, skill_id, timestamp):
+        """记录一次按键。预测该技能在 “按键时刻 + 冷却时长” 转好。"""
+        if skill_id < 0:
+            return
+        self.last_cast[skill_id] = timestamp
+        self.predicted_ready[skill_id] = timestamp + self.cooldown_of(skill_id)
+
+    def observe(self, timestamp, detections):
+        """用一帧的检测结果更新各技能的状态。"""
+        class_ids = detections['class_id']
+        states = self.class_table.states[class_ids]
+        known = states != STATE_UNKNOWN
+        skills = self.class_table.skill_ids[class_ids[known]]
+        # 同一技能同时检测到两种状态时以可用为准（STATE_READY < STATE_COOLDOWN）
+        new_state = np.full(len(self.state), np.iinfo(np.int8).max, dtype=np.int8)
+        np.minimum.at(new_state, skills, states[known])
+        observed = new_state != np.iinfo(np.int8).max
+        old_state = self.state.copy()
+        changed = observed & (new_state != old_state)
+
+        # 冷却 -> 可用：学习冷却时长
+        became_ready = changed & (new_state == STATE_READY)
+        finished = became_ready & (old_state == STATE_COOLDOWN) & ~np.isnan(self.cooldown_started)
+        durations = timestamp - self.cooldown_started
+        learn = finished & (durations >= self.min_cooldown)
+        self.learned_cooldown[learn] = np.where(
+            np.isnan(self.learned_cooldown[learn]),
+            durations[learn],
+            self.learned_cooldown[learn] * (1 - self.smoothing) + durations[learn] * self.smoothing,
+        )
+        self.cooldown_started[became_ready] = np.nan
+        self.predicted_ready[observed & (new_state == STATE_READY)] = timestamp
+
+        # 可用 -> 冷却：确定冷却开始的时刻
+        became_cooldown = changed & (new_state == STATE_COOLDOWN)
+        recently_cast = (timestamp - self.last_cast) <= self.cast_window
+        started = np.where(recently_cast, self.last_cast, timestamp)
+        from_ready = became_cooldown & (old_state == STATE_READY)
+        self.cooldown_started[from_ready] = started[from_ready]
+        self.predicted_ready[from_ready] = started[from_ready] + self._cooldowns()[from_ready]
+
+        # 冷却转圈的估计比学到的时长更准
+        eta_rows = known & ~np.isnan(detections['eta_ms']) & (states == STATE_COOLDOWN)
+        eta_skills = self.class_table.skill_ids[class_ids[eta_rows]]
+        self.predicted_ready[eta_skills] = timestamp + detections['eta_ms'][eta_rows] / 1000.0
+
+        self.state[observed] = new_state[observed]
+        self.last_seen[observed] = timestamp
+        for skill_id in np.flatnonzero(changed).tolist():
+            self.transitions.append(Transition(timestamp, skill_id, int(old_state[skill_id]), int(new_state[skill_id])))
+        self.transition_count += int(changed.sum())
+
+    def next_interesting_time(self, skill_ids):
+        """
+        返回给定技能中最早转好的预测时刻。
+
+        :return: 时刻（秒），任何一个技能的状态或冷却时长未知时返回 None，表示无法预测、应继续采样。
+        """
+        if len(skill_ids) == 0:
+            return None
+        predicted = self.predicted_ready[skill_ids]
+        if np.isnan(predicted).any():
+            return None
+        return float(predicted.min())
+
+    def get_stats(self):
+        return {
+            'transitions': self.transition_count,
+            'learned_cooldowns': int((~np.isnan(self.learned_cooldown)).sum()),
+        }
@@ -0,0 +1,106 @@
+from collections import namedtuple
+
+import numpy as np
+
+from src.engine.rule_conditions import compile_condition
+from src.utils.detections import STATE_READY
+
+# 模式（与 ModeManager.MODE_AOE / MODE_SINGLE 的取值一致）-> 策略文件中的优先级列表
+PRIORITY_KEYS = {
+    'aoe': 'aoe_priority',
+    'single_target': 'single_target_priority',
+}
+
+# 一个模式下编译后的优先级表，按优先级从高到低排列:
+# skill_ids 为技能 id 数组，bits 为对应的 1 << skill_id，spells / keybinds 为技能名和解析好的实际按键，
+# conditions 为编译好的条件（见 rule_conditions），没有条件的技能为 None
+CompiledPriority = namedtuple('CompiledPriority', ['skill_ids', 'bits', 'spells', 'keybinds', 'conditions'])
+
+
+def mask_to_bits(mask):
+    """把按技能 id 排列的布尔数组转换为整数位掩码（第 i 位对应技能 id i）。"""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+class CompiledStrategy:
+    """
+    编译后的策略：每个模式一张整数索引的优先级表，热路径上只需对位掩码做一次扫描。
+
+    策略文件在加载时编译一次: 技能名按模型类别解析为技能 id，按键通过 bindings 解析为实际按键，
+    模型中不存在（或没有 _ready 类别）的技能会在加载时报告并从优先级表中剔除。
+    """
+
+    def __init__(self, priorities, unknown_spells):
+        self.priorities = priorities
+        self.unknown_spells = unknown_spells
+        self.has_conditions = any(
+            condition is not None for priority in priorities.values() for condition in priority.conditions
+        )
+
+    def skill_ids(self, mode):
+        priority = self.priorities.get(mode)
+        return priority.skill_ids if priority is not None else np.empty(0, dtype=np.int32)
+
+    def pick(self, mode, ready_bits, cooldown_bits=0, detected_bits=0):
+        """
+        返回 mode 下优先级最高的、可用且满足条件的技能 (spell_name, keybind)，没有时返回 (None, None)。
+
+        :param ready_bits: 可用技能的位掩码，见 mask_to_bits。
+        :param cooldown_bits: 冷却中技能的位掩码，供条件使用。
+        :param detected_bits: 检测到的技能（包括没有状态后缀的类别，如触发效果）的位掩码，供条件使用。
+        """
+        priority = self.priorities.get(mode)
+        if priority is None or not ready_bits:
+            return None, None
+        for i, bit in enumerate(priority.bits):
+            if ready_bits & bit:
+                condition = priority.conditions[i]
+                if condition is None or condition(ready_bits, cooldown_bits, detected_bits):
+                    return priority.spells[i], priority.keybinds[i]
+        return None, None
+
+
+def compile_strategy(strategy, class_table):
+    """
+    编译策略文件的内容。
+
+    :param strategy: 解析后的策略 YAML。
+    :param class_table: 检测器的 SkillClassTable，用于校验技能名。
+    :return: CompiledStrategy
+    """
+    bindings = strategy.get('bindings', {}) or {}
+    unknown = []
+    priorities = {}
+
+    def skill_bit(name):
+        skill_id = class_table.skill_id(name)
+        if skill_id < 0:
+            if name not in unknown:
+                unknown.append(name)
+            return 0
+        return 1 << skill_id
+
+    for mode, key in PRIORITY_KEYS.items():
+        skill_ids, spells, keybinds, conditions = [], [], [], []
+        for spell in strategy.get(key, []) or []:
+            name = spell.get('name')
+            skill_id = class_table.skill_id(name)
+            if skill_id < 0 or class_table.class_id(skill_id, STATE_READY) < 0:
+                if name not in unknown:
+                    unknown.append(name)
+                continue
+            condition = spell.get('condition')
+            if condition is not None:
+                try:
+                    condition = compile_condition(condition, skill_bit)
+                except ValueError as e:
+                    raise ValueError(f"技能 {name} 的条件 '{spell['condition']}' 无效: {e}")
+            skill_ids.append(skill_id)
+            spells.append(name)
+            keybinds.append(bindings.get(spell['key'], spell['key']))
+            conditions.append(condition)
+        priorities[mode] = CompiledPriority(
+            np.array(skill_ids, dtype=np.int32), tuple(1 << skill_id for skill_id in skill_ids), tuple(spells),
+            tuple(keybinds), tuple(conditions)
+        )
+    return CompiledStrategy(priorities, unknown)
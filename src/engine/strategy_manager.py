@@ -1,36 +1,85 @@
 import yaml
 import os
+from collections import namedtuple
+from src.engine.strategy_compiler import compile_strategy
 from src.utils.config_manager import ConfigManager
+from src.utils.log_channel import ERROR, INFO, WARNING, log_event
+
+# 解析并编译好、还没有生效的策略。由 prepare_strategy 生成，apply_strategy 一次性替换所有字段
+PreparedStrategy = namedtuple(
+    'PreparedStrategy', ['path', 'mtime', 'strategy', 'global_cooldown', 'scheduler_config', 'cooldowns', 'compiled']
+)
 
 class StrategyManager:
-    def __init__(self, log_queue):
+    def __init__(self, log_queue, class_table=None, load_initial=True):
+        """
+        :param class_table: 检测器的 SkillClassTable。提供时，加载策略会同时把它编译为优先级表（见 compile_strategy）。
+        :param load_initial: 为 False 时不读取 config.yaml，也不加载其中的 current_strategy，由调用者自行 load_strategy。
+        """
         self.log_queue = log_queue
-        self.config_manager = ConfigManager()
-        self.config = self.config_manager.get_config()
+        self.class_table = class_table
+        self.compiled = None
+        self.config_manager = ConfigManager() if load_initial else None
+        self.config = self.config_manager.get_config() if load_initial else {}
         self.current_strategy = {}
+        self.strategy_path = None
+        self.strategy_mtime = None
         self.global_cooldown = 1.5
-        self._load_initial_strategy()
+        self.scheduler_config = {}
+        self.cooldowns = {}
+        if load_initial:
+            self._load_initial_strategy()
 
     def _load_initial_strategy(self):
         strategy_path = self.config.get('current_strategy')
         if not strategy_path or not os.path.exists(strategy_path):
-            self.log(f"警告: 未在 config.yaml 中找到有效策略路径，或文件不存在。")
-            self.log("请在UI中加载一个策略。")
+            self.log(WARNING, f"警告: 未在 config.yaml 中找到有效策略路径，或文件不存在。")
+            self.log(WARNING, "请在UI中加载一个策略。")
             return
         self.load_strategy(strategy_path)
 
     def load_strategy(self, strategy_path):
         try:
-            with open(strategy_path, 'r', encoding='utf-8') as f:
-                self.current_strategy = yaml.safe_load(f)
-            self.log(f"已加载策略: {self.current_strategy.get('name', os.path.basename(strategy_path))}")
-            self.global_cooldown = self.current_strategy.get('global_cooldown', 1.5)
-            self.log(f"全局冷却时间设置为: {self.global_cooldown}秒")
+            self.apply_strategy(self.prepare_strategy(strategy_path))
             return True
         except Exception as e:
-            self.log(f"加载策略 '{strategy_path}' 失败: {e}")
+            self.log(ERROR, f"加载策略 '{strategy_path}' 失败: {e}")
             self.current_strategy = {}
+            self.compiled = None
             return False
 
-    def log(self, message):
-        self.log_queue.put(message)
+    def prepare_strategy(self, strategy_path):
+        """
+        读取、解析并编译策略文件，但不修改当前生效的策略。耗时的工作都在这里完成，可以在后台线程中调用。
+
+        :raises Exception: 文件无法读取、解析或编译失败。
+        """
+        mtime = os.path.getmtime(strategy_path)
+        with open(strategy_path, 'r', encoding='utf-8') as f:
+            strategy = yaml.safe_load(f)
+        if not isinstance(strategy, dict):
+            raise ValueError("策略文件的内容不是一个字典")
+        compiled = compile_strategy(strategy, self.class_table) if self.class_table is not None else None
+        return PreparedStrategy(
+            strategy_path, mtime, strategy, strategy.get('global_cooldown', 1.5),
+            strategy.get('scheduler', {}) or {}, strategy.get('cooldowns', {}) or {}, compiled
+        )
+
+    def apply_strategy(self, prepared):
+        """让 prepare_strategy 的结果生效。只做属性赋值，应在决策线程的两次决策之间调用。"""
+        self.current_strategy = prepared.strategy
+        self.strategy_path = prepared.path
+        self.strategy_mtime = prepared.mtime
+        self.global_cooldown = prepared.global_cooldown
+        self.scheduler_config = prepared.scheduler_config
+        self.cooldowns = prepared.cooldowns
+        # 主循环按 compiled 的身份判断策略是否切换，最后替换
+        self.compiled = prepared.compiled
+        self.log(INFO, f"已加载策略: {prepared.strategy.get('name', os.path.basename(prepared.path))}")
+        self.log(INFO, f"全局冷却时间设置为: {self.global_cooldown}秒")
+        if self.compiled is not None and self.compiled.unknown_spells:
+            self.log(WARNING, f"警告: 以下技能不在模型的类别中: {', '.join(map(str, self.compiled.unknown_spells))}"
+                     "（优先级列表中的这些技能不会被施放，条件中引用它们时视为未检测到）")
+
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
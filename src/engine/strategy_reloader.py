@@ -0,0 +1,94 @@
+import os
+import queue
+import threading
+
+from src.utils.drop_queue import DropOldestQueue
+from src.utils.log_channel import ERROR, INFO, WARNING, log_event
+
+class StrategyReloader(threading.Thread):
+    """
+    策略热加载线程：在不重启引擎、不重新加载模型的情况下让修改后的策略生效。
+
+    两种触发方式:
+    - request_reload(): 例如 GUI 保存策略后通过 command_queue 发来的 reload 指令；
+    - 监视当前策略文件的修改时间（watch_files 为 True 时），文件被外部编辑器保存后自动重新加载。
+
+    读取、解析和编译都在本线程中完成，结果放入只保留最新一份的待生效槽位；
+    主循环在两次决策之间调用 apply_pending()，只做一次属性替换，检测不会因此暂停。
+    新策略加载失败时保留正在使用的策略。
+    """
+
+    def __init__(self, strategy_manager, stop_event, log_queue, watch_files=True, poll_interval=1.0):
+        super().__init__(name="StrategyReloader", daemon=True)
+        self.strategy_manager = strategy_manager
+        self.log_queue = log_queue
+        self.watch_files = watch_files
+        self.poll_interval = poll_interval
+        self._stop_event = stop_event
+        self._requests = DropOldestQueue(1)
+        self._pending = DropOldestQueue(1)
+        self._last_mtime = strategy_manager.strategy_mtime
+        self.reload_count = 0
+
+    def request_reload(self, strategy_path=None):
+        """请求重新加载策略，strategy_path 为 None 时重新加载当前的策略文件。"""
+        self._requests.put(strategy_path)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                strategy_path = self._requests.get(timeout=self.poll_interval)
+            except queue.Empty:
+                strategy_path = self._changed_strategy_path()
+                if strategy_path is None:
+                    continue
+            strategy_path = strategy_path or self.strategy_manager.strategy_path
+            if not strategy_path:
+                self.log(WARNING, "热加载: 当前没有策略文件，忽略重新加载请求")
+                continue
+            self._prepare(strategy_path)
+
+    def _changed_strategy_path(self):
+        strategy_path = self.strategy_manager.strategy_path
+        if not self.watch_files or not strategy_path:
+            return None
+        try:
+            mtime = os.path.getmtime(strategy_path)
+        except OSError:
+            return None
+        if self._last_mtime is None or mtime == self._last_mtime:
+            self._last_mtime = mtime
+            return None
+        return strategy_path
+
+    def _prepare(self, strategy_path):
+        try:
+            prepared = self.strategy_manager.prepare_strategy(strategy_path)
+        except Exception as e:
+            # 编辑器保存到一半时也可能读到不完整的文件，下次修改时会再试
+            self._last_mtime = self._mtime_or_none(strategy_path)
+            self.log(ERROR, f"热加载策略 '{strategy_path}' 失败，继续使用当前策略: {e}")
+            return
+        self._last_mtime = prepared.mtime
+        self._pending.put(prepared)
+
+    @staticmethod
+    def _mtime_or_none(strategy_path):
+        try:
+            return os.path.getmtime(strategy_path)
+        except OSError:
+            return None
+
+    def apply_pending(self):
+        """在决策线程中调用：有准备好的新策略时让它生效，返回是否替换了策略。"""
+        try:
+            prepared = self._pending.get(timeout=0)
+        except queue.Empty:
+            return False
+        self.strategy_manager.apply_strategy(prepared)
+        self.reload_count += 1
+        self.log(INFO, "热加载: 新策略已生效")
+        return True
+
+    def log(self, level, message):
+        self.log_queue.put(log_event(level, message))
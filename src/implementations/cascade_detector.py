@@ -0,0 +1,222 @@
+import os
+
+import numpy as np
+from src.utils.detection_cache import DetectionCache, perceptual_hashes
+from src.utils.detections import STATE_UNKNOWN, STATES, empty_detections, make_detections
+
+class CascadeDetector:
+    """
+    级联技能检测器：先用模板和直方图统计对每个技能槽位做廉价分类，
+    只有匹配结果不明确的槽位，或者到了周期性复核的时刻，才回退到完整的 YOLO 模型。
+
+    槽位位置来自技能栏校准（见 ActionBarCalibrator）。模板在运行中自学习：
+    每当 YOLO 以足够高的置信度确认了某个槽位的状态，就把该槽位的缩略图记为
+    对应状态的模板，并保存到 templates_dir 以便下次启动时复用。
+    每个槽位的分类结果还按缩略图的感知哈希缓存，只有哈希未命中的槽位才需要重新分类，
+    因此一个槽位的变化（如触发特效）不会迫使其他槽位重新分类。
+    detect 的输出与 YoloDetector.detect 相同，为 DETECTION_DTYPE 结构化数组。
+    """
+
+    STATES = STATES
+    HISTOGRAM_BINS = 16
+
+    def __init__(self, yolo_detector, slot_boxes, config=None, templates_dir=None):
+        """
+        :param yolo_detector: 回退使用的 YoloDetector。
+        :param slot_boxes: 相对于截图区域的槽位 [(name, (x1, y1, x2, y2)), ...]。
+        :param config: config.yaml 中的 cascade_detector 配置。
+        :param templates_dir: 模板的保存目录，None 表示不持久化。
+        """
+        config = config or {}
+        self.yolo_detector = yolo_detector
+        self.class_table = yolo_detector.class_table
+        self.names = [name for name, _ in slot_boxes]
+        self.boxes = np.array([box for _, box in slot_boxes], dtype=np.int32).reshape(-1, 4)
+        self.thumb_size = config.get('thumb_size', 16)
+        self.max_score = config.get('max_score', 0.25)
+        self.min_margin = config.get('min_margin', 0.05)
+        self.revalidate_every = config.get('revalidate_every', 30)
+        self.learn_confidence = config.get('learn_confidence', 0.8)
+        self.templates_dir = templates_dir
+        cache_size = config.get('cache_size', 256)
+        self.cache = DetectionCache(cache_size) if cache_size else None
+
+        # 为所有槽位预先计算缩略图的采样坐标，一次花式索引即可得到 (S, N, N, 3) 的缩略图
+        n = self.thumb_size
+        steps = (np.arange(n) + 0.5) / n
+        x1, y1, x2, y2 = (self.boxes[:, i, None] for i in range(4))
+        self._rows = (y1 + steps * (y2 - y1)).astype(np.intp)[:, :, None]
+        self._cols = (x1 + steps * (x2 - x1)).astype(np.intp)[:, None, :]
+
+        slots = len(self.names)
+        # 每个槽位对应的技能 id，以及 (槽位, 状态) -> 模型类别 id
+        self._slot_skill_ids = np.array([self.class_table.skill_id(name) for name in self.names], dtype=np.int32)
+        self._slot_class_ids = np.array(
+            [[self.class_table.class_id(skill_id, state) for state in range(len(self.STATES))]
+             for skill_id in self._slot_skill_ids], dtype=np.int32
+        ).reshape(slots, len(self.STATES))
+        self.templates = np.zeros((slots, len(self.STATES), n, n, 3), dtype=np.int16)
+        self.template_hists = np.zeros((slots, len(self.STATES), self.HISTOGRAM_BINS), dtype=np.float32)
+        self.template_valid = np.zeros((slots, len(self.STATES)), dtype=bool)
+        self._load_templates()
+
+        self.ticks = 0
+        self.template_hits = 0
+        self.fallbacks = 0
+
+    def _thumbnails(self, frame):
+        return frame[self._rows, self._cols]
+
+    def _histograms(self, thumbs):
+        gray = thumbs.sum(axis=-1, dtype=np.int32) // (3 * 256 // self.HISTOGRAM_BINS)
+        # 每个槽位的直方图在 bincount 中使用独立的区间
+        offsets = (np.arange(len(thumbs)) * self.HISTOGRAM_BINS)[:, None, None]
+        counts = np.bincount((gray + offsets).ravel(), minlength=len(thumbs) * self.HISTOGRAM_BINS)
+        return counts.reshape(len(thumbs), self.HISTOGRAM_BINS).astype(np.float32) / (self.thumb_size ** 2)
+
+    def classify(self, thumbs, slots):
+        """
+        用模板对指定的槽位分类。
+
+        :param thumbs: 这些槽位的缩略图 (len(slots), N, N, 3)。
+        :param slots: 槽位索引数组。
+        :return: (state_index, score, ambiguous) 三个长度为 len(slots) 的数组，score 越小越匹配。
+        """
+        pixel_distance = np.abs(thumbs[:, None].astype(np.int16) - self.templates[slots]).mean(axis=(2, 3, 4)) / 255.0
+        hists = self._histograms(thumbs)
+        hist_distance = 1.0 - np.minimum(hists[:, None], self.template_hists[slots]).sum(axis=-1)
+        # 分数在 [0, 1] 之间，缺少模板的状态记为 2，永远不会胜出
+        scores = np.where(self.template_valid[slots], 0.5 * pixel_distance + 0.5 * hist_distance, 2.0)
+
+        order = np.argsort(scores, axis=1)
+        state = order[:, 0]
+        rows = np.arange(len(slots))
+        best = scores[rows, state]
+        second = scores[rows, order[:, 1]]
+        ambiguous = (best > self.max_score) | ((second - best) < self.min_margin)
+        return state, best, ambiguous
+
+    def detect(self, frame):
+        if not self.names:
+            return self.yolo_detector.detect(frame)
+
+        self.ticks += 1
+        thumbs = self._thumbnails(frame)
+        revalidate = self.revalidate_every and self.ticks % self.revalidate_every == 0
+        results = [None] * len(self.names)
+
+        keys = None
+        if self.cache is not None:
+            keys = list(enumerate(perceptual_hashes(thumbs)))
+            if not revalidate:
+                for i, key in enumerate(keys):
+                    results[i] = self.cache.get(key)
+        pending = np.array([i for i, result in enumerate(results) if result is None], dtype=np.intp)
+
+        if len(pending):
+            state, score, ambiguous = self.classify(thumbs[pending], pending)
+            if revalidate or ambiguous.any():
+                self.fallbacks += 1
+                confirmed = self._run_yolo(frame, thumbs)
+                # 复核时完全以 YOLO 为准，否则只替换不明确的槽位
+                use_yolo = np.ones_like(ambiguous) if revalidate else ambiguous
+            else:
+                self.template_hits += 1
+                confirmed = {}
+                use_yolo = ambiguous
+
+            for j, slot in enumerate(pending):
+                if not use_yolo[j]:
+                    results[slot] = (int(state[j]), float(1.0 - score[j]))
+                elif slot in confirmed:
+                    results[slot] = self._slot_result(slot, *confirmed[slot])
+                if keys is not None and results[slot] is not None:
+                    self.cache.put(keys[slot], results[slot])
+
+        found = [(i, result) for i, result in enumerate(results) if result is not None]
+        if not found:
+            return empty_detections()
+        slots = np.array([i for i, _ in found], dtype=np.intp)
+        states = np.array([result[0] for _, result in found], dtype=np.intp)
+        detections = make_detections(
+            self._slot_class_ids[slots, states], [result[1] for _, result in found], self.boxes[slots]
+        )
+        # 模型中不存在的 (技能, 状态) 组合无法用类别 id 表示
+        return detections[detections['class_id'] >= 0]
+
+    def detect_skills(self, frame):
+        """兼容旧接口，返回 [{'name', 'confidence', 'box'}]"""
+        return self.class_table.to_dicts(self.detect(frame))
+
+    def _slot_result(self, slot, class_id, confidence):
+        """把 YOLO 的检测结果转换为 (state_index, confidence)，与槽位不符时返回 None。"""
+        state = int(self.class_table.states[class_id])
+        if self.class_table.skill_ids[class_id] != self._slot_skill_ids[slot] or state == STATE_UNKNOWN:
+            return None
+        return state, float(confidence)
+
+    def _run_yolo(self, frame, thumbs):
+        """运行 YOLO，把检测结果分配到槽位并学习模板，返回 {槽位索引: (class_id, confidence)}。"""
+        detections = self.yolo_detector.detect(frame)
+        boxes = detections['box']
+        cx = (boxes[:, 0] + boxes[:, 2])[:, None] / 2
+        cy = (boxes[:, 1] + boxes[:, 3])[:, None] / 2
+        # (检测数, 槽位数) 的包含关系，检测框中心落在哪个槽位里就分配给哪个槽位
+        inside = (self.boxes[:, 0] <= cx) & (cx < self.boxes[:, 2]) & (self.boxes[:, 1] <= cy) & (cy < self.boxes[:, 3])
+        slot_of = inside.argmax(axis=1)
+
+        confirmed = {}
+        # 按置信度从高到低分配，每个槽位只保留置信度最高的检测
+        for i in np.argsort(-detections['confidence'], kind='stable'):
+            if inside[i, slot_of[i]] and int(slot_of[i]) not in confirmed:
+                confirmed[int(slot_of[i])] = (int(detections['class_id'][i]), float(detections['confidence'][i]))
+
+        for slot, detection in confirmed.items():
+            result = self._slot_result(slot, *detection)
+            if result and result[1] >= self.learn_confidence:
+                self._learn_template(slot, result[0], thumbs[slot])
+        return confirmed
+
+    def _learn_template(self, slot, state, thumb):
+        if self.template_valid[slot, state]:
+            # 已有模板时缓慢跟随画面的变化（如 UI 缩放、光照）
+            self.templates[slot, state] = (self.templates[slot, state] * 3 + thumb) // 4
+        else:
+            self.templates[slot, state] = thumb
+            self.template_valid[slot, state] = True
+            self._save_template(slot, state)
+        self.template_hists[slot, state] = self._histogram(self.templates[slot, state])
+
+    def _histogram(self, thumb):
+        gray = thumb.sum(axis=-1) // (3 * 256 // self.HISTOGRAM_BINS)
+        return np.bincount(gray.ravel(), minlength=self.HISTOGRAM_BINS).astype(np.float32) / (self.thumb_size ** 2)
+
+    def _template_path(self, slot, state):
+        return os.path.join(self.templates_dir, f"{self.names[slot]}_{self.STATES[state]}.npy")
+
+    def _save_template(self, slot, state):
+        if not self.templates_dir:
+            return
+        os.makedirs(self.templates_dir, exist_ok=True)
+        np.save(self._template_path(slot, state), self.templates[slot, state].astype(np.uint8))
+
+    def _load_templates(self):
+        if not self.templates_dir or not os.path.isdir(self.templates_dir):
+            return
+        for slot in range(len(self.names)):
+            for state in range(len(self.STATES)):
+                path = self._template_path(slot, state)
+                if not os.path.exists(path):
+                    continue
+                template = np.load(path)
+                if template.shape != self.templates.shape[2:]:
+                    continue
+                self.templates[slot, state] = template
+                self.template_valid[slot, state] = True
+                self.template_hists[slot, state] = self._histogram(template)
+
+    def get_stats(self):
+        stats = {'ticks': self.ticks, 'template_hits': self.template_hits, 'fallbacks': self.fallbacks}
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+        return stats
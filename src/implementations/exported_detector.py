@@ -0,0 +1,211 @@
+import ast
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+import yaml
+
+from src.utils.detections import SkillClassTable, empty_detections, make_detections
+from src.utils.letterbox import LetterboxPreprocessor, normalize_imgsz
+
+class ExportedYoloDetector(ABC):
+    """
+    运行导出后的 YOLOv8 模型（ONNX / OpenVINO）的 CPU 检测器基类。
+
+    输入张量和输出数组在首次推理时按模型输入尺寸分配一次，之后每帧复用；
+    预处理（letterbox，见 LetterboxPreprocessor）和后处理（置信度过滤 + NMS）都用 NumPy 完成，不依赖 PyTorch。
+    detect 的输出与 YoloDetector.detect 相同，为 DETECTION_DTYPE 结构化数组。
+    """
+
+    PAD_VALUE = 114 / 255.0
+
+    def __init__(self, model_path, imgsz=None, config=None):
+        """
+        :param model_path: 导出的模型路径。
+        :param imgsz: 推理输入尺寸（整数或 [高, 宽]），仅对动态输入尺寸的模型生效。
+        :param config: config.yaml 中的 yolo_inference 配置。
+        """
+        config = config or {}
+        self.imgsz = imgsz
+        self.intra_op_threads = config.get('intra_op_threads', 0)
+        self.conf_threshold = config.get('conf_threshold', 0.25)
+        self.iou_threshold = config.get('iou_threshold', 0.45)
+        self._input = None
+        self._output = None
+        try:
+            self.names = self._load(model_path)
+            self.class_table = SkillClassTable(self.names)
+            print(f"Exported YOLO model loaded successfully from {model_path}")
+        except Exception as e:
+            print(f"Error loading exported YOLO model: {e}")
+            raise
+
+    @abstractmethod
+    def _load(self, model_path):
+        """加载模型并返回 {class_id: class_name}。"""
+        pass
+
+    @abstractmethod
+    def _model_input_shape(self):
+        """返回模型输入的 (高, 宽)，维度是动态的则为 None。"""
+        pass
+
+    @abstractmethod
+    def _bind(self, input_tensor, output_shape):
+        """绑定预分配的输入张量，并返回预分配的输出数组。"""
+        pass
+
+    @abstractmethod
+    def _infer(self):
+        """对已经写入输入张量的数据运行推理，结果写入输出数组。"""
+        pass
+
+    def _input_shape(self):
+        fixed = self._model_input_shape()
+        if fixed:
+            return fixed
+        return normalize_imgsz(self.imgsz)
+
+    def _ensure_buffers(self):
+        height, width = self._input_shape()
+        if self._input is not None and self._input.shape[2:] == (height, width):
+            return
+        self._preprocessor = LetterboxPreprocessor((height, width), self.PAD_VALUE)
+        self._input = self._preprocessor.tensor
+        # YOLOv8 检测头输出 (1, 4 + 类别数, 锚点数)，锚点来自步长 8/16/32 的三个特征图
+        anchors = sum((height // s) * (width // s) for s in (8, 16, 32))
+        self._output = self._bind(self._input, (1, 4 + len(self.names), anchors))
+
+    def _letterbox(self, frame):
+        return self._preprocessor(frame)
+
+    def _postprocess(self, frame_shape, scale, left, top):
+        predictions = self._output[0]
+        scores = predictions[4:]
+        class_ids = scores.argmax(axis=0)
+        confidences = scores[class_ids, np.arange(scores.shape[1])]
+        keep = confidences > self.conf_threshold
+        if not keep.any():
+            return empty_detections()
+
+        cx, cy, w, h = predictions[:4, keep]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        class_ids, confidences = class_ids[keep], confidences[keep]
+        selected = non_max_suppression(boxes, confidences, class_ids, self.iou_threshold)
+
+        # 还原 letterbox 的缩放和填充
+        boxes = (boxes[selected] - [left, top, left, top]) / scale
+        height, width = frame_shape[:2]
+        boxes = np.clip(boxes, 0, [width, height, width, height])
+        return make_detections(class_ids[selected], confidences[selected], boxes)
+
+    def detect(self, frame):
+        """
+        使用导出的模型在一帧画面中检测技能。
+
+        :param frame: (H, W, 3) 的 uint8 BGR 数组。
+        :return: DETECTION_DTYPE 结构化数组。
+        """
+        try:
+            self._ensure_buffers()
+            scale, left, top = self._letterbox(frame)
+            self._infer()
+            return self._postprocess(frame.shape, scale, left, top)
+        except Exception as e:
+            print(f"An error occurred during skill detection: {e}")
+            return empty_detections()
+
+    def detect_skills(self, frame):
+        """兼容旧接口，返回 [{'name': str, 'confidence': float, 'box': [x1, y1, x2, y2]}]"""
+        return self.class_table.to_dicts(self.detect(frame))
+
+
+class OnnxYoloDetector(ExportedYoloDetector):
+    """使用 ONNX Runtime (CPUExecutionProvider) 推理"""
+
+    def _load(self, model_path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_name = self.session.get_outputs()[0].name
+        names = self.session.get_modelmeta().custom_metadata_map.get('names', '{}')
+        return ast.literal_eval(names)
+
+    def _model_input_shape(self):
+        height, width = self.session.get_inputs()[0].shape[2:]
+        return (height, width) if isinstance(height, int) and isinstance(width, int) else None
+
+    def _bind(self, input_tensor, output_shape):
+        output = np.empty(output_shape, dtype=np.float32)
+        # IOBinding 让 ONNX Runtime 直接读写这两块预分配的内存
+        self.binding = self.session.io_binding()
+        self.binding.bind_cpu_input(self.input_name, input_tensor)
+        self.binding.bind_output(self.output_name, 'cpu', 0, np.float32, output.shape, output.ctypes.data)
+        return output
+
+    def _infer(self):
+        self.session.run_with_iobinding(self.binding)
+
+
+class OpenVinoYoloDetector(ExportedYoloDetector):
+    """使用 OpenVINO Runtime (CPU) 推理，model_path 为 ultralytics 导出的 *_openvino_model 目录或 .xml 文件"""
+
+    def _load(self, model_path):
+        import openvino as ov
+
+        model_dir = model_path if os.path.isdir(model_path) else os.path.dirname(model_path)
+        xml_path = model_path if model_path.endswith('.xml') else next(
+            os.path.join(model_dir, f) for f in os.listdir(model_dir) if f.endswith('.xml')
+        )
+        self.ov = ov
+        self.core = ov.Core()
+        self.model = self.core.read_model(xml_path)
+        self.properties = {'INFERENCE_NUM_THREADS': self.intra_op_threads} if self.intra_op_threads else {}
+        with open(os.path.join(model_dir, 'metadata.yaml'), 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)['names']
+
+    def _model_input_shape(self):
+        shape = self.model.input(0).get_partial_shape()
+        if shape.is_static:
+            return tuple(shape.to_shape())[2:]
+        return None
+
+    def _bind(self, input_tensor, output_shape):
+        if self._model_input_shape() is None:
+            self.model.reshape({self.model.input(0).get_any_name(): list(input_tensor.shape)})
+        self.compiled = self.core.compile_model(self.model, 'CPU', self.properties)
+        self.request = self.compiled.create_infer_request()
+        # 输入张量与 NumPy 缓冲区共享内存
+        self.request.set_input_tensor(self.ov.Tensor(input_tensor, shared_memory=True))
+        output = np.empty(output_shape, dtype=np.float32)
+        self.request.set_output_tensor(self.ov.Tensor(output, shared_memory=True))
+        return output
+
+    def _infer(self):
+        self.request.infer()
+
+
+def non_max_suppression(boxes, scores, class_ids, iou_threshold):
+    """按类别的贪心 NMS，返回保留下来的索引。"""
+    # 不同类别的框加上不同的偏移量，使它们互不重叠，从而一次完成按类别的 NMS
+    offset_boxes = boxes + (class_ids * 4096.0)[:, None]
+    x1, y1, x2, y2 = offset_boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        intersection = w * h
+        iou = intersection / (areas[i] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.intp)
@@ -0,0 +1,147 @@
+import os
+import time
+
+import numpy as np
+from PIL import Image, ImageGrab
+from src.interfaces.frame_source import AbstractFrameSource
+from src.utils.frame_recording import FrameRecording
+
+class ImageGrabFrameSource(AbstractFrameSource):
+    """使用 PIL ImageGrab 截取屏幕（或 screen_capture_region 指定区域）"""
+
+    def initialize(self):
+        self.screen_size = ImageGrab.grab().size
+        width, height = self._grab().size if self.region else self.screen_size
+        self.frame_shape = (height, width, 3)
+
+    def _grab(self):
+        return ImageGrab.grab(bbox=tuple(self.region)) if self.region else ImageGrab.grab()
+
+    def get_frame_shape(self):
+        return self.frame_shape
+
+    def get_screen_size(self):
+        return self.screen_size
+
+    def read_into(self, out):
+        pixels = np.asarray(self._grab())
+        if pixels.shape[:2] != out.shape[:2]:
+            # 分辨率在运行中发生了变化，丢弃该帧
+            return False
+        # RGB(A) -> BGR
+        np.copyto(out, pixels[..., 2::-1])
+        return True
+
+
+class SyntheticFrameSource(AbstractFrameSource):
+    """生成确定性的合成帧，用于在没有显示器的机器上运行引擎"""
+
+    def initialize(self):
+        self.screen_size = (self.config.get('width', 640), self.config.get('height', 360))
+        if self.region:
+            x1, y1, x2, y2 = self.region
+            width, height = x2 - x1, y2 - y1
+        else:
+            width, height = self.screen_size
+        self.frame_shape = (height, width, 3)
+        # 每个画面保持 hold_frames 帧后切换到下一个画面
+        self.hold_frames = max(1, self.config.get('hold_frames', 30))
+        rng = np.random.default_rng(self.config.get('seed', 0))
+        variants = max(1, self.config.get('variants', 2))
+        self.frames = rng.integers(0, 256, size=(variants,) + self.frame_shape, dtype=np.uint8)
+        self.counter = 0
+
+    def get_frame_shape(self):
+        return self.frame_shape
+
+    def get_screen_size(self):
+        return self.screen_size
+
+    def read_into(self, out):
+        np.copyto(out, self.frames[(self.counter // self.hold_frames) % len(self.frames)])
+        self.counter += 1
+        return True
+
+
+class ReplayFrameSource(AbstractFrameSource):
+    """
+    回放录像文件（FrameRecorder 写出）或循环回放一个目录中的截图（例如 raw_yolo_data）。
+
+    speed 为 1 时按录制时的节奏实时回放，为 N 时以 N 倍速回放；
+    为 0 时尽可能快地回放，并与消费者逐帧同步，保证每一帧都被处理。
+    """
+
+    IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp'}
+
+    def initialize(self):
+        path = self.config.get('path', 'raw_yolo_data')
+        if FrameRecording.is_recording(path):
+            recording = FrameRecording(path)
+            self.frames = recording.frames
+            self.timestamps = np.asarray(recording.timestamps) - recording.timestamps[0]
+            self.hold_frames = 1
+        else:
+            self.frames = self._load_image_dir(path)
+            self.hold_frames = max(1, self.config.get('hold_frames', 1))
+            self.timestamps = None
+        self.frame_shape = self.frames.shape[1:]
+        self.speed = self.config.get('speed', 1.0)
+        self.loop = self.config.get('loop', True)
+        self.lockstep = self.speed == 0
+        self.counter = 0
+        self.started = None
+
+    def _load_image_dir(self, path):
+        files = sorted(
+            f for f in os.listdir(path) if os.path.splitext(f)[1].lower() in self.IMAGE_EXTENSIONS
+        )
+        if not files:
+            raise ValueError(f"回放目录 '{path}' 中没有找到任何图片。")
+
+        frames = []
+        for filename in files:
+            image = Image.open(os.path.join(path, filename)).convert('RGB')
+            if self.region:
+                image = image.crop(tuple(self.region))
+            frames.append(np.asarray(image)[..., ::-1])
+        if any(frame.shape != frames[0].shape for frame in frames):
+            raise ValueError(f"回放目录 '{path}' 中的图片尺寸不一致。")
+        return np.stack(frames)
+
+    def get_frame_shape(self):
+        return self.frame_shape
+
+    def read_into(self, out):
+        lap, index = divmod(self.counter // self.hold_frames, len(self.frames))
+        if lap and not self.loop:
+            return False
+
+        if self.timestamps is not None and self.speed > 0:
+            if self.started is None or index == 0:
+                # 每一轮回放重新对齐时钟
+                self.started = time.perf_counter()
+            delay = self.started + self.timestamps[index] / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        np.copyto(out, self.frames[index])
+        self.counter += 1
+        return True
+
+
+def get_frame_source(config):
+    """根据配置获取帧来源实例"""
+    source_config = config.get('frame_source', {}) or {}
+    region = config.get('screen_capture_region')
+    source_type = source_config.get('type', 'imagegrab')
+    if source_type == 'imagegrab':
+        return ImageGrabFrameSource(source_config, region)
+    elif source_type == 'xshm':
+        from src.implementations.xshm_source import XShmFrameSource
+        return XShmFrameSource(source_config, region)
+    elif source_type == 'synthetic':
+        return SyntheticFrameSource(source_config, region)
+    elif source_type == 'replay':
+        return ReplayFrameSource(source_config, region)
+    else:
+        raise ValueError(f"Unsupported frame source type: {source_type}")
@@ -0,0 +1,12 @@
+def get_keystroke_sender(config):
+    """根据配置获取按键模拟器实例。各实现按需导入，选择 null 时不需要 pynput"""
+    sender_config = config.get('keystroke_sender', {}) or {}
+    sender_type = sender_config.get('type', 'pynput')
+    if sender_type == 'pynput':
+        from src.implementations.pynput_sender import PynputSender
+        return PynputSender(sender_config)
+    elif sender_type == 'null':
+        from src.implementations.null_sender import NullKeystrokeSender
+        return NullKeystrokeSender(sender_config)
+    else:
+        raise ValueError(f"Unsupported keystroke sender type: {sender_type}")
@@ -0,0 +1,16 @@
+from src.interfaces.keystroke_sender import AbstractKeystrokeSender
+
+class NullKeystrokeSender(AbstractKeystrokeSender):
+    """不发送任何按键，用于基准测试和回放（引擎照常调度、计时），不需要 pynput 和输入后端"""
+
+    def initialize(self):
+        pass
+
+    def send_key(self, key_string):
+        pass
+
+    def press_key(self, key_string):
+        pass
+
+    def release_key(self, key_string):
+        pass
@@ -1,6 +1,6 @@
-import time
 from pynput.keyboard import Controller, Key
 from src.interfaces.keystroke_sender import AbstractKeystrokeSender
+from src.utils.precise_timer import precise_sleep
 
 class PynputSender(AbstractKeystrokeSender):
     """使用 pynput 实现的按键模拟器"""
@@ -9,23 +9,21 @@ class PynputSender(AbstractKeystrokeSender):
         self.keyboard = Controller()
         self.keypress_delay = self.config.get("keypress_delay_ms", 50) / 1000.0
 
+    @staticmethod
+    def _resolve(key_string):
+        """单个字符直接发送，"tab"、"shift"、"f1" 等名字转换为 pynput 的特殊键。"""
+        if len(key_string) > 1 and key_string.lower() in Key.__members__:
+            return Key[key_string.lower()]
+        return key_string
+
     def send_key(self, key_string):
-        """模拟施法按键"""
-        print(f"Casting spell with keybind: {key_string}")
-        self.keyboard.press(key_string)
-        time.sleep(self.keypress_delay)
-        self.keyboard.release(key_string)
+        """模拟施法按键（阻塞 keypress_delay，引擎中由 KeystrokeDispatcher 异步发送）"""
+        self.press_key(key_string)
+        precise_sleep(self.keypress_delay)
+        self.release_key(key_string)
 
     def press_key(self, key_string):
-        self.keyboard.press(key_string)
+        self.keyboard.press(self._resolve(key_string))
 
     def release_key(self, key_string):
-        self.keyboard.release(key_string)
-
-def get_keystroke_sender(config):
-    """根据配置获取按键模拟器实例"""
-    sender_type = config.get('keystroke_sender', {}).get('type', 'pynput')
-    if sender_type == 'pynput':
-        return PynputSender(config.get('keystroke_sender', {}))
-    else:
-        raise ValueError(f"Unsupported keystroke sender type: {sender_type}")
\ No newline at end of file
+        self.keyboard.release(self._resolve(key_string))
@@ -0,0 +1,208 @@
+import ctypes
+import ctypes.util
+
+import numpy as np
+from src.interfaces.frame_source import AbstractFrameSource
+
+# 常量来自 X11/X.h 与 sys/ipc.h
+Z_PIXMAP = 2
+ALL_PLANES = 0xFFFFFFFF
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ('shmseg', ctypes.c_ulong),
+        ('shmid', ctypes.c_int),
+        ('shmaddr', ctypes.c_void_p),
+        ('readOnly', ctypes.c_int),
+    ]
+
+
+class XImage(ctypes.Structure):
+    # 只声明读取像素所需的前缀字段，结构体由 Xlib 分配
+    _fields_ = [
+        ('width', ctypes.c_int),
+        ('height', ctypes.c_int),
+        ('xoffset', ctypes.c_int),
+        ('format', ctypes.c_int),
+        ('data', ctypes.c_void_p),
+        ('byte_order', ctypes.c_int),
+        ('bitmap_unit', ctypes.c_int),
+        ('bitmap_bit_order', ctypes.c_int),
+        ('bitmap_pad', ctypes.c_int),
+        ('depth', ctypes.c_int),
+        ('bytes_per_line', ctypes.c_int),
+        ('bits_per_pixel', ctypes.c_int),
+        ('red_mask', ctypes.c_ulong),
+        ('green_mask', ctypes.c_ulong),
+        ('blue_mask', ctypes.c_ulong),
+    ]
+
+
+X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+
+def _load_library(name):
+    path = ctypes.util.find_library(name)
+    if not path:
+        raise RuntimeError(f"找不到系统库 lib{name}，XShm 截图仅支持 Linux/X11。")
+    return ctypes.CDLL(path)
+
+
+class XShmFrameSource(AbstractFrameSource):
+    """
+    使用 MIT-SHM 扩展 (XShmGetImage) 截取 X11 屏幕。
+
+    X 服务器直接把像素写入与本进程共享的内存段，省去了 ImageGrab 每次请求的
+    套接字传输和整屏 RGB 转换；共享段只覆盖 screen_capture_region 的大小，
+    并被包装为一个可复用的 NumPy 视图。
+    """
+
+    def initialize(self):
+        self._bind_libraries()
+        self.display = None
+        self.image = None
+        self._shm_mapped = False
+        self._shm_attached = False
+        try:
+            self._open()
+        except Exception:
+            # 释放已经取得的 X 连接、XImage 和共享段，引擎回退或重试时不会泄漏
+            self.cleanup()
+            raise
+
+    def _open(self):
+        display_name = self.config.get('display')
+        self.display = self.x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise RuntimeError(f"无法连接到 X 显示 {display_name or '(DISPLAY)'}。")
+        if not self.xext.XShmQueryExtension(self.display):
+            raise RuntimeError("X 服务器不支持 MIT-SHM 扩展。")
+
+        # 默认的 X 错误处理函数会直接退出进程，这里改为记录错误码
+        self._last_error = 0
+        self._error_handler = X_ERROR_HANDLER(self._on_x_error)
+        self.x11.XSetErrorHandler(self._error_handler)
+
+        screen = self.x11.XDefaultScreen(self.display)
+        self.root = self.x11.XDefaultRootWindow(self.display)
+        self.screen_size = (self.x11.XDisplayWidth(self.display, screen), self.x11.XDisplayHeight(self.display, screen))
+        if self.region:
+            x1, y1, x2, y2 = self.region
+        else:
+            x1, y1, (x2, y2) = 0, 0, self.screen_size
+        self.origin = (x1, y1)
+        width, height = x2 - x1, y2 - y1
+
+        self.segment = XShmSegmentInfo()
+        self.image = self.xext.XShmCreateImage(
+            self.display,
+            self.x11.XDefaultVisual(self.display, screen),
+            self.x11.XDefaultDepth(self.display, screen),
+            Z_PIXMAP, None, ctypes.byref(self.segment), width, height
+        )
+        if not self.image:
+            raise RuntimeError("XShmCreateImage 失败。")
+        image = self.image.contents
+        if image.bits_per_pixel != 32:
+            raise RuntimeError(f"不支持的像素格式: {image.bits_per_pixel} bpp（需要 32 bpp TrueColor）。")
+
+        size = image.bytes_per_line * height
+        self.segment.shmid = self.libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if self.segment.shmid < 0:
+            raise RuntimeError("shmget 失败。")
+        self.segment.shmaddr = self.libc.shmat(self.segment.shmid, None, 0)
+        if self.segment.shmaddr in (None, ctypes.c_void_p(-1).value):
+            self.libc.shmctl(self.segment.shmid, IPC_RMID, None)
+            raise RuntimeError("shmat 失败。")
+        self._shm_mapped = True
+        image.data = self.segment.shmaddr
+        self.segment.readOnly = 0
+        attached = self.xext.XShmAttach(self.display, ctypes.byref(self.segment))
+        self.x11.XSync(self.display, 0)
+        self._shm_attached = bool(attached)
+        # 所有进程分离后由内核自动回收共享段
+        self.libc.shmctl(self.segment.shmid, IPC_RMID, None)
+        if not attached or self._last_error:
+            raise RuntimeError("XShmAttach 失败（X 服务器可能不在本机）。")
+
+        raw = np.ctypeslib.as_array((ctypes.c_ubyte * size).from_address(self.segment.shmaddr))
+        # 服务器以 BGRX 顺序写入，按行跨度 bytes_per_line 取出 BGR 视图
+        self.pixels = raw.reshape(height, image.bytes_per_line)[:, :width * 4].reshape(height, width, 4)[..., :3]
+        self.frame_shape = (height, width, 3)
+
+    def _bind_libraries(self):
+        self.x11 = _load_library('X11')
+        self.xext = _load_library('Xext')
+        self.libc = _load_library('c')
+
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self.x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDefaultVisual.restype = ctypes.c_void_p
+        self.x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XSetErrorHandler.argtypes = [X_ERROR_HANDLER]
+        self.x11.XSetErrorHandler.restype = ctypes.c_void_p
+        self.x11.XDestroyImage.argtypes = [ctypes.POINTER(XImage)]
+
+        self.xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        self.xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_char_p,
+            ctypes.POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint
+        ]
+        self.xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+        self.xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+        self.xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+        self.xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+        ]
+
+        self.libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        self.libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        self.libc.shmat.restype = ctypes.c_void_p
+        self.libc.shmdt.argtypes = [ctypes.c_void_p]
+        self.libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    def _on_x_error(self, display, event):
+        self._last_error = 1
+        return 0
+
+    def get_frame_shape(self):
+        return self.frame_shape
+
+    def get_screen_size(self):
+        return self.screen_size
+
+    def read_into(self, out):
+        x, y = self.origin
+        if not self.xext.XShmGetImage(self.display, self.root, self.image, x, y, ALL_PLANES) or self._last_error:
+            self._last_error = 0
+            return False
+        np.copyto(out, self.pixels)
+        return True
+
+    def cleanup(self):
+        """释放已经取得的资源，也用于 initialize 中途失败时（只释放已成功创建的部分）。"""
+        if not getattr(self, 'display', None):
+            return
+        if self._shm_attached:
+            self.xext.XShmDetach(self.display, ctypes.byref(self.segment))
+            self._shm_attached = False
+        if self.image:
+            self.x11.XDestroyImage(self.image)
+            self.image = None
+        if self._shm_mapped:
+            self.libc.shmdt(self.segment.shmaddr)
+            self._shm_mapped = False
+        self.x11.XCloseDisplay(self.display)
+        self.display = None
@@ -1,66 +1,90 @@
 
-from ultralytics import YOLO
-from PIL import ImageGrab
 import numpy as np
 
+from src.utils.detections import SkillClassTable, empty_detections, make_detections
+from src.utils.letterbox import LetterboxPreprocessor, normalize_imgsz
+
 class YoloDetector:
-    def __init__(self, model_path):
+    def __init__(self, model_path, imgsz=None):
         """
         初始化YOLOv8检测器。
         :param model_path: 训练好的YOLOv8模型文件路径 (e.g., 'best.pt')。
+        :param imgsz: 推理输入尺寸（整数或 [高, 宽]），None 表示使用模型默认值。
         """
+        # PyTorch 和 ultralytics 导入很慢，只在真正创建检测器时（引擎进程中）导入
+        import torch
+        from ultralytics import YOLO
+
+        self.imgsz = imgsz
+        self._preprocessor = None
+        self._input = None
+        self._input_imgsz = None
+        self._from_numpy = torch.from_numpy
         try:
             self.model = YOLO(model_path)
+            self.class_table = SkillClassTable(self.model.names)
             print(f"YOLO model loaded successfully from {model_path}")
         except Exception as e:
             print(f"Error loading YOLO model: {e}")
             raise
 
-    def detect_skills(self, screen_region=None):
+    def _ensure_input(self):
+        # imgsz 可能在创建后被修改（例如按技能栏校准结果），只在它变化时重建输入张量
+        if self._input is not None and self.imgsz == self._input_imgsz:
+            return
+        input_shape = normalize_imgsz(self.imgsz, self.model.overrides.get('imgsz', 640))
+        self._preprocessor = LetterboxPreprocessor(input_shape)
+        # 与预处理张量共享内存，ultralytics 收到 BCHW 的 0-1 张量时会跳过自身的预处理
+        self._input = self._from_numpy(self._preprocessor.tensor)
+        self._input_imgsz = self.imgsz
+
+    def detect(self, frame):
         """
-        在整个屏幕或指定区域进行截图，并使用YOLO模型检测技能。
+        使用YOLO模型在一帧画面中检测技能。
 
-        :param screen_region: [x1, y1, x2, y2] 格式的截图区域，如果为None则截取全屏。
-        :return: 一个列表，包含所有检测到的技能信息。
-                 每个技能信息是一个字典: {'name': str, 'confidence': float, 'box': [x1, y1, x2, y2]}
+        :param frame: (H, W, 3) 的 uint8 BGR 数组，通常是 FrameSource 采集到的帧。
+        :return: DETECTION_DTYPE 结构化数组，每行为 (class_id, confidence, [x1, y1, x2, y2])。
         """
         try:
-            # 截图
-            if screen_region:
-                screenshot = ImageGrab.grab(bbox=screen_region)
-            else:
-                screenshot = ImageGrab.grab()
-
-            # PIL图像转为OpenCV格式 (YOLO内部处理)
-            results = self.model(screenshot, verbose=False) # 直接调用模型进行预测
+            # 直接把 numpy 帧 letterbox 到常驻的输入张量，避免 ultralytics 每帧分配中间数组
+            self._ensure_input()
+            scale, left, top = self._preprocessor(frame)
+            boxes = self.model(self._input, verbose=False)[0].boxes # 直接调用模型进行预测
 
-            detections = []
-            # result in results is a generator, so we need to iterate
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    # 获取类别ID和置信度
-                    class_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    
-                    # 获取类别名称
-                    class_name = self.model.names[class_id]
-                    
-                    # 获取边界框坐标
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-                    detections.append({
-                        'name': class_name,
-                        'confidence': confidence,
-                        'box': [x1, y1, x2, y2]
-                    })
-            
-            return detections
+            # 整批取出类别、置信度和边界框，并还原 letterbox 的缩放和填充
+            height, width = frame.shape[:2]
+            xyxy = (boxes.xyxy.cpu().numpy() - [left, top, left, top]) / scale
+            xyxy = np.clip(xyxy, 0, [width, height, width, height])
+            return make_detections(boxes.cls.cpu().numpy(), boxes.conf.cpu().numpy(), xyxy)
         except Exception as e:
             print(f"An error occurred during skill detection: {e}")
-            return []
+            return empty_detections()
+
+    def detect_skills(self, frame):
+        """
+        兼容旧接口，供 GUI 和脚本使用。
+
+        :return: 一个列表，包含所有检测到的技能信息。
+                 每个技能信息是一个字典: {'name': str, 'confidence': float, 'box': [x1, y1, x2, y2]}
+        """
+        return self.class_table.to_dicts(self.detect(frame))
+
+def get_skill_detector(config):
+    """根据 yolo_model_path 的类型选择推理后端: .pt -> ultralytics, .onnx -> ONNX Runtime, OpenVINO 目录/.xml -> OpenVINO"""
+    model_path = config.get('yolo_model_path')
+    inference_config = config.get('yolo_inference', {}) or {}
+    if model_path.endswith('.onnx'):
+        from src.implementations.exported_detector import OnnxYoloDetector
+        return OnnxYoloDetector(model_path, config=inference_config)
+    elif model_path.endswith('.xml') or model_path.rstrip('/\\').endswith('_openvino_model'):
+        from src.implementations.exported_detector import OpenVinoYoloDetector
+        return OpenVinoYoloDetector(model_path, config=inference_config)
+    else:
+        return YoloDetector(model_path)
 
 if __name__ == '__main__':
+    from src.implementations.frame_sources import ImageGrabFrameSource
+
     # 用于独立测试
     # 确保你有一个 best.pt 文件，或者使用预训练模型进行测试
     # model_path = 'yolov8n.pt' # 使用预训练模型测试，它能识别通用物体
@@ -71,7 +95,10 @@ if __name__ == '__main__':
         custom_model_path = 'runs/detect/train/weights/best.pt' # 默认训练输出路径
         detector = YoloDetector(model_path=custom_model_path)
         print("Detecting skills on screen...")
-        detected_skills = detector.detect_skills()
+        frame_source = ImageGrabFrameSource()
+        frame = np.empty(frame_source.get_frame_shape(), dtype=np.uint8)
+        frame_source.read_into(frame)
+        detected_skills = detector.detect_skills(frame)
         if detected_skills:
             print("Detected skills:")
             for skill in detected_skills:
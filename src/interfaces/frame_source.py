@@ -0,0 +1,45 @@
+from abc import ABC, abstractmethod
+
+class AbstractFrameSource(ABC):
+    """帧来源的抽象基类
+
+    所有帧统一为 (H, W, 3) 的 uint8 数组，通道顺序为 BGR（与 OpenCV/ultralytics 的约定一致）。
+    帧来源本身不分配帧内存，而是把数据写入调用方提供的预分配缓冲区。
+    """
+
+    # 为 True 时采集线程会等待消费者取走上一帧后再写入下一帧（用于逐帧回放）
+    lockstep = False
+
+    def __init__(self, config=None, region=None):
+        self.config = config or {}
+        self.region = region
+        self.initialize()
+
+    @abstractmethod
+    def initialize(self):
+        """执行特定帧来源所需的任何初始化步骤。"""
+        pass
+
+    @abstractmethod
+    def get_frame_shape(self):
+        """返回每一帧的形状 (H, W, 3)。"""
+        pass
+
+    @abstractmethod
+    def read_into(self, out):
+        """把一帧写入预分配的数组 out，成功返回 True。"""
+        pass
+
+    def get_screen_size(self):
+        """返回整个屏幕的 (宽, 高)，无法得知时返回 None（可选）。"""
+        return None
+
+    def set_region(self, region):
+        """切换截图区域并重新初始化帧来源。"""
+        self.cleanup()
+        self.region = region
+        self.initialize()
+
+    def cleanup(self):
+        """执行特定帧来源所需的任何清理步骤（可选）。"""
+        pass
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+import numpy as np
+
+def perceptual_hashes(thumbs, hash_size=8):
+    """
+    对一批槽位缩略图计算感知哈希。
+
+    差值哈希 (dHash) 只反映明暗走向，对整体变暗不敏感，而冷却中的图标恰恰是整体变暗，
+    所以在 dHash 之上再拼接每个通道平均值的高 4 位。
+
+    :param thumbs: (S, N, N, 3) 的缩略图数组。
+    :return: 长度为 S 的 Python int 列表。
+    """
+    color = (thumbs.mean(axis=(1, 2)).astype(np.uint8) >> 4).astype(np.int64)
+    color_bits = (color[:, 0] << 8) | (color[:, 1] << 4) | color[:, 2]
+
+    gray = thumbs.sum(axis=-1, dtype=np.int32)
+    n = gray.shape[1]
+    rows = np.linspace(0, n - 1, hash_size).round().astype(np.intp)
+    cols = np.linspace(0, n - 1, hash_size + 1).round().astype(np.intp)
+    sampled = gray[:, rows][:, :, cols]
+    bits = sampled[:, :, 1:] > sampled[:, :, :-1]
+    packed = np.packbits(bits.reshape(len(thumbs), -1), axis=1)
+    shift = hash_size * hash_size
+    return [
+        (int(color) << shift) | int.from_bytes(row.tobytes(), 'big')
+        for color, row in zip(color_bits, packed)
+    ]
+
+
+class DetectionCache:
+    """按 (槽位, 感知哈希) 缓存分类结果的 LRU 缓存。"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self):
+        return {'cache_hits': self.hits, 'cache_misses': self.misses, 'cache_size': len(self._entries)}
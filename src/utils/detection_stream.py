@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.utils.detections import DETECTION_DTYPE
+
+# 逐帧检测结果的录制文件（.npz）:
+#   labels      模型的类别名
+#   timestamps  每帧的时刻（秒），float64
+#   offsets     第 i 帧的检测结果为 detections[offsets[i]:offsets[i + 1]]
+#   detections  所有帧的检测结果依次拼接，DETECTION_DTYPE
+
+
+def save_detection_stream(path, labels, timestamps, frames):
+    """
+    :param labels: 模型的类别名（按类别 id 排列）。
+    :param timestamps: 每帧的时刻。
+    :param frames: 每帧的检测结果（DETECTION_DTYPE 数组），与 timestamps 等长。
+    """
+    offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(detections) for detections in frames])
+    detections = np.concatenate(frames) if frames else np.empty(0, dtype=DETECTION_DTYPE)
+    np.savez_compressed(
+        path, labels=np.array(labels, dtype=str), timestamps=np.asarray(timestamps, dtype=np.float64),
+        offsets=offsets, detections=detections.astype(DETECTION_DTYPE)
+    )
+
+
+class DetectionStream:
+    """读取 save_detection_stream 写出的逐帧检测结果。"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.labels = data['labels'].tolist()
+            self.timestamps = data['timestamps']
+            self.offsets = data['offsets']
+            self.detections = data['detections']
+        if len(self.timestamps) == 0:
+            raise ValueError(f"检测结果文件 '{path}' 中没有任何帧。")
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        return self.detections[self.offsets[index]:self.offsets[index + 1]]
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1] - self.timestamps[0])
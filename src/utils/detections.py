@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+
+# 一帧的检测结果: 每行一个检测框，坐标为原始帧上的整数像素；
+# eta_ms 为冷却中技能的预计剩余冷却时间（毫秒），未知时为 NaN
+DETECTION_DTYPE = np.dtype([
+    ('class_id', np.int32),
+    ('confidence', np.float32),
+    ('box', np.int32, (4,)),
+    ('eta_ms', np.float32),
+])
+
+# 技能状态，与模型类别名的后缀对应（frostbolt_ready / frostbolt_cooldown）
+STATES = ('ready', 'cooldown')
+STATE_READY = 0
+STATE_COOLDOWN = 1
+STATE_UNKNOWN = -1
+
+
+def empty_detections():
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def make_detections(class_ids, confidences, boxes):
+    """用三个等长数组一次性构建检测结果，boxes 为 (N, 4) 的 x1, y1, x2, y2。"""
+    detections = np.empty(len(class_ids), dtype=DETECTION_DTYPE)
+    detections['class_id'] = class_ids
+    detections['confidence'] = confidences
+    detections['box'] = boxes
+    detections['eta_ms'] = np.nan
+    return detections
+
+
+def split_label(label):
+    """把类别名拆成 (技能名, 状态索引)，没有状态后缀的类别状态为 STATE_UNKNOWN。"""
+    skill, _, state = label.rpartition('_')
+    if skill and state in STATES:
+        return skill, STATES.index(state)
+    return label, STATE_UNKNOWN
+
+
+class SkillClassTable:
+    """
+    模型类别 id -> (技能 id, 状态) 的查找表，在加载模型时根据类别名构建一次。
+
+    主循环用它把检测结果中的整数类别 id 直接转换为技能 id 和状态，
+    不必在每帧对类别名做字符串处理。
+    """
+
+    def __init__(self, names):
+        """
+        :param names: 模型的类别名，{class_id: label} 或按 id 排列的列表。
+        """
+        if isinstance(names, dict):
+            names = [names.get(i, str(i)) for i in range(max(names, default=-1) + 1)]
+        self.labels = list(names)
+        self.skill_names = []
+        self._skill_ids = {}
+        skill_ids, states = [], []
+        for label in self.labels:
+            skill, state = split_label(label)
+            if skill not in self._skill_ids:
+                self._skill_ids[skill] = len(self.skill_names)
+                self.skill_names.append(skill)
+            skill_ids.append(self._skill_ids[skill])
+            states.append(state)
+        self.skill_ids = np.array(skill_ids, dtype=np.int32)
+        self.states = np.array(states, dtype=np.int8)
+        self.is_ready = self.states == STATE_READY
+        self._class_ids = {(skill_id, state): i for i, (skill_id, state) in enumerate(zip(skill_ids, states))}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def skill_id(self, skill_name):
+        """返回技能名对应的技能 id，模型中不存在该技能时返回 -1。"""
+        return self._skill_ids.get(skill_name, -1)
+
+    def class_id(self, skill_id, state):
+        """返回 (技能 id, 状态) 对应的类别 id，不存在时返回 -1。"""
+        return self._class_ids.get((skill_id, state), -1)
+
+    def ready_skills(self, detections):
+        """返回长度为技能数的布尔数组，标记本帧检测到处于可用状态的技能。"""
+        ready = np.zeros(len(self.skill_names), dtype=bool)
+        class_ids = detections['class_id']
+        ready[self.skill_ids[class_ids[self.is_ready[class_ids]]]] = True
+        return ready
+
+    def detected_skills(self, detections, state=None):
+        """返回长度为技能数的布尔数组，标记本帧检测到的技能；state 不为 None 时只统计该状态的检测。"""
+        detected = np.zeros(len(self.skill_names), dtype=bool)
+        class_ids = detections['class_id']
+        if state is not None:
+            class_ids = class_ids[self.states[class_ids] == state]
+        detected[self.skill_ids[class_ids]] = True
+        return detected
+
+    def labels_of(self, detections):
+        return [self.labels[class_id] for class_id in detections['class_id'].tolist()]
+
+    def skill_etas(self, detections):
+        """
+        返回长度为技能数的数组: 可用的技能为 0，冷却中且估计了剩余时间的技能为 eta_ms，其余为 inf。
+        同一技能有多个检测框时取最小值。
+        """
+        etas = np.full(len(self.skill_names), np.inf, dtype=np.float32)
+        class_ids = detections['class_id']
+        cooldown = self.states[class_ids] == STATE_COOLDOWN
+        eta = np.nan_to_num(detections['eta_ms'][cooldown], nan=np.inf)
+        np.minimum.at(etas, self.skill_ids[class_ids[cooldown]], eta)
+        etas[self.ready_skills(detections)] = 0.0
+        return etas
+
+    def to_dicts(self, detections):
+        """兼容旧接口: 转换为 [{'name', 'confidence', 'box', 'eta_ms'}]，供 GUI 和脚本使用。"""
+        return [
+            {'name': self.labels[class_id], 'confidence': confidence, 'box': box,
+             'eta_ms': None if math.isnan(eta_ms) else eta_ms}
+            for class_id, confidence, box, eta_ms in zip(
+                detections['class_id'].tolist(), detections['confidence'].tolist(), detections['box'].tolist(),
+                detections['eta_ms'].tolist()
+            )
+        ]
@@ -0,0 +1,50 @@
+import collections
+import queue
+import threading
+
+class DropOldestQueue:
+    """
+    有界队列：写满时丢弃最旧的元素，写入方永远不会阻塞。
+
+    用于流水线各阶段之间传递数据——下游跟不上时宁可丢掉过时的帧/指令，
+    也不让延迟无限累积。
+    """
+
+    def __init__(self, maxsize=1):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._items = collections.deque()
+        self._not_empty = threading.Condition(threading.Lock())
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """放入一个元素；队列已满时先丢弃最旧的元素。返回是否发生了丢弃。"""
+        with self._not_empty:
+            dropped = len(self._items) >= self.maxsize
+            if dropped:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._not_empty.notify()
+        return dropped
+
+    def get(self, timeout=None):
+        """取出最旧的元素，超时抛出 queue.Empty。"""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+    def clear(self):
+        with self._not_empty:
+            self._items.clear()
+
+    def __len__(self):
+        with self._not_empty:
+            return len(self._items)
+
+    def get_stats(self):
+        return {'put': self.put_count, 'dropped': self.dropped}
@@ -0,0 +1,117 @@
+import os
+import struct
+
+import numpy as np
+
+# 文件布局: [64 字节文件头][frame_count 帧原始 uint8 像素][frame_count 个 float64 时间戳索引]
+MAGIC = b'WOWCAP01'
+HEADER_FORMAT = '<8sIIIQQ'
+HEADER_SIZE = 64
+
+
+def _write_header(f, frame_shape, frame_count, index_offset):
+    height, width, channels = frame_shape
+    header = struct.pack(HEADER_FORMAT, MAGIC, height, width, channels, frame_count, index_offset)
+    f.seek(0)
+    f.write(header.ljust(HEADER_SIZE, b'\0'))
+
+
+class FrameRecorder:
+    """
+    把采集到的帧连同时间戳写入一个内存映射的录像文件。
+
+    文件随写入的帧每次扩大 chunk_frames 帧并重新映射，不会按 max_frames 预先占用磁盘
+    （1080p 下 10000 帧约 62 GB）；关闭时截断到实际帧数并追加时间戳索引。
+    """
+
+    def __init__(self, path, frame_shape, max_frames=10000, chunk_frames=64):
+        """
+        :param max_frames: 最多录制的帧数。
+        :param chunk_frames: 文件每次扩大的帧数。
+        """
+        self.path = path
+        self.frame_shape = tuple(frame_shape)
+        self.max_frames = max_frames
+        self.chunk_frames = chunk_frames
+        self.frame_bytes = int(np.prod(self.frame_shape))
+        with open(path, 'wb') as f:
+            _write_header(f, self.frame_shape, 0, 0)
+        self.frames = None
+        self.capacity = 0
+        self.timestamps = np.empty(0, dtype=np.float64)
+        self.count = 0
+        self._closed = False
+
+    def _grow(self):
+        """把文件和内存映射扩大 chunk_frames 帧（不超过 max_frames）。"""
+        capacity = min(self.capacity + self.chunk_frames, self.max_frames)
+        if self.frames is not None:
+            # 先释放旧的映射，Windows 上不能改变已映射文件的大小
+            self.frames.flush()
+            self.frames = None
+        with open(self.path, 'r+b') as f:
+            f.truncate(HEADER_SIZE + self.frame_bytes * capacity)
+        self.frames = np.memmap(self.path, dtype=np.uint8, mode='r+', offset=HEADER_SIZE,
+                                shape=(capacity,) + self.frame_shape)
+        self.timestamps = np.resize(self.timestamps, capacity)
+        self.capacity = capacity
+
+    def write(self, frame, timestamp):
+        """写入一帧，录像已满时返回 False。"""
+        if self._closed or self.count >= self.max_frames:
+            return False
+        if self.count >= self.capacity:
+            self._grow()
+        self.frames[self.count] = frame
+        self.timestamps[self.count] = timestamp
+        self.count += 1
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self.frames is not None:
+            self.frames.flush()
+            self.frames = None
+        index_offset = HEADER_SIZE + self.frame_bytes * self.count
+        with open(self.path, 'r+b') as f:
+            f.truncate(index_offset)
+            f.seek(index_offset)
+            f.write(self.timestamps[:self.count].tobytes())
+            _write_header(f, self.frame_shape, self.count, index_offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FrameRecording:
+    """以只读内存映射的方式打开 FrameRecorder 写出的录像文件。"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, height, width, channels, frame_count, index_offset = struct.unpack(
+                HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT))
+            )
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' 不是有效的录像文件。")
+        if frame_count == 0:
+            raise ValueError(f"录像文件 '{path}' 中没有任何帧。")
+        self.frame_shape = (height, width, channels)
+        self.frames = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER_SIZE,
+                                shape=(frame_count,) + self.frame_shape)
+        self.timestamps = np.memmap(path, dtype=np.float64, mode='r', offset=index_offset, shape=(frame_count,))
+
+    def __len__(self):
+        return len(self.frames)
+
+    @staticmethod
+    def is_recording(path):
+        if not os.path.isfile(path):
+            return False
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
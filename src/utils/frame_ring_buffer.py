@@ -0,0 +1,77 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# image 是环形缓冲区槽位的视图（不是副本），在调用 release() 之前保持有效
+Frame = namedtuple('Frame', ['image', 'seq', 'timestamp'])
+
+
+class FrameRingBuffer:
+    """预分配的帧环形缓冲区（单写者 / 单读者）
+
+    写者总是写入一个既不是最新帧、也没有被读者占用的槽位，
+    因此读者拿到的是槽位视图而无需复制，写者也永远不必等待读者（三重缓冲）。
+    """
+
+    def __init__(self, frame_shape, slots=3, dtype=np.uint8):
+        if slots < 3:
+            raise ValueError("环形缓冲区至少需要 3 个槽位。")
+        self.slots = slots
+        self.frames = np.zeros((slots,) + tuple(frame_shape), dtype=dtype)
+        self.timestamps = np.zeros(slots, dtype=np.float64)
+        self.sequence = np.zeros(slots, dtype=np.int64)
+        self._cond = threading.Condition()
+        self._next = 0
+        self._latest = -1
+        self._reading = -1
+        self._count = 0
+        self._consumed = 0
+
+    @property
+    def frame_count(self):
+        return self._count
+
+    def acquire_write_slot(self):
+        """返回 (槽位索引, 槽位视图)，写者把新帧写入该视图后调用 commit()。"""
+        with self._cond:
+            slot = self._next
+            while slot == self._latest or slot == self._reading:
+                slot = (slot + 1) % self.slots
+            return slot, self.frames[slot]
+
+    def commit(self, slot, timestamp):
+        """发布已写好的槽位，使其成为最新帧。"""
+        with self._cond:
+            self._count += 1
+            self.sequence[slot] = self._count
+            self.timestamps[slot] = timestamp
+            self._latest = slot
+            self._next = (slot + 1) % self.slots
+            self._cond.notify_all()
+
+    def read_latest(self, after_seq=0, timeout=None):
+        """
+        获取最新帧并占用其槽位，直到下一次 read_latest() 或 release()。
+
+        :param after_seq: 只返回序号大于该值的帧；没有更新的帧时最多等待 timeout 秒。
+        :return: Frame，超时则返回 None。
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._count > after_seq, timeout):
+                return None
+            slot = self._latest
+            self._reading = slot
+            self._consumed = self._count
+            self._cond.notify_all()
+            return Frame(self.frames[slot], int(self.sequence[slot]), float(self.timestamps[slot]))
+
+    def wait_consumed(self, timeout=None):
+        """等待读者取走最新帧，用于逐帧（lockstep）模式。"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._consumed >= self._count, timeout)
+
+    def release(self):
+        """释放读者占用的槽位。"""
+        with self._cond:
+            self._reading = -1
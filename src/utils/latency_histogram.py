@@ -0,0 +1,67 @@
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    HDR 风格的延迟直方图: 以微秒为单位，前 sub_buckets 个值精确计数，之后每翻一倍分成 sub_buckets / 2 个线性小桶，
+    相对误差不超过 2 / sub_buckets（默认 256 个小桶时小于 1%）。内存固定（几千个计数器），记录一次是 O(1)，
+    可以在引擎运行期间一直记录，随时读取任意分位数。
+
+    每个直方图只应由一个线程记录；其他线程读取时可能看到正在更新的计数，对统计结果没有实际影响。
+    """
+
+    def __init__(self, highest_seconds=60.0, sub_bucket_bits=8):
+        """
+        :param highest_seconds: 能区分的最大值，更大的值计入最后一个桶。
+        :param sub_bucket_bits: 小桶数为 2 ** sub_bucket_bits。
+        """
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_buckets = 1 << sub_bucket_bits
+        self.half = self.sub_buckets // 2
+        self.highest = int(highest_seconds * 1e6)
+        self.counts = np.zeros(self._index(self.highest) + 1, dtype=np.int64)
+        self.reset()
+
+    def _index(self, value):
+        if value < self.sub_buckets:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return shift * self.half + (value >> shift)
+
+    def _highest_equivalent(self, index):
+        """index 对应的桶中最大的值（微秒）。"""
+        if index < self.sub_buckets:
+            return index
+        shift = index // self.half - 1
+        return ((index - shift * self.half + 1) << shift) - 1
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        value = min(max(int(seconds * 1e6), 0), self.highest)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """第 q 百分位（0-100），单位秒；没有样本时为 0。"""
+        if self.count == 0:
+            return 0.0
+        cumulative = np.cumsum(self.counts)
+        rank = max(int(np.ceil(q / 100.0 * cumulative[-1])), 1)
+        index = int(np.searchsorted(cumulative, rank))
+        return min(self._highest_equivalent(index) / 1e6, self.max)
+
+    def summary(self, percentiles=(50, 95, 99)):
+        """count、mean、各分位数和 max，时间单位毫秒。"""
+        result = {'count': self.count, 'mean': self.total / self.count * 1000.0 if self.count else 0.0}
+        for q in percentiles:
+            result[f'p{q}'] = self.percentile(q) * 1000.0
+        result['max'] = self.max * 1000.0
+        return result
@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+
+
+def normalize_imgsz(imgsz, default=640):
+    """把 imgsz 配置（整数、[高, 宽] 或 None）统一成 (高, 宽)"""
+    imgsz = imgsz or default
+    return tuple(imgsz) if isinstance(imgsz, (list, tuple)) else (imgsz, imgsz)
+
+
+class LetterboxPreprocessor:
+    """
+    把 (H, W, 3) uint8 BGR 帧等比缩放、居中填充到常驻的 (1, 3, h, w) float32 输入张量中。
+
+    输入张量、缩放用的中间缓冲区以及缩放参数都按帧尺寸缓存，帧尺寸不变时每帧只做三件事:
+    cv2.resize 写入预分配的缓冲区，然后在一次 ufunc 中完成 BGR->RGB、HWC->CHW 和 /255，
+    直接写进输入张量的有效区域。填充区域只在帧尺寸变化时写一次。
+    """
+
+    def __init__(self, input_shape, pad_value=114 / 255.0, tensor=None):
+        """
+        :param input_shape: 模型输入的 (高, 宽)。
+        :param pad_value: 填充区域的值（已归一化到 0-1）。
+        :param tensor: 可选，外部提供的 (1, 3, 高, 宽) float32 张量；默认自行分配。
+        """
+        height, width = input_shape
+        self.tensor = tensor if tensor is not None else np.empty((1, 3, height, width), dtype=np.float32)
+        self.pad_value = pad_value
+        self._frame_shape = None
+        self._resized = None
+        self._target = None
+        self._params = None
+
+    def _prepare(self, frame_shape):
+        height, width = self.tensor.shape[2:]
+        scale = min(height / frame_shape[0], width / frame_shape[1])
+        new_w, new_h = round(frame_shape[1] * scale), round(frame_shape[0] * scale)
+        left, top = (width - new_w) // 2, (height - new_h) // 2
+
+        self.tensor.fill(self.pad_value)
+        self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._target = self.tensor[0, :, top:top + new_h, left:left + new_w]
+        self._params = (scale, left, top)
+        self._frame_shape = frame_shape
+
+    def __call__(self, frame):
+        """
+        预处理一帧画面，结果写入 self.tensor。
+
+        :return: (缩放比例, 左边距, 上边距)，用于把检测框还原到原始帧坐标。
+        """
+        if frame.shape != self._frame_shape:
+            self._prepare(frame.shape)
+
+        if self._resized.shape == frame.shape:
+            resized = frame
+        else:
+            cv2.resize(frame, self._resized.shape[1::-1], dst=self._resized, interpolation=cv2.INTER_LINEAR)
+            resized = self._resized
+        # BGR -> RGB、HWC -> CHW 都只是视图，乘法直接写进输入张量
+        np.multiply(resized[..., ::-1].transpose(2, 0, 1), np.float32(1 / 255.0), out=self._target,
+                    casting='unsafe')
+        return self._params
+
+
+def letterbox_into(frame, input_tensor, pad_value=114 / 255.0):
+    """
+    一次性地把 BGR 帧 letterbox 到给定的 (1, 3, H, W) float32 张量中（用于离线场景，如量化校准）。
+
+    :return: (缩放比例, 左边距, 上边距)
+    """
+    return LetterboxPreprocessor(input_tensor.shape[2:], pad_value, tensor=input_tensor)(frame)
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'error': ERROR}
+
+# 一条日志。data 用于需要 GUI 处理的结构化事件（如 {"type": "debug_step", ...}），普通日志为 None
+LogEvent = namedtuple('LogEvent', ['timestamp', 'level', 'message', 'data'], defaults=(None,))
+
+
+def log_event(level, message, data=None):
+    """以当前时刻生成一条 LogEvent。各组件用它以明确的级别写入日志队列。"""
+    return LogEvent(time.time(), level, message, data)
+
+
+def level_of(message):
+    """
+    按旧的消息约定推断纯字符串日志的级别（组件应通过 log_event 给出明确的级别，这里只是兜底）: 以 “错误” 开头或包含 “发生错误” 的为 ERROR，以 “警告” 开头的为 WARNING。
+    """
+    if message.startswith("错误") or "发生错误" in message:
+        return ERROR
+    if message.startswith("警告"):
+        return WARNING
+    return INFO
+
+
+def to_event(message):
+    """把 put() 收到的字符串、字典或 LogEvent 统一转换为 LogEvent。"""
+    if isinstance(message, LogEvent):
+        return message
+    if isinstance(message, dict):
+        return LogEvent(time.time(), INFO, "", message)
+    message = str(message)
+    return LogEvent(time.time(), level_of(message), message)
+
+
+class LogChannel:
+    """
+    引擎到 GUI 的日志通道：在引擎进程内缓冲日志，按批发送到跨进程队列。
+
+    - 接口与队列的 put() 兼容，各组件照常调用 log_queue.put(message)；
+    - 低于 level 的日志在进入缓冲区之前就被丢弃，不会被序列化；
+    - 后台线程每 flush_interval 秒把缓冲区中的日志作为一个列表放入队列，
+      每批只需一次序列化和一次进程间通信；带 data 的事件（如调试步骤）需要 GUI 立即响应，会马上发送。
+    """
+
+    def __init__(self, queue, level=INFO, flush_interval=0.1, max_batch=256):
+        """
+        :param queue: 跨进程队列（multiprocessing.Queue）。
+        :param level: 最低级别，可以是 LEVELS 中的名字。
+        :param max_batch: 缓冲区达到这么多条时立即发送。
+        """
+        self.queue = queue
+        self.level = LEVELS.get(level, level) if isinstance(level, str) else level
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        self.dropped = 0
+        self.batches = 0
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def put(self, message):
+        event = to_event(message)
+        if event.data is None and not self.enabled(event.level):
+            self.dropped += 1
+            return
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.max_batch
+        if full or event.data is not None:
+            self.flush()
+
+    def log(self, level, message, data=None):
+        if data is None and not self.enabled(level):
+            self.dropped += 1
+            return
+        self.put(log_event(level, message, data))
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self.batches += 1
+            self.queue.put(batch)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="LogChannel", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """停止后台线程并发送剩余的日志。"""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.flush()
@@ -0,0 +1,31 @@
+import time
+
+# 剩余时间小于这个值时不再睡眠，改为忙等。time.sleep 的误差在 Linux 上约为 0.1 ms，
+# 在 Windows 上（默认计时器精度）可达 1-15 ms，因此默认留出 2 ms
+DEFAULT_SPIN_THRESHOLD = 0.002
+
+
+def sleep_until(deadline, spin_threshold=DEFAULT_SPIN_THRESHOLD, interrupt=None):
+    """
+    等到 time.perf_counter() 达到 deadline：先睡眠到 deadline - spin_threshold，再忙等剩下的部分，误差通常在几十微秒以内。
+
+    :param interrupt: threading.Event，睡眠期间被设置时提前返回（忙等阶段不检查）。
+    :return: 到达 deadline 时为 True，被 interrupt 打断时为 False。
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= spin_threshold:
+            break
+        if interrupt is None:
+            time.sleep(remaining - spin_threshold)
+        elif interrupt.wait(remaining - spin_threshold):
+            return False
+    while time.perf_counter() < deadline:
+        # sleep(0) 释放 GIL，忙等期间推理线程仍然可以运行
+        time.sleep(0)
+    return True
+
+
+def precise_sleep(seconds, spin_threshold=DEFAULT_SPIN_THRESHOLD, interrupt=None):
+    """睡眠 seconds 秒，见 sleep_until。"""
+    return sleep_until(time.perf_counter() + seconds, spin_threshold, interrupt)
@@ -0,0 +1,129 @@
+from collections import namedtuple
+from multiprocessing.sharedctypes import RawArray
+
+import numpy as np
+
+from src.utils.detections import DETECTION_DTYPE
+
+# 共享内存的文件头。version 是顺序锁的计数器: 奇数表示写者正在写入，每次写入完成后加 2
+HEADER_DTYPE = np.dtype([
+    ('version', np.int64),
+    ('frame_seq', np.int64),
+    ('timestamp', np.float64),
+    ('count', np.int64),
+    ('labels_version', np.int64),
+    ('labels_size', np.int64),
+])
+
+# read() 的结果: version 用于判断是否有新数据，detections 是从共享内存复制出来的数组
+DetectionSnapshot = namedtuple('DetectionSnapshot', ['version', 'frame_seq', 'timestamp', 'detections'])
+
+
+class SharedDetectionSlot:
+    """
+    跨进程共享的 “最新检测结果” 槽位（顺序锁，单写者 / 多读者）。
+
+    引擎每帧把检测结果直接写入共享内存，写入只是几次内存复制，永远不会阻塞，也不会积压；
+    GUI 定时读取最新的一份，不需要序列化，也不用排空队列。读者在写入过程中读到的数据会被丢弃并重试。
+    类别名只在加载模型时写入一次，读者按 labels_version 缓存。
+
+    在父进程中创建，作为 Process 的参数传给引擎进程（共享内存随进程创建被继承）。
+    """
+
+    def __init__(self, capacity=256, labels_capacity=65536):
+        """
+        :param capacity: 最多保存的检测框数，超出的部分被截断。
+        :param labels_capacity: 类别名（utf-8，换行分隔）最多占用的字节数。
+        """
+        self.capacity = capacity
+        self.labels_capacity = labels_capacity
+        self._raw = RawArray('B', HEADER_DTYPE.itemsize + capacity * DETECTION_DTYPE.itemsize + labels_capacity)
+        self._attach()
+
+    def _attach(self):
+        buffer = np.frombuffer(self._raw, dtype=np.uint8)
+        detections_start = HEADER_DTYPE.itemsize
+        labels_start = detections_start + self.capacity * DETECTION_DTYPE.itemsize
+        self._header = buffer[:detections_start].view(HEADER_DTYPE)[0]
+        self._detections = buffer[detections_start:labels_start].view(DETECTION_DTYPE)
+        self._labels_buffer = buffer[labels_start:]
+        self._labels_version = -1
+        self._labels = []
+
+    def __getstate__(self):
+        return {'capacity': self.capacity, 'labels_capacity': self.labels_capacity, '_raw': self._raw}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._attach()
+
+    def _begin_write(self):
+        version = int(self._header['version'])
+        self._header['version'] = version + 1
+        return version
+
+    def _end_write(self, version):
+        self._header['version'] = version + 2
+
+    def publish(self, frame_seq, timestamp, detections):
+        """写入一帧的检测结果（只能由一个线程调用）。"""
+        count = min(len(detections), self.capacity)
+        version = self._begin_write()
+        self._detections[:count] = detections[:count]
+        self._header['frame_seq'] = frame_seq
+        self._header['timestamp'] = timestamp
+        self._header['count'] = count
+        self._end_write(version)
+
+    def set_labels(self, labels):
+        """写入类别名（加载模型时调用一次）。"""
+        encoded = "\n".join(labels).encode('utf-8')
+        if len(encoded) > self.labels_capacity:
+            raise ValueError(f"类别名共 {len(encoded)} 字节，超过了共享内存的容量 {self.labels_capacity}")
+        version = self._begin_write()
+        self._labels_buffer[:len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+        self._header['labels_size'] = len(encoded)
+        self._header['labels_version'] = int(self._header['labels_version']) + 1
+        self._end_write(version)
+
+    def read(self, after_version=0, retries=100):
+        """
+        读取最新的检测结果。
+
+        :param after_version: 上一次读到的 version，没有更新的数据时返回 None。
+        :return: DetectionSnapshot 或 None（没有新数据，或一直与写者冲突）。
+        """
+        for _ in range(retries):
+            version = int(self._header['version'])
+            if version & 1:
+                continue
+            if version <= after_version:
+                return None
+            frame_seq = int(self._header['frame_seq'])
+            timestamp = float(self._header['timestamp'])
+            count = min(int(self._header['count']), self.capacity)
+            detections = self._detections[:count].copy()
+            if int(self._header['version']) == version:
+                return DetectionSnapshot(version, frame_seq, timestamp, detections)
+        return None
+
+    def labels(self):
+        """返回写者设置的类别名，没有变化时使用缓存。"""
+        for _ in range(100):
+            version = int(self._header['version'])
+            labels_version = int(self._header['labels_version'])
+            if version & 1:
+                continue
+            if labels_version == self._labels_version:
+                return self._labels
+            encoded = self._labels_buffer[:int(self._header['labels_size'])].tobytes()
+            if int(self._header['version']) == version:
+                self._labels = encoded.decode('utf-8').split("\n") if encoded else []
+                self._labels_version = labels_version
+                return self._labels
+        return self._labels
+
+    def labels_of(self, detections):
+        labels = self.labels()
+        return [labels[class_id] if 0 <= class_id < len(labels) else str(class_id)
+                for class_id in detections['class_id'].tolist()]
@@ -0,0 +1,11 @@
+import time
+
+
+def wait_until(predicate, timeout=2.0, interval=0.005):
+    """轮询 predicate，直到返回真值（返回 True）或超时（返回 False）。用于等待后台线程完成某件事。"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return False
@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.engine.action_bar_calibrator import ActionBarCalibrator, region_slot_boxes, crop_slots, inference_size
+
+class TestActionBarCalibrator(unittest.TestCase):
+
+    def setUp(self):
+        self.calibrator = ActionBarCalibrator(padding=4)
+        self.detections = [
+            {'name': 'frostbolt_ready', 'confidence': 0.9, 'box': [1000, 1300, 1050, 1350]},
+            {'name': 'icelance_cooldown', 'confidence': 0.8, 'box': [1060, 1300, 1110, 1350]},
+            {'name': 'frostbolt_cooldown', 'confidence': 0.3, 'box': [10, 10, 60, 60]},
+        ]
+
+    def test_calibrate_keeps_best_detection_per_skill(self):
+        """测试每个技能只保留置信度最高的槽位，并计算带边距的外接区域。"""
+        calibration = self.calibrator.calibrate(self.detections, (2560, 1440))
+
+        self.assertEqual(calibration['region'], [996, 1296, 1114, 1354])
+        self.assertEqual(
+            calibration['slots'],
+            [{'name': 'frostbolt', 'box': [1000, 1300, 1050, 1350]},
+             {'name': 'icelance', 'box': [1060, 1300, 1110, 1350]}]
+        )
+
+    def test_calibrate_without_detections(self):
+        self.assertIsNone(self.calibrator.calibrate([], (2560, 1440)))
+
+    def test_save_and_load_per_resolution(self):
+        """测试校准结果按分辨率保存和读取。"""
+        config = {}
+        config_manager = MagicMock()
+        config_manager.get.side_effect = config.get
+        config_manager.set.side_effect = config.__setitem__
+
+        calibration = self.calibrator.calibrate(self.detections, (2560, 1440))
+        self.calibrator.save(config_manager, (2560, 1440), calibration)
+
+        self.assertEqual(ActionBarCalibrator.load(config, (2560, 1440)), calibration)
+        self.assertIsNone(ActionBarCalibrator.load(config, (1920, 1080)))
+        config_manager.save.assert_called_once()
+
+    def test_crop_slots_returns_views(self):
+        calibration = self.calibrator.calibrate(self.detections, (2560, 1440))
+        frame = np.zeros((58, 118, 3), dtype=np.uint8)
+
+        boxes = region_slot_boxes(calibration)
+        crops = crop_slots(frame, boxes)
+
+        self.assertEqual(boxes[0], ('frostbolt', (4, 4, 54, 54)))
+        self.assertEqual(crops[1].shape, (50, 50, 3))
+        self.assertTrue(np.shares_memory(crops[1], frame))
+
+    def test_inference_size_keeps_training_scale(self):
+        """测试推理尺寸按训练时的缩放比例缩小，并对齐到 32。"""
+        self.assertEqual(inference_size([0, 1200, 1280, 1440], (2560, 1440), 640), [64, 320])
+
+if __name__ == '__main__':
+    unittest.main()
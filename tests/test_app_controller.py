@@ -0,0 +1,27 @@
+import unittest
+import subprocess
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestAppControllerImports(unittest.TestCase):
+
+    def test_import_does_not_load_engine_dependencies(self):
+        """测试导入 AppController（界面启动时）不会导入只有引擎进程才需要的重量级模块。"""
+        code = (
+            "import sys\n"
+            "from src.app_controller import AppController\n"
+            "heavy = ('torch', 'ultralytics', 'cv2', 'onnxruntime', 'pynput', 'src.engine.automation_loop')\n"
+            "print(','.join(name for name in heavy if name in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
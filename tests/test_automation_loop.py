@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.engine.automation_loop import AutomationLoop
+from src.engine.strategy_compiler import compile_strategy
+from src.utils.detections import SkillClassTable, make_detections
+from src.utils.frame_ring_buffer import Frame
+from tests.helpers import wait_until
+
+
+class TestAutomationLoopControl(unittest.TestCase):
+    """测试引擎的控制指令: 暂停/恢复、调试单步和关闭都不会阻塞主循环。"""
+
+    def setUp(self):
+        class_table = SkillClassTable(['frostbolt_ready', 'frostbolt_cooldown'])
+        detector = MagicMock()
+        detector.class_table = class_table
+        detector.detect.side_effect = lambda image: make_detections([0], [1.0], [[0, 0, 8, 8]])
+        strategy_manager = MagicMock()
+        strategy_manager.global_cooldown = 0.2
+        strategy_manager.scheduler_config = {}
+        strategy_manager.cooldowns = {}
+        strategy_manager.compiled = compile_strategy({'single_target_priority': [{'name': 'frostbolt', 'key': '1'}]}, class_table)
+        mode_manager = MagicMock()
+        mode_manager.current_mode = 'single_target'
+        mode_manager.MODE_STOP = None
+
+        self.frame_seq = 0
+
+        def latest_frame(after_seq, timeout=None):
+            time.sleep(0.005)
+            self.frame_seq += 1
+            return Frame(np.zeros((8, 8, 3), dtype=np.uint8), self.frame_seq, time.perf_counter())
+
+        self.frame_grabber = MagicMock()
+        self.frame_grabber.get_latest_frame.side_effect = latest_frame
+        self.sender = MagicMock()
+        self.command_queue = queue.Queue()
+        self.log_queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.loop = AutomationLoop(
+            detector, self.sender, strategy_manager, mode_manager, self.log_queue, MagicMock(), self.command_queue,
+            True, self.stop_event, self.frame_grabber, start_paused=True
+        )
+        self.thread = threading.Thread(target=self.loop.run)
+        self.thread.start()
+
+    def tearDown(self):
+        self.stop_event.set()
+        self.thread.join(timeout=3)
+
+    def debug_steps(self):
+        return [message for message in list(self.log_queue.queue) if isinstance(message, dict)]
+
+    def test_paused_engine_does_nothing_until_resumed(self):
+        time.sleep(0.2)
+        self.assertEqual(self.sender.press_key.call_count, 0)
+        self.frame_grabber.pause.assert_called()
+
+        self.command_queue.put({'type': 'resume', 'debug': False})
+        self.assertTrue(wait_until(lambda: self.sender.press_key.call_count >= 2))
+        self.frame_grabber.resume.assert_called()
+
+        self.command_queue.put('pause')
+        self.assertTrue(wait_until(lambda: self.loop.paused))
+        time.sleep(0.05)
+        sent = self.sender.press_key.call_count
+        time.sleep(0.4)
+        self.assertEqual(self.sender.press_key.call_count, sent)
+
+    def test_debug_step_does_not_block_the_loop(self):
+        self.command_queue.put('resume')
+        self.assertTrue(wait_until(lambda: len(self.debug_steps()) == 1))
+        # 等待确认期间检测继续进行，但不会重复提出技能
+        processed = self.loop.inference_stage.processed
+        self.assertTrue(wait_until(lambda: self.loop.inference_stage.processed > processed))
+        self.assertEqual(len(self.debug_steps()), 1)
+
+        self.command_queue.put('step')
+        self.assertTrue(wait_until(lambda: self.sender.press_key.call_count == 1))
+        self.sender.press_key.assert_called_with('1')
+        self.assertTrue(wait_until(lambda: self.sender.release_key.call_count == 1))
+
+    def test_latency_report(self):
+        """测试 latency 指令报告从采集到按键的各阶段延迟。"""
+        self.command_queue.put({'type': 'resume', 'debug': False})
+        self.assertTrue(wait_until(lambda: self.loop.latency['end_to_end'].count >= 1))
+        self.command_queue.put({'type': 'latency', 'reset': True})
+
+        def reports():
+            return [message for message in list(self.log_queue.queue)
+                    if isinstance(message, dict) and message.get('type') == 'latency_report']
+        self.assertTrue(wait_until(lambda: len(reports()) == 1))
+        stages = reports()[0]['stages']
+        self.assertEqual(set(stages), {'frame_age', 'inference', 'decision', 'dispatch', 'end_to_end'})
+        end_to_end = stages['end_to_end']
+        self.assertGreaterEqual(end_to_end['count'], 1)
+        self.assertLessEqual(end_to_end['p50'], end_to_end['p99'])
+        self.assertGreaterEqual(end_to_end['p50'], stages['inference']['p50'])
+
+    def test_shutdown_sets_stop_event(self):
+        self.command_queue.put('shutdown')
+        self.thread.join(timeout=3)
+        self.assertFalse(self.thread.is_alive())
+        self.assertTrue(self.stop_event.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.implementations.cascade_detector import CascadeDetector
+from src.utils.detection_cache import DetectionCache, perceptual_hashes
+from src.utils.detections import SkillClassTable, make_detections
+
+SLOTS = [('frostbolt', (0, 0, 32, 32)), ('icelance', (40, 0, 72, 32))]
+CLASS_TABLE = SkillClassTable(['frostbolt_ready', 'frostbolt_cooldown', 'icelance_ready', 'icelance_cooldown'])
+
+
+def make_frame(frostbolt_ready, icelance_ready):
+    frame = np.zeros((32, 72, 3), dtype=np.uint8)
+    # 可用的图标明亮且有纹理，冷却中的图标整体变暗
+    icon = np.tile(np.linspace(120, 250, 32, dtype=np.uint8)[:, None, None], (1, 32, 3))
+    frame[:, 0:32] = icon if frostbolt_ready else icon // 4
+    frame[:, 40:72] = icon if icelance_ready else icon // 4
+    return frame
+
+
+def yolo_result(frostbolt_state, icelance_state):
+    labels = [f'frostbolt_{frostbolt_state}', f'icelance_{icelance_state}']
+    return make_detections(
+        [CLASS_TABLE.labels.index(label) for label in labels], [0.95, 0.95], [[1, 1, 31, 31], [41, 1, 71, 31]]
+    )
+
+
+class TestCascadeDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.yolo = MagicMock()
+        self.yolo.class_table = CLASS_TABLE
+        self.cascade = CascadeDetector(self.yolo, SLOTS, {'revalidate_every': 0, 'cache_size': 0})
+
+    def test_falls_back_to_yolo_until_templates_are_learned(self):
+        """测试没有模板时回退到 YOLO，并从 YOLO 的结果中学习模板。"""
+        self.yolo.detect.return_value = yolo_result('ready', 'cooldown')
+        detections = self.cascade.detect_skills(make_frame(True, False))
+
+        self.assertEqual([d['name'] for d in detections], ['frostbolt_ready', 'icelance_cooldown'])
+        self.assertEqual(self.cascade.fallbacks, 1)
+        self.assertTrue(self.cascade.template_valid[0, 0])
+        self.assertTrue(self.cascade.template_valid[1, 1])
+
+    def test_uses_templates_once_both_states_are_known(self):
+        """测试两种状态的模板都学到后，仅靠模板即可分类，不再调用 YOLO。"""
+        self.yolo.detect.return_value = yolo_result('ready', 'cooldown')
+        self.cascade.detect_skills(make_frame(True, False))
+        self.yolo.detect.return_value = yolo_result('cooldown', 'ready')
+        self.cascade.detect_skills(make_frame(False, True))
+        self.yolo.detect.reset_mock()
+
+        detections = self.cascade.detect_skills(make_frame(True, True))
+
+        self.yolo.detect.assert_not_called()
+        self.assertEqual([d['name'] for d in detections], ['frostbolt_ready', 'icelance_ready'])
+        self.assertEqual(detections[1]['box'], [40, 0, 72, 32])
+        self.assertEqual(self.cascade.get_stats(), {'ticks': 3, 'template_hits': 1, 'fallbacks': 2})
+
+    def test_periodic_revalidation_runs_yolo(self):
+        cascade = CascadeDetector(self.yolo, SLOTS, {'revalidate_every': 2, 'cache_size': 0})
+        self.yolo.detect.return_value = yolo_result('ready', 'ready')
+        for _ in range(4):
+            cascade.detect_skills(make_frame(True, True))
+        # 第一次（没有模板）和第 2、4 次（复核）调用了 YOLO
+        self.assertEqual(self.yolo.detect.call_count, 3)
+
+    def test_cache_only_reclassifies_changed_slot(self):
+        """测试哈希缓存命中的槽位不再分类，只有变化的槽位需要重新分类。"""
+        cascade = CascadeDetector(self.yolo, SLOTS, {'revalidate_every': 0, 'cache_size': 16})
+        self.yolo.detect.return_value = yolo_result('ready', 'ready')
+        cascade.detect_skills(make_frame(True, True))
+        self.yolo.detect.reset_mock()
+
+        # 画面不变：两个槽位都命中缓存
+        cascade.detect_skills(make_frame(True, True))
+        self.assertEqual(cascade.cache.hits, 2)
+        self.yolo.detect.assert_not_called()
+
+        # icelance 进入冷却：只有它未命中，且因没有冷却模板而回退到 YOLO
+        self.yolo.detect.return_value = yolo_result('ready', 'cooldown')
+        detections = cascade.detect_skills(make_frame(True, False))
+        self.assertEqual(cascade.cache.hits, 3)
+        self.assertEqual(cascade.cache.misses, 3)
+        self.assertEqual([d['name'] for d in detections], ['frostbolt_ready', 'icelance_cooldown'])
+
+
+class TestDetectionCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = DetectionCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get_stats(), {'cache_hits': 2, 'cache_misses': 1, 'cache_size': 2})
+
+    def test_hash_distinguishes_darkened_icon(self):
+        """测试整体变暗的图标（冷却）与原图标的哈希不同。"""
+        thumbs = np.stack([make_frame(True, True)[:16, :16], make_frame(False, True)[:16, :16]])
+        first, second = perceptual_hashes(thumbs)
+        self.assertNotEqual(first, second)
+
+if __name__ == '__main__':
+    unittest.main()
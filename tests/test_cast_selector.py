@@ -0,0 +1,76 @@
+import os
+import queue
+import tempfile
+import unittest
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.cast_selector import CastSelector
+from src.engine.strategy_manager import StrategyManager
+from src.utils.detections import SkillClassTable, make_detections
+
+CLASS_TABLE = SkillClassTable(['frozen_orb_ready', 'frozen_orb_cooldown', 'ice_lance_ready', 'ice_lance_cooldown'])
+
+STRATEGY = """
+name: {name}
+global_cooldown: 1.5
+cooldowns:
+  frozen_orb: 60
+aoe_priority:
+  - name: ice_lance
+    key: '2'
+single_target_priority:
+  - name: frozen_orb
+    key: '1'
+"""
+
+
+class TestCastSelector(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.strategy_manager = StrategyManager(queue.Queue(), CLASS_TABLE, load_initial=False)
+        self.strategy_manager.load_strategy(self._write_strategy('first'))
+        self.selector = CastSelector(CLASS_TABLE, self.strategy_manager)
+        self.scheduler = self.selector.scheduler
+        # 单体优先级中只有 frozen_orb，它在 0 秒被按下，之后一直在冷却
+        self.selector.sync_strategy()
+        self.selector.commit('frozen_orb', 0.0)
+        self.assertEqual(self.selector.select('single_target', 2.0, self._cooldowns(), 2.0), (None, None))
+        self.assertGreater(self.scheduler.wake_at, 2.0)
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+        os.rmdir(self.tmp_dir)
+
+    def _write_strategy(self, name):
+        path = os.path.join(self.tmp_dir, f'{name}.yaml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(STRATEGY.format(name=name))
+        return path
+
+    def _cooldowns(self):
+        return make_detections([1, 3], [0.9, 0.9], [[0, 0, 10, 10], [10, 0, 20, 10]])
+
+    def test_deferral_is_capped(self):
+        """测试 frozen_orb 预计 60 秒后才转好，但采样最多推迟 max_defer。"""
+        self.assertAlmostEqual(self.scheduler.wake_at, 2.0 + self.scheduler.max_defer)
+
+    def test_mode_change_cancels_deferral(self):
+        self.selector.sync('aoe')
+        self.assertEqual(self.scheduler.wake_at, 0.0)
+
+    def test_strategy_change_cancels_deferral(self):
+        self.strategy_manager.load_strategy(self._write_strategy('second'))
+        self.selector.sync('single_target')
+        self.assertEqual(self.scheduler.wake_at, 0.0)
+
+    def test_unchanged_mode_and_strategy_keep_deferral(self):
+        wake_at = self.scheduler.wake_at
+        self.selector.sync('single_target')
+        self.assertEqual(self.scheduler.wake_at, wake_at)
+
+if __name__ == '__main__':
+    unittest.main()
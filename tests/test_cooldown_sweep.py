@@ -0,0 +1,76 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.engine.cooldown_sweep import CooldownSweepEstimator
+from src.utils.detections import SkillClassTable, make_detections
+
+CLASS_TABLE = SkillClassTable(['frozen_orb_ready', 'frozen_orb_cooldown', 'ice_lance_ready', 'ice_lance_cooldown'])
+
+
+def sweep_icon(remaining, size=48):
+    """生成一个剩余冷却比例为 remaining 的图标：从 12 点顺时针，最后 remaining 部分被压暗。"""
+    rng = np.random.default_rng(0)
+    icon = rng.integers(150, 250, (size, size, 3), dtype=np.uint8)
+    ys, xs = np.mgrid[0:size, 0:size] + 0.5 - size / 2
+    # 以 12 点为 0、顺时针递增的角度比例 [0, 1)
+    angle = (np.arctan2(xs, -ys) / (2 * np.pi)) % 1.0
+    icon[angle >= 1.0 - remaining] //= 3
+    return icon
+
+
+class TestCooldownSweepEstimator(unittest.TestCase):
+
+    def setUp(self):
+        self.estimator = CooldownSweepEstimator(CLASS_TABLE, angles=36)
+
+    def test_estimates_remaining_fraction(self):
+        """测试多个图标的剩余比例被一次性估计出来，误差不超过一个采样方向。"""
+        remaining = [0.1, 0.25, 0.5, 0.8]
+        frame = np.concatenate([sweep_icon(r) for r in remaining], axis=1)
+        boxes = [[48 * i, 0, 48 * (i + 1), 48] for i in range(len(remaining))]
+
+        estimate = self.estimator.remaining_fraction(frame, boxes)
+
+        np.testing.assert_allclose(estimate, remaining, atol=1 / 36)
+
+    def test_uniform_icon_is_unknown(self):
+        frame = np.full((48, 48, 3), 60, dtype=np.uint8)
+        self.assertTrue(np.isnan(self.estimator.remaining_fraction(frame, [[0, 0, 48, 48]])[0]))
+
+    def test_annotate_only_cooldown_skills_with_known_duration(self):
+        """测试只为配置了冷却时长的冷却中技能填写 eta_ms。"""
+        self.estimator.set_cooldowns({'frozen_orb': 60, 'unknown_spell': 10})
+        frame = np.concatenate([sweep_icon(0.5), sweep_icon(0.5), sweep_icon(0.0)], axis=1)
+        detections = make_detections([1, 3, 0], [0.9] * 3, [[0, 0, 48, 48], [48, 0, 96, 48], [96, 0, 144, 48]])
+
+        self.estimator.annotate(frame, detections)
+
+        self.assertAlmostEqual(float(detections['eta_ms'][0]), 30000, delta=60000 / 36)
+        self.assertTrue(np.isnan(detections['eta_ms'][1:]).all())
+        etas = CLASS_TABLE.skill_etas(detections)
+        self.assertEqual(etas[CLASS_TABLE.skill_id('frozen_orb')], 0.0)  # 同时检测到可用的图标
+        self.assertEqual(etas[CLASS_TABLE.skill_id('ice_lance')], np.inf)
+
+    def test_gcd_sweep_is_not_scaled_by_spell_cooldown(self):
+        """测试 GCD 期间长冷却技能上的 GCD 转圈按 GCD 剩余时间处理，明显更长的转圈仍然可信。"""
+        self.estimator.set_cooldowns({'frozen_orb': 60}, global_cooldown=1.5)
+        frame = np.concatenate([sweep_icon(0.1), sweep_icon(0.5)], axis=1)
+        detections = make_detections([1, 1], [0.9] * 2, [[0, 0, 48, 48], [48, 0, 96, 48]])
+
+        # GCD 还剩 0.15 秒，即 10%
+        self.estimator.annotate(frame, detections, now=100.0, gcd_end=100.15)
+
+        self.assertAlmostEqual(float(detections['eta_ms'][0]), 150, delta=1)
+        self.assertAlmostEqual(float(detections['eta_ms'][1]), 30000, delta=60000 / 36)
+
+        # GCD 结束后同样的转圈按技能冷却时长换算
+        self.estimator.annotate(frame, detections, now=100.2, gcd_end=100.15)
+        self.assertAlmostEqual(float(detections['eta_ms'][0]), 6000, delta=60000 / 36)
+
+if __name__ == '__main__':
+    unittest.main()
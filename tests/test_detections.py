@@ -0,0 +1,50 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.utils.detections import (
+    STATE_COOLDOWN, STATE_READY, STATE_UNKNOWN, SkillClassTable, make_detections, split_label
+)
+
+NAMES = {0: 'frostbolt_ready', 1: 'frostbolt_cooldown', 2: 'icelance_ready', 3: 'icy_veins'}
+
+
+class TestSkillClassTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = SkillClassTable(NAMES)
+        self.detections = make_detections([1, 2, 0], [0.9, 0.8, 0.7], [[0, 0, 10, 10], [20, 0, 30, 10], [0, 0, 10, 10]])
+
+    def test_split_label(self):
+        self.assertEqual(split_label('frost_nova_cooldown'), ('frost_nova', STATE_COOLDOWN))
+        self.assertEqual(split_label('icy_veins'), ('icy_veins', STATE_UNKNOWN))
+
+    def test_class_ids_map_to_skills_and_states(self):
+        self.assertEqual(self.table.skill_names, ['frostbolt', 'icelance', 'icy_veins'])
+        self.assertEqual(self.table.skill_ids.tolist(), [0, 0, 1, 2])
+        self.assertEqual(self.table.states.tolist(), [STATE_READY, STATE_COOLDOWN, STATE_READY, STATE_UNKNOWN])
+        self.assertEqual(self.table.class_id(self.table.skill_id('icelance'), STATE_READY), 2)
+        self.assertEqual(self.table.skill_id('blizzard'), -1)
+
+    def test_ready_skills_mask(self):
+        """测试只有 *_ready 类别会把对应技能标记为可用。"""
+        self.assertEqual(self.table.ready_skills(self.detections).tolist(), [True, True, False])
+        self.assertFalse(self.table.ready_skills(self.detections[:1]).any())
+
+    def test_to_dicts_adapter(self):
+        dicts = self.table.to_dicts(self.detections[:1])
+        self.assertEqual(dicts[0]['name'], 'frostbolt_cooldown')
+        self.assertEqual(dicts[0]['box'], [0, 0, 10, 10])
+        self.assertAlmostEqual(dicts[0]['confidence'], 0.9, places=5)
+        self.assertEqual(self.table.labels_of(self.detections), ['frostbolt_cooldown', 'icelance_ready', 'frostbolt_ready'])
+
+    def test_make_detections_truncates_boxes(self):
+        detections = make_detections(np.array([0]), np.array([0.5]), np.array([[1.7, 2.2, 30.9, 40.0]]))
+        self.assertEqual(detections['box'].tolist(), [[1, 2, 30, 40]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.implementations.exported_detector import ExportedYoloDetector, non_max_suppression
+
+class FakeExportedDetector(ExportedYoloDetector):
+    """输入固定为 64x64、输出预先设定好的假后端"""
+
+    def __init__(self, predictions, **kwargs):
+        self.predictions = predictions
+        super().__init__('fake.onnx', **kwargs)
+
+    def _load(self, model_path):
+        return {0: 'frostbolt_ready', 1: 'frostbolt_cooldown'}
+
+    def _model_input_shape(self):
+        return (64, 64)
+
+    def _bind(self, input_tensor, output_shape):
+        self.bound_input = input_tensor
+        return np.empty(output_shape, dtype=np.float32)
+
+    def _infer(self):
+        self._output[...] = self.predictions
+
+
+class TestExportedDetector(unittest.TestCase):
+
+    def setUp(self):
+        # 64x64 输入对应 8*8 + 4*4 + 2*2 = 84 个锚点
+        self.predictions = np.zeros((1, 6, 84), dtype=np.float32)
+        self.predictions[0, :5, 5] = [32, 32, 20, 20, 0.9]
+        self.predictions[0, :5, 6] = [33, 32, 20, 20, 0.8]  # 与上一个框重叠，应被 NMS 去掉
+        self.predictions[0, :4, 7] = [10, 20, 8, 8]
+        self.predictions[0, 5, 7] = 0.7
+        self.predictions[0, 4, 8] = 0.1  # 低于置信度阈值
+
+    def test_detect_skills_decodes_and_undoes_letterbox(self):
+        """测试输出被解码、经过 NMS，并且坐标还原到原始帧上。"""
+        detector = FakeExportedDetector(self.predictions)
+        frame = np.zeros((128, 256, 3), dtype=np.uint8)
+
+        detections = detector.detect_skills(frame)
+
+        self.assertEqual([d['name'] for d in detections], ['frostbolt_ready', 'frostbolt_cooldown'])
+        self.assertEqual(detections[0]['box'], [88, 24, 168, 104])
+        self.assertEqual(detections[1]['box'], [24, 0, 56, 32])
+        self.assertAlmostEqual(detections[0]['confidence'], 0.9, places=5)
+
+    def test_input_buffer_is_reused(self):
+        detector = FakeExportedDetector(self.predictions)
+        frame = np.zeros((128, 256, 3), dtype=np.uint8)
+        detector.detect_skills(frame)
+        first = detector.bound_input
+        detector.detect_skills(frame)
+        self.assertIs(detector.bound_input, first)
+        self.assertEqual(first.shape, (1, 3, 64, 64))
+
+    def test_nms_is_per_class(self):
+        """测试不同类别的重叠框不会互相抑制。"""
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [0, 0, 10, 10]], dtype=np.float32)
+        scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+        class_ids = np.array([0, 0, 1])
+        self.assertEqual(non_max_suppression(boxes, scores, class_ids, 0.45).tolist(), [0, 2])
+
+    def test_incomplete_backend_fails_on_creation(self):
+        """测试缺少抽象方法的后端在创建时就报错，而不是在第一次推理时。"""
+        class IncompleteDetector(ExportedYoloDetector):
+            def _load(self, model_path):
+                return {0: 'frostbolt_ready'}
+
+        with self.assertRaises(TypeError):
+            IncompleteDetector('fake.onnx')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.engine.frame_diff_gate import FrameDiffGate
+
+class TestFrameDiffGate(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = FrameDiffGate(threshold=8, downsample=2, block_size=4, max_skip_frames=0)
+        self.frame = np.full((64, 64, 3), 40, dtype=np.uint8)
+
+    def test_first_frame_always_inferred(self):
+        self.assertTrue(self.gate.should_infer(self.frame))
+
+    def test_unchanged_frame_is_skipped(self):
+        """测试画面不变时跳过推理并计入跳过率。"""
+        self.gate.should_infer(self.frame)
+        noisy = self.frame.copy()
+        noisy[::7, ::5] += 3  # 轻微噪声不应触发推理
+
+        self.assertFalse(self.gate.should_infer(noisy))
+        self.assertEqual(self.gate.get_stats(), {'checks': 2, 'skips': 1, 'skip_rate': 0.5})
+
+    def test_local_change_triggers_inference(self):
+        """测试单个技能图标大小的局部变化会触发推理。"""
+        self.gate.should_infer(self.frame)
+        changed = self.frame.copy()
+        changed[8:16, 8:16] = 200
+
+        self.assertTrue(self.gate.should_infer(changed))
+
+    def test_compares_against_last_inferred_frame(self):
+        """测试缓慢累积的变化最终会触发推理。"""
+        self.gate.should_infer(self.frame)
+        frame = self.frame.copy()
+        results = []
+        for _ in range(5):
+            frame[0:16, 0:16] += 4
+            results.append(self.gate.should_infer(frame))
+        self.assertEqual(results, [False, False, True, False, False])
+
+    def test_max_skip_frames_forces_inference(self):
+        gate = FrameDiffGate(max_skip_frames=2)
+        gate.should_infer(self.frame)
+        self.assertEqual([gate.should_infer(self.frame) for _ in range(3)], [False, False, True])
+
+if __name__ == '__main__':
+    unittest.main()
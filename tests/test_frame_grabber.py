@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.utils.frame_ring_buffer import FrameRingBuffer
+from src.engine.frame_grabber import FrameGrabber
+from src.implementations.frame_sources import SyntheticFrameSource, get_frame_source
+
+class TestFrameRingBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = FrameRingBuffer((4, 6, 3), slots=3)
+
+    def _write(self, value, timestamp=0.0):
+        slot, buffer = self.ring.acquire_write_slot()
+        buffer[...] = value
+        self.ring.commit(slot, timestamp)
+        return slot
+
+    def test_read_latest_returns_view_of_newest_frame(self):
+        """测试读取的是最新帧，并且是槽位视图而非副本。"""
+        self._write(1)
+        slot = self._write(2, timestamp=5.0)
+
+        frame = self.ring.read_latest()
+
+        self.assertEqual(frame.seq, 2)
+        self.assertEqual(frame.timestamp, 5.0)
+        self.assertTrue(np.all(frame.image == 2))
+        self.assertTrue(np.shares_memory(frame.image, self.ring.frames[slot]))
+
+    def test_writer_never_overwrites_frame_being_read(self):
+        """测试写者不会覆盖读者正在使用的槽位。"""
+        self._write(7)
+        frame = self.ring.read_latest()
+        for value in range(10):
+            self._write(value)
+        self.assertTrue(np.all(frame.image == 7), "读者占用的帧被覆盖了")
+
+    def test_read_latest_times_out_without_new_frame(self):
+        """测试没有新帧时 read_latest 超时返回 None。"""
+        self._write(1)
+        frame = self.ring.read_latest()
+        self.assertIsNone(self.ring.read_latest(after_seq=frame.seq, timeout=0.01))
+
+    def test_requires_three_slots(self):
+        with self.assertRaises(ValueError):
+            FrameRingBuffer((4, 6, 3), slots=2)
+
+
+class TestFrameGrabber(unittest.TestCase):
+
+    def test_grabber_fills_ring_from_synthetic_source(self):
+        """测试采集线程能从合成帧来源持续写入环形缓冲区。"""
+        source = SyntheticFrameSource({'width': 32, 'height': 16, 'hold_frames': 1})
+        grabber = FrameGrabber(source, MagicMock(), slots=3)
+        grabber.start()
+        try:
+            first = grabber.get_latest_frame(timeout=1)
+            self.assertIsNotNone(first)
+            self.assertEqual(first.image.shape, (16, 32, 3))
+            grabber.release_frame()
+            second = grabber.get_latest_frame(after_seq=first.seq, timeout=1)
+            self.assertGreater(second.seq, first.seq)
+            grabber.release_frame()
+        finally:
+            grabber.stop()
+        self.assertFalse(grabber.is_alive())
+
+    def test_unsupported_source_type(self):
+        with self.assertRaises(ValueError):
+            get_frame_source({'frame_source': {'type': 'unknown'}})
+
+if __name__ == '__main__':
+    unittest.main()
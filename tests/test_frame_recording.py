@@ -0,0 +1,79 @@
+import unittest
+import tempfile
+import time
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.utils.frame_recording import FrameRecorder, FrameRecording
+from src.implementations.frame_sources import ReplayFrameSource
+
+class TestFrameRecording(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'session.wowcap')
+        with FrameRecorder(self.path, (8, 12, 3), max_frames=100) as recorder:
+            for i in range(5):
+                recorder.write(np.full((8, 12, 3), i, dtype=np.uint8), 10.0 + i * 0.02)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """测试录像文件写入后可以按原样读回，且文件被截断到实际帧数。"""
+        recording = FrameRecording(self.path)
+
+        self.assertEqual(len(recording), 5)
+        self.assertEqual(recording.frame_shape, (8, 12, 3))
+        self.assertTrue(np.all(recording.frames[3] == 3))
+        np.testing.assert_allclose(recording.timestamps, [10.0, 10.02, 10.04, 10.06, 10.08])
+        self.assertEqual(os.path.getsize(self.path), 64 + 5 * 8 * 12 * 3 + 5 * 8)
+
+    def test_file_grows_in_chunks(self):
+        """测试文件随写入的帧按块扩大，而不是按 max_frames 预先分配，且不超过 max_frames。"""
+        path = os.path.join(self.tmp_dir.name, 'chunks.wowcap')
+        frame_bytes = 8 * 12 * 3
+        with FrameRecorder(path, (8, 12, 3), max_frames=10, chunk_frames=4) as recorder:
+            self.assertEqual(os.path.getsize(path), 64)
+            for i in range(5):
+                recorder.write(np.full((8, 12, 3), i, dtype=np.uint8), float(i))
+            self.assertEqual(os.path.getsize(path), 64 + 8 * frame_bytes)
+            written = [recorder.write(np.zeros((8, 12, 3), dtype=np.uint8), 5.0 + i) for i in range(6)]
+            self.assertEqual(written, [True] * 5 + [False])
+            self.assertEqual(os.path.getsize(path), 64 + 10 * frame_bytes)
+
+        recording = FrameRecording(path)
+        self.assertEqual(len(recording), 10)
+        self.assertEqual([int(frame[0, 0, 0]) for frame in recording.frames[:5]], [0, 1, 2, 3, 4])
+        np.testing.assert_allclose(recording.timestamps, np.arange(10.0))
+
+    def test_replay_as_fast_as_possible_is_lockstep(self):
+        """测试 speed=0 时逐帧回放，且 loop=False 时播放完毕即停止。"""
+        source = ReplayFrameSource({'path': self.path, 'speed': 0, 'loop': False})
+        out = np.empty(source.get_frame_shape(), dtype=np.uint8)
+
+        self.assertTrue(source.lockstep)
+        values = []
+        while source.read_into(out):
+            values.append(int(out[0, 0, 0]))
+        self.assertEqual(values, [0, 1, 2, 3, 4])
+
+    def test_replay_real_time_respects_timestamps(self):
+        """测试按 2 倍速回放时帧间隔约为录制间隔的一半。"""
+        source = ReplayFrameSource({'path': self.path, 'speed': 2.0, 'loop': False})
+        out = np.empty(source.get_frame_shape(), dtype=np.uint8)
+
+        started = time.perf_counter()
+        while source.read_into(out):
+            pass
+        elapsed = time.perf_counter() - started
+
+        self.assertFalse(source.lockstep)
+        self.assertGreaterEqual(elapsed, 0.04)
+
+if __name__ == '__main__':
+    unittest.main()
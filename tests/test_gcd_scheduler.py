@@ -0,0 +1,53 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.gcd_scheduler import GcdScheduler
+
+class TestGcdScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = GcdScheduler(1.5, {'idle_poll_ms': 50, 'dense_poll_ms': 10, 'window_ms': 200, 'spell_queue_ms': 100})
+
+    def test_first_cast_is_sent_immediately(self):
+        self.assertTrue(self.scheduler.can_decide(10.0))
+        self.assertEqual(self.scheduler.schedule_cast(10.0), 10.0)
+        self.assertAlmostEqual(self.scheduler.gcd_end, 11.5)
+
+    def test_sampling_sleeps_until_window_then_polls_densely(self):
+        """测试 GCD 中直接睡到窗口开始，窗口内按 dense_poll 采样，GCD 结束后按 idle_poll 采样。"""
+        self.scheduler.schedule_cast(10.0)
+        self.assertAlmostEqual(self.scheduler.next_sample_time(10.1), 11.3)
+        self.assertFalse(self.scheduler.can_decide(10.1))
+
+        self.scheduler.on_sample(11.3)
+        self.assertAlmostEqual(self.scheduler.next_sample_time(11.3), 11.31)
+        self.assertTrue(self.scheduler.can_decide(11.3))
+
+        self.scheduler.on_sample(11.6)
+        self.assertAlmostEqual(self.scheduler.next_sample_time(11.6), 11.65)
+
+    def test_next_cast_is_sent_at_spell_queue_window(self):
+        """测试在窗口内做出的决策，按键被安排在法术队列窗口开始时，新的 GCD 从当前 GCD 结束时算起。"""
+        self.scheduler.schedule_cast(10.0)
+        self.assertAlmostEqual(self.scheduler.schedule_cast(11.32), 11.4)
+        self.assertAlmostEqual(self.scheduler.gcd_end, 13.0)
+
+    def test_window_covers_spell_queue(self):
+        scheduler = GcdScheduler(1.0, {'window_ms': 50, 'spell_queue_ms': 300})
+        self.assertAlmostEqual(scheduler.window, 0.3)
+
+    def test_deferral_is_capped(self):
+        """测试根据冷却预测推迟采样最多推迟 max_defer，clear_deferral 后恢复按 idle_poll 采样。"""
+        scheduler = GcdScheduler(1.5, {'idle_poll_ms': 50, 'window_ms': 200, 'max_defer_ms': 1000})
+        scheduler.on_sample(10.0)
+        scheduler.defer_until(70.0, 10.0)
+        self.assertAlmostEqual(scheduler.next_sample_time(10.0), 10.8)
+
+        scheduler.clear_deferral()
+        self.assertAlmostEqual(scheduler.next_sample_time(10.0), 10.05)
+
+if __name__ == '__main__':
+    unittest.main()
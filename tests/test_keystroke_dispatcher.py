@@ -0,0 +1,102 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.keystroke_dispatcher import KeystrokeDispatcher, parse_keybind, sequence_steps, PRESS, RELEASE
+from src.utils.precise_timer import sleep_until
+from tests.helpers import wait_until
+
+
+class RecordingSender:
+    """记录每次按下和释放的时刻。"""
+
+    def __init__(self):
+        self.events = []
+
+    def press_key(self, key):
+        self.events.append((PRESS, key, time.perf_counter()))
+
+    def release_key(self, key):
+        self.events.append((RELEASE, key, time.perf_counter()))
+
+
+class TestPreciseTimer(unittest.TestCase):
+
+    def test_sleep_until_is_not_early_and_can_be_interrupted(self):
+        deadline = time.perf_counter() + 0.02
+        self.assertTrue(sleep_until(deadline))
+        self.assertGreaterEqual(time.perf_counter(), deadline)
+
+        interrupt = threading.Event()
+        threading.Timer(0.02, interrupt.set).start()
+        started = time.perf_counter()
+        self.assertFalse(sleep_until(started + 5, interrupt=interrupt))
+        self.assertLess(time.perf_counter() - started, 1)
+
+
+class TestKeystrokeDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.sender = RecordingSender()
+        self.dispatcher = KeystrokeDispatcher(self.sender, MagicMock(), hold=0.02, max_pending=4)
+        self.dispatcher.start()
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def test_parse_keybind(self):
+        self.assertEqual(parse_keybind("shift+1"), ['shift', '1'])
+        self.assertEqual(parse_keybind("+"), ['+'])
+        self.assertEqual(parse_keybind("f"), ['f'])
+
+    def test_send_key_waits_for_send_at_and_holds(self):
+        """测试按键在 send_at 之后按下，按住 hold 后释放，submit 不阻塞调用者。"""
+        send_at = time.perf_counter() + 0.03
+        started = time.perf_counter()
+        self.dispatcher.send_key("1", send_at)
+        self.assertLess(time.perf_counter() - started, 0.01)
+
+        self.assertTrue(wait_until(lambda: len(self.sender.events) == 2))
+        (press, key, pressed_at), (release, _, released_at) = self.sender.events
+        self.assertEqual((press, key, release), (PRESS, '1', RELEASE))
+        self.assertGreaterEqual(pressed_at, send_at)
+        self.assertGreaterEqual(released_at - pressed_at, 0.0195)
+
+        stats = self.dispatcher.get_stats()
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['press_ms']['count'], 1)
+        self.assertGreaterEqual(stats['press_ms']['p50'], 20.0)
+
+    def test_chord_and_sequence_are_one_job(self):
+        self.dispatcher.send_key("shift+2")
+        self.dispatcher.send_sequence(["3", "4"], gap=0.005)
+        self.assertTrue(wait_until(lambda: self.dispatcher.completed == 2))
+        self.assertEqual([(action, key) for action, key, _ in self.sender.events], [
+            (PRESS, 'shift'), (PRESS, '2'), (RELEASE, '2'), (RELEASE, 'shift'),
+            (PRESS, '3'), (RELEASE, '3'), (PRESS, '4'), (RELEASE, '4'),
+        ])
+        self.assertEqual(self.dispatcher.get_stats()['keys'], 4)
+
+    def test_cancel_releases_held_keys(self):
+        """测试 cancel() 中止正在按住的按键并丢弃排队的任务，不会卡键。"""
+        self.dispatcher.submit([(0.0, PRESS, 'a'), (5.0, RELEASE, 'a')])
+        self.dispatcher.send_key("b", time.perf_counter() + 5)
+        self.assertTrue(wait_until(lambda: len(self.sender.events) == 1))
+        self.dispatcher.cancel()
+        self.assertTrue(wait_until(lambda: len(self.sender.events) == 2))
+        time.sleep(0.05)
+        self.assertEqual([(action, key) for action, key, _ in self.sender.events], [(PRESS, 'a'), (RELEASE, 'a')])
+        self.assertEqual(self.dispatcher.get_stats()['cancelled'], 2)
+
+    def test_sequence_steps_offsets(self):
+        steps = sequence_steps(["1", "2"], hold=0.05, gap=0.01)
+        self.assertEqual([round(offset, 6) for offset, _, _ in steps], [0.0, 0.05, 0.06, 0.11])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import subprocess
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestGetKeystrokeSender(unittest.TestCase):
+
+    def test_null_sender_does_not_import_pynput(self):
+        """测试选择 null 按键模拟器时不导入 pynput（基准测试机器上可以没有输入后端）。"""
+        code = (
+            "import sys\n"
+            "from src.implementations.keystroke_senders import get_keystroke_sender\n"
+            "sender = get_keystroke_sender({'keystroke_sender': {'type': 'null'}})\n"
+            "sender.press_key('1'); sender.release_key('1')\n"
+            "print(type(sender).__name__, 'pynput' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "NullKeystrokeSender False")
+
+    def test_unknown_type(self):
+        from src.implementations.keystroke_senders import get_keystroke_sender
+        with self.assertRaises(ValueError):
+            get_keystroke_sender({'keystroke_sender': {'type': 'unknown'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.utils.latency_histogram import LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_within_one_percent(self):
+        """测试各分位数与精确值的相对误差小于 1%。"""
+        rng = np.random.default_rng(0)
+        samples = rng.lognormal(mean=np.log(0.02), sigma=0.8, size=20000)
+        histogram = LatencyHistogram()
+        for value in samples:
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, len(samples))
+        for q in (50, 95, 99, 99.9):
+            expected = np.percentile(samples, q, method='inverted_cdf')
+            self.assertAlmostEqual(histogram.percentile(q), expected, delta=expected * 0.01 + 1e-6)
+        self.assertAlmostEqual(histogram.percentile(100), samples.max())
+
+    def test_small_values_are_exact_and_large_values_clamped(self):
+        histogram = LatencyHistogram(highest_seconds=1.0)
+        for micros in (3, 3, 7, 200):
+            histogram.record(micros / 1e6)
+        self.assertEqual(histogram.percentile(50), 3e-6)
+        self.assertEqual(histogram.percentile(100), 200e-6)
+
+        histogram.record(5.0)
+        self.assertEqual(histogram.count, 5)
+        self.assertLessEqual(histogram.percentile(100), 5.0)
+
+    def test_summary_and_reset(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.summary()['count'], 0)
+        histogram.record(0.010)
+        histogram.record(0.030)
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 2)
+        self.assertAlmostEqual(summary['mean'], 20.0)
+        self.assertAlmostEqual(summary['max'], 30.0)
+        self.assertEqual(set(summary), {'count', 'mean', 'p50', 'p95', 'p99', 'max'})
+
+        histogram.reset()
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(histogram.percentile(99), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
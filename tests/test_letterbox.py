@@ -0,0 +1,61 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from src.utils.letterbox import LetterboxPreprocessor, normalize_imgsz
+
+
+def reference_letterbox(frame, input_shape):
+    """逐步分配中间数组的朴素实现，作为对照"""
+    height, width = input_shape
+    scale = min(height / frame.shape[0], width / frame.shape[1])
+    new_w, new_h = round(frame.shape[1] * scale), round(frame.shape[0] * scale)
+    left, top = (width - new_w) // 2, (height - new_h) // 2
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    tensor = np.full((1, 3, height, width), 114 / 255.0, dtype=np.float32)
+    tensor[0, :, top:top + new_h, left:left + new_w] = resized[..., ::-1].transpose(2, 0, 1) / 255.0
+    return tensor, (scale, left, top)
+
+
+class TestLetterboxPreprocessor(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (90, 160, 3), dtype=np.uint8) for _ in range(2)]
+
+    def test_matches_reference(self):
+        preprocessor = LetterboxPreprocessor((64, 64))
+        for frame in self.frames:
+            expected, params = reference_letterbox(frame, (64, 64))
+            self.assertEqual(preprocessor(frame), params)
+            np.testing.assert_allclose(preprocessor.tensor, expected, atol=1e-6)
+
+    def test_tensor_is_reused_across_frames(self):
+        """测试常驻张量在帧之间复用，填充区域保持不变。"""
+        preprocessor = LetterboxPreprocessor((64, 64))
+        tensor = preprocessor.tensor
+        preprocessor(self.frames[0])
+        preprocessor(self.frames[1])
+        self.assertIs(preprocessor.tensor, tensor)
+        # 160x90 缩放到 64x36，上下各填充 14 行
+        np.testing.assert_allclose(tensor[0, :, :14], 114 / 255.0)
+        np.testing.assert_allclose(tensor[0, :, 50:], 114 / 255.0)
+
+    def test_frame_already_at_input_size_skips_resize(self):
+        frame = self.frames[0][:64, :64]
+        preprocessor = LetterboxPreprocessor((64, 64))
+        self.assertEqual(preprocessor(frame), (1.0, 0, 0))
+        np.testing.assert_allclose(preprocessor.tensor[0, 0], frame[..., 2] / 255.0, atol=1e-6)
+
+    def test_normalize_imgsz(self):
+        self.assertEqual(normalize_imgsz(None), (640, 640))
+        self.assertEqual(normalize_imgsz(320), (320, 320))
+        self.assertEqual(normalize_imgsz([192, 640]), (192, 640))
+
+if __name__ == '__main__':
+    unittest.main()
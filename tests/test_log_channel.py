@@ -0,0 +1,72 @@
+import queue
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.log_channel import DEBUG, ERROR, INFO, WARNING, LogChannel, LogEvent, level_of, to_event
+
+
+class TestLogChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = queue.Queue()
+
+    def test_messages_are_sent_in_batches(self):
+        channel = LogChannel(self.queue, flush_interval=60)
+        for i in range(3):
+            channel.put(f"施放 {i}")
+        self.assertTrue(self.queue.empty())
+
+        channel.flush()
+        batch = self.queue.get_nowait()
+        self.assertEqual([event.message for event in batch], ["施放 0", "施放 1", "施放 2"])
+        self.assertTrue(self.queue.empty())
+        channel.flush()
+        self.assertTrue(self.queue.empty(), "空缓冲区不应发送")
+
+    def test_events_below_level_are_dropped(self):
+        channel = LogChannel(self.queue, level='warning', flush_interval=60)
+        channel.put("模式: SINGLE_TARGET | 施放: frostbolt")
+        channel.log(DEBUG, "细节")
+        channel.put("警告: 策略中有未知技能")
+        channel.flush()
+        self.assertEqual([event.level for event in self.queue.get_nowait()], [WARNING])
+        self.assertEqual(channel.dropped, 2)
+
+    def test_structured_events_flush_immediately(self):
+        channel = LogChannel(self.queue, level='error', flush_interval=60)
+        channel.put("已加载策略")
+        channel.put({"type": "debug_step", "spell": "frostbolt", "keybind": "1"})
+        batch = self.queue.get_nowait()
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch[0].data['spell'], "frostbolt")
+
+    def test_full_buffer_and_close_flush(self):
+        channel = LogChannel(self.queue, flush_interval=60, max_batch=2).start()
+        for i in range(3):
+            channel.put(str(i))
+        self.assertEqual(len(self.queue.get_nowait()), 2)
+        channel.close()
+        self.assertEqual([event.message for event in self.queue.get_nowait()], ["2"])
+
+    def test_background_flush(self):
+        channel = LogChannel(self.queue, flush_interval=0.01).start()
+        try:
+            channel.put("引擎已启动")
+            self.assertEqual(self.queue.get(timeout=2)[0].message, "引擎已启动")
+        finally:
+            channel.close()
+
+    def test_levels_of_legacy_messages(self):
+        self.assertEqual(level_of("错误: 无法加载配置"), ERROR)
+        self.assertEqual(level_of("流水线阶段 Inference 发生错误: boom"), ERROR)
+        self.assertEqual(level_of("警告: 未找到策略"), WARNING)
+        self.assertEqual(level_of("已加载策略: Frost"), INFO)
+        event = LogEvent(0.0, DEBUG, "x")
+        self.assertIs(to_event(event), event)
+
+
+if __name__ == '__main__':
+    unittest.main()
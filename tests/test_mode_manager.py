@@ -54,7 +54,7 @@ class TestModeManager(unittest.TestCase):
         self.mode_manager.on_key_press(mock_key)
 
         self.assertEqual(self.mode_manager.current_mode, ModeManager.MODE_AOE)
-        self.log_queue.put.assert_called_with("切换到AOE模式")
+        self.assertEqual(self.log_queue.put.call_args[0][0].message, "切换到AOE模式")
 
     def test_switch_to_single_target(self):
         """测试切换到单体模式。"""
@@ -64,7 +64,7 @@ class TestModeManager(unittest.TestCase):
         self.mode_manager.on_key_press(mock_key)
 
         self.assertEqual(self.mode_manager.current_mode, ModeManager.MODE_SINGLE)
-        self.log_queue.put.assert_called_with("切换到单体模式")
+        self.assertEqual(self.log_queue.put.call_args[0][0].message, "切换到单体模式")
 
     def test_switch_to_stop(self):
         """测试切换到停止模式。"""
@@ -77,7 +77,7 @@ class TestModeManager(unittest.TestCase):
         self.mode_manager.on_key_press(mock_key)
 
         self.assertEqual(self.mode_manager.current_mode, ModeManager.MODE_STOP)
-        self.log_queue.put.assert_called_with("停止自动释放技能")
+        self.assertEqual(self.log_queue.put.call_args[0][0].message, "停止自动释放技能")
 
     def test_unassigned_key(self):
         """测试按下未分配的按键时，模式不应改变。"""
@@ -92,5 +92,14 @@ class TestModeManager(unittest.TestCase):
         self.assertEqual(self.mode_manager.current_mode, initial_mode)
         self.assertEqual(self.log_queue.put.call_count, initial_log_count)
 
+    def test_set_mode(self):
+        """测试通过 set_mode 切换模式（引擎的 mode 指令），无效的模式不改变状态。"""
+        self.assertTrue(self.mode_manager.set_mode(ModeManager.MODE_SINGLE))
+        self.assertEqual(self.mode_manager.current_mode, ModeManager.MODE_SINGLE)
+        self.assertEqual(self.log_queue.put.call_args[0][0].message, "切换到单体模式")
+
+        self.assertFalse(self.mode_manager.set_mode("burst"))
+        self.assertEqual(self.mode_manager.current_mode, ModeManager.MODE_SINGLE)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import queue
+import threading
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.pipeline import PipelineStage
+from src.utils.drop_queue import DropOldestQueue
+from src.utils.log_channel import ERROR
+
+class TestDropOldestQueue(unittest.TestCase):
+
+    def test_put_drops_oldest_when_full(self):
+        q = DropOldestQueue(maxsize=2)
+        self.assertFalse(q.put(1))
+        self.assertFalse(q.put(2))
+        self.assertTrue(q.put(3))
+
+        self.assertEqual([q.get(), q.get()], [2, 3])
+        self.assertEqual(q.get_stats(), {'put': 3, 'dropped': 1})
+
+    def test_get_times_out(self):
+        with self.assertRaises(queue.Empty):
+            DropOldestQueue().get(timeout=0.01)
+
+    def test_get_wakes_up_on_put(self):
+        q = DropOldestQueue()
+        threading.Timer(0.05, q.put, args=('frame',)).start()
+        self.assertEqual(q.get(timeout=2), 'frame')
+
+
+class TestPipelineStage(unittest.TestCase):
+
+    def test_stages_pass_results_downstream(self):
+        """测试源阶段和处理阶段串联，None 结果不会被传给下游。"""
+        stop_event = threading.Event()
+        counter = iter(range(1, 1000))
+        middle, output = DropOldestQueue(maxsize=100), DropOldestQueue(maxsize=100)
+
+        def produce():
+            value = next(counter)
+            return value if value <= 5 else None
+
+        stages = [
+            PipelineStage("Source", produce, stop_event, queue.Queue(), output_queue=middle),
+            PipelineStage("Square", lambda v: v * v, stop_event, queue.Queue(), input_queue=middle, output_queue=output),
+        ]
+        for stage in stages:
+            stage.start()
+        results = [output.get(timeout=2) for _ in range(5)]
+        stop_event.set()
+        for stage in stages:
+            stage.join(timeout=2)
+
+        self.assertEqual(results, [1, 4, 9, 16, 25])
+        self.assertEqual(stages[1].processed, 5)
+
+    def test_errors_are_logged_and_stage_keeps_running(self):
+        stop_event = threading.Event()
+        log_queue = queue.Queue()
+        source = DropOldestQueue(maxsize=4)
+        stage = PipelineStage("Broken", lambda item: 1 / item, stop_event, log_queue, input_queue=source)
+        stage.start()
+        source.put(0)
+        message = log_queue.get(timeout=2)
+        stop_event.set()
+        stage.join(timeout=2)
+        self.assertIn("Broken", message.message)
+        self.assertEqual(message.level, ERROR)
+
+if __name__ == '__main__':
+    unittest.main()
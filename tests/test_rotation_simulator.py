@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.engine.rotation_simulator import (
+    RecordedDetections, RotationSimulator, Scenario, SyntheticCooldownModel, load_strategy_manager,
+    simulate_strategy, strategy_class_table,
+)
+from src.utils.detection_stream import DetectionStream, save_detection_stream
+
+STRATEGY = """
+name: Sim
+global_cooldown: 1.0
+cooldowns:
+  big: 10
+single_target_priority:
+  - name: big
+    key: '1'
+  - name: filler
+    key: '2'
+"""
+
+
+class TestRotationSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'sim.yaml')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(STRATEGY)
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, name))
+        os.rmdir(self.tmp_dir)
+
+    def test_synthetic_cooldowns_drive_the_priority_list(self):
+        result = simulate_strategy(self.path, Scenario('test', duration=60.0))
+
+        # 每个 GCD 施放一次，没有空闲；big 每 10 秒一次，其余是 filler
+        self.assertEqual(result['total_casts'], 60)
+        self.assertEqual(result['casts']['big'], 6)
+        self.assertEqual(result['rejected'], {})
+        self.assertLess(result['idle_gcds'], 0.1)
+        # 只在需要决策的帧上采样
+        self.assertLess(result['decisions'], 60 * 60 / 4)
+
+    def test_missed_detections_cost_time_but_not_invalid_casts(self):
+        clean = simulate_strategy(self.path, Scenario('clean', duration=60.0, miss_rate=0.0))
+        noisy = simulate_strategy(self.path, Scenario('noisy', duration=60.0, miss_rate=0.5, seed=3))
+        self.assertGreaterEqual(noisy['idle_gcds'], clean['idle_gcds'])
+        self.assertEqual(noisy['rejected'].get('cooldown', 0), 0)
+
+    def test_synthetic_model_reports_cooldowns(self):
+        class_table = strategy_class_table({'single_target_priority': [{'name': 'big'}], 'cooldowns': {'big': 10}})
+        model = SyntheticCooldownModel(class_table, {'big': 10}, cooldown_sweep=True)
+        self.assertTrue(model.press(0, 1.0))
+        self.assertFalse(model.press(0, 5.0))
+        detections = model.detections(6.0)
+        self.assertEqual(class_table.labels_of(detections), ['big_cooldown'])
+        self.assertAlmostEqual(float(detections['eta_ms'][0]), 5000.0)
+
+    def test_replays_recorded_detections(self):
+        class_table = strategy_class_table({'single_target_priority': [{'name': 'big'}, {'name': 'filler'}]})
+        model = SyntheticCooldownModel(class_table, {})
+        timestamps = 100.0 + np.arange(0, 10, 1 / 30)
+        stream_path = os.path.join(self.tmp_dir, 'stream.npz')
+        save_detection_stream(stream_path, class_table.labels, timestamps, [model.detections(0) for _ in timestamps])
+
+        stream = DetectionStream(stream_path)
+        self.assertEqual(len(stream), len(timestamps))
+        source = RecordedDetections(stream)
+        strategy_manager = load_strategy_manager(self.path, source.class_table)
+        result = RotationSimulator(strategy_manager, source.class_table, source, Scenario('replay', duration=stream.duration)).run()
+        self.assertEqual(result['casts'], {'big': 10})
+
+    def test_load_strategy_manager_ignores_config(self):
+        """测试模拟时不读取当前目录的 config.yaml，也不加载其中配置的策略。"""
+        class_table = strategy_class_table({'single_target_priority': [{'name': 'big'}, {'name': 'filler'}]})
+        with patch('src.engine.strategy_manager.ConfigManager') as config_manager:
+            strategy_manager = load_strategy_manager(self.path, class_table)
+        config_manager.assert_not_called()
+        self.assertEqual(strategy_manager.strategy_path, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+# It's better to add src to python path than using relative imports in tests
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.engine.rule_conditions import compile_condition
+from src.engine.strategy_compiler import compile_strategy, mask_to_bits
+from src.utils.detections import SkillClassTable
+
+SKILLS = {'a': 1, 'b': 2, 'c': 4}
+
+
+def skill_bit(name):
+    return SKILLS.get(name, 0)
+
+
+class TestRuleConditions(unittest.TestCase):
+
+    def test_atoms_use_their_own_mask(self):
+        self.assertTrue(compile_condition("ready(a)", skill_bit)(1, 0, 0))
+        self.assertFalse(compile_condition("ready(a)", skill_bit)(0, 1, 1))
+        self.assertTrue(compile_condition("cooldown(b)", skill_bit)(0, 2, 0))
+        self.assertTrue(compile_condition("detected(c)", skill_bit)(0, 0, 4))
+
+    def test_precedence_and_parentheses(self):
+        # not > and > or
+        condition = compile_condition("ready(a) or ready(b) and not ready(c)", skill_bit)
+        self.assertTrue(condition(1, 0, 0))
+        self.assertTrue(condition(2, 0, 0))
+        self.assertFalse(condition(6, 0, 0))
+        grouped = compile_condition("(ready(a) or ready(b)) and not ready(c)", skill_bit)
+        self.assertFalse(grouped(5, 0, 0))
+        self.assertTrue(grouped(1, 0, 0))
+
+    def test_constants_and_unknown_skill(self):
+        self.assertTrue(compile_condition("true", skill_bit)(0, 0, 0))
+        self.assertFalse(compile_condition("false or ready(missing)", skill_bit)(7, 7, 7))
+        self.assertTrue(compile_condition("not detected(missing)", skill_bit)(7, 7, 7))
+
+    def test_syntax_errors(self):
+        for text in ("ready(a", "ready(a) and", "ready()", "foo(a)", "ready(a) ready(b)", "ready(a) + 1", "__import__"):
+            with self.assertRaises(ValueError, msg=text):
+                compile_condition(text, skill_bit)
+
+
+class TestConditionalPriority(unittest.TestCase):
+
+    def setUp(self):
+        self.class_table = SkillClassTable([
+            'pillar_ready', 'pillar_cooldown', 'erw_ready', 'erw_cooldown', 'obliterate_ready', 'rime',
+        ])
+
+    def bits(self, *names):
+        mask = np.zeros(len(self.class_table.skill_names), dtype=bool)
+        mask[[self.class_table.skill_id(name) for name in names]] = True
+        return mask_to_bits(mask)
+
+    def test_pick_skips_spells_whose_condition_fails(self):
+        compiled = compile_strategy({'single_target_priority': [
+            {'name': 'erw', 'key': '5', 'condition': 'cooldown(pillar)'},
+            {'name': 'obliterate', 'key': '3', 'condition': 'not detected(rime)'},
+            {'name': 'pillar', 'key': '6'},
+        ]}, self.class_table)
+        self.assertTrue(compiled.has_conditions)
+        ready = self.bits('erw', 'obliterate', 'pillar')
+        self.assertEqual(compiled.pick('single_target', ready), ('obliterate', '3'))
+        self.assertEqual(compiled.pick('single_target', ready, detected_bits=self.bits('rime')), ('pillar', '6'))
+        self.assertEqual(
+            compiled.pick('single_target', self.bits('erw', 'obliterate'), cooldown_bits=self.bits('pillar')),
+            ('erw', '5')
+        )
+
+    def test_invalid_condition_names_the_spell(self):
+        with self.assertRaisesRegex(ValueError, 'erw'):
+            compile_strategy({'single_target_priority': [
+                {'name': 'erw', 'key': '5', 'condition': 'cooldown(pillar'},
+            ]}, self.class_table)
+
+    def test_unknown_skill_in_condition_is_reported(self):
+        compiled = compile_strategy({'single_target_priority': [
+            {'name': 'erw', 'key': '5', 'condition': 'not detected(killing_machine)'},
+        ]}, self.class_table)
+        self.assertEqual(compiled.unknown_spells, ['killing_machine'])
+        self.assertEqual(compiled.pick('single_target', self.bits('erw')), ('erw', '5'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import multiprocessing
+import threading
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.utils.detections import make_detections
+from src.utils.shared_detection_slot import SharedDetectionSlot
+
+
+def frame_detections(frame_seq, count=3):
+    # 每个检测框的 class_id 都等于帧号，读到混合了两帧的数据时可以发现
+    return make_detections(np.full(count, frame_seq), np.ones(count), np.zeros((count, 4)))
+
+
+def _publish_in_child(slot, frames):
+    slot.set_labels(['frostbolt_ready', 'frostbolt_cooldown'])
+    for frame_seq in range(1, frames + 1):
+        slot.publish(frame_seq, float(frame_seq), frame_detections(0))
+
+
+class TestSharedDetectionSlot(unittest.TestCase):
+
+    def test_read_returns_only_newer_values(self):
+        slot = SharedDetectionSlot(capacity=4)
+        self.assertIsNone(slot.read())
+        slot.publish(1, 0.5, frame_detections(1))
+        slot.publish(2, 0.6, frame_detections(2, count=10))
+
+        snapshot = slot.read()
+        self.assertEqual((snapshot.frame_seq, snapshot.timestamp), (2, 0.6))
+        # 超出容量的检测框被截断
+        self.assertEqual(snapshot.detections['class_id'].tolist(), [2, 2, 2, 2])
+        self.assertIsNone(slot.read(snapshot.version))
+
+    def test_labels(self):
+        slot = SharedDetectionSlot()
+        slot.set_labels(['a_ready', 'b_ready'])
+        slot.publish(1, 0.0, make_detections([1, 0, 5], np.ones(3), np.zeros((3, 4))))
+        self.assertEqual(slot.labels_of(slot.read().detections), ['b_ready', 'a_ready', '5'])
+        with self.assertRaises(ValueError):
+            SharedDetectionSlot(labels_capacity=4).set_labels(['frostbolt_ready'])
+
+    def test_reader_never_sees_torn_writes(self):
+        slot = SharedDetectionSlot(capacity=64)
+        stop = threading.Event()
+
+        def write():
+            frame_seq = 0
+            while not stop.is_set():
+                frame_seq += 1
+                slot.publish(frame_seq, float(frame_seq), frame_detections(frame_seq, count=64))
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            version = 0
+            for _ in range(2000):
+                snapshot = slot.read(version)
+                if snapshot is None:
+                    continue
+                version = snapshot.version
+                self.assertTrue((snapshot.detections['class_id'] == snapshot.frame_seq).all())
+        finally:
+            stop.set()
+            writer.join()
+
+    def test_shared_with_child_process(self):
+        slot = SharedDetectionSlot()
+        process = multiprocessing.get_context('spawn').Process(target=_publish_in_child, args=(slot, 5))
+        process.start()
+        process.join(timeout=30)
+
+        snapshot = slot.read()
+        self.assertEqual(snapshot.frame_seq, 5)
+        self.assertEqual(slot.labels_of(snapshot.detections), ['frostbolt_ready'] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
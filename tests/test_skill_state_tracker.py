@@ -0,0 +1,74 @@
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.engine.skill_state_tracker import SkillStateTracker
+from src.utils.detections import STATE_COOLDOWN, STATE_READY, SkillClassTable, make_detections
+
+CLASS_TABLE = SkillClassTable(['frozen_orb_ready', 'frozen_orb_cooldown', 'ice_lance_ready', 'ice_lance_cooldown'])
+FROZEN_ORB, ICE_LANCE = CLASS_TABLE.skill_id('frozen_orb'), CLASS_TABLE.skill_id('ice_lance')
+
+
+def frame(*labels):
+    class_ids = [CLASS_TABLE.labels.index(label) for label in labels]
+    return make_detections(class_ids, [0.9] * len(labels), [[0, 0, 10, 10]] * len(labels))
+
+
+class TestSkillStateTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = SkillStateTracker(CLASS_TABLE, smoothing=0.5, cast_window=1.0, min_cooldown=2.0)
+
+    def test_learns_cooldown_from_cast_to_ready(self):
+        """测试冷却从按键时刻开始计算，转好时学到冷却时长，并据此预测下一次。"""
+        self.tracker.observe(0.0, frame('frozen_orb_ready'))
+        self.tracker.on_cast(FROZEN_ORB, 0.5)
+        self.tracker.observe(0.6, frame('frozen_orb_cooldown'))
+        self.tracker.observe(10.5, frame('frozen_orb_ready'))
+
+        self.assertAlmostEqual(self.tracker.cooldown_of(FROZEN_ORB), 10.0)
+        self.assertEqual(
+            [(t.old_state, t.new_state) for t in self.tracker.transitions],
+            [(-1, STATE_READY), (STATE_READY, STATE_COOLDOWN), (STATE_COOLDOWN, STATE_READY)]
+        )
+
+        self.tracker.on_cast(FROZEN_ORB, 20.0)
+        self.tracker.observe(20.1, frame('frozen_orb_cooldown'))
+        self.assertAlmostEqual(self.tracker.predicted_ready[FROZEN_ORB], 30.0)
+
+        # 第二次观测到 12 秒，平滑后为 11 秒
+        self.tracker.observe(32.0, frame('frozen_orb_ready'))
+        self.assertAlmostEqual(self.tracker.cooldown_of(FROZEN_ORB), 11.0)
+
+    def test_short_gcd_sweep_is_not_learned(self):
+        self.tracker.observe(0.0, frame('ice_lance_ready'))
+        self.tracker.observe(0.1, frame('ice_lance_cooldown'))
+        self.tracker.observe(1.6, frame('ice_lance_ready'))
+        self.assertTrue(np.isnan(self.tracker.cooldown_of(ICE_LANCE)))
+
+    def test_next_interesting_time(self):
+        """测试所有技能都能预测时返回最早转好的时刻，否则返回 None。"""
+        self.tracker.set_prior_cooldowns({'frozen_orb': 60, 'ice_lance': 8})
+        self.tracker.observe(0.0, frame('frozen_orb_ready', 'ice_lance_ready'))
+        self.tracker.on_cast(FROZEN_ORB, 0.0)
+        self.tracker.on_cast(ICE_LANCE, 1.5)
+        self.tracker.observe(1.6, frame('frozen_orb_cooldown', 'ice_lance_cooldown'))
+
+        self.assertAlmostEqual(self.tracker.next_interesting_time([FROZEN_ORB, ICE_LANCE]), 9.5)
+        unseen = SkillStateTracker(CLASS_TABLE)
+        self.assertIsNone(unseen.next_interesting_time([FROZEN_ORB, ICE_LANCE]))
+
+    def test_eta_overrides_learned_prediction(self):
+        self.tracker.set_prior_cooldowns({'frozen_orb': 60})
+        detections = frame('frozen_orb_cooldown')
+        detections['eta_ms'] = 2500
+        self.tracker.observe(10.0, detections)
+        self.assertAlmostEqual(self.tracker.predicted_ready[FROZEN_ORB], 12.5)
+        self.assertEqual(self.tracker.state[FROZEN_ORB], STATE_COOLDOWN)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,13 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import numpy as np
+
+from src.engine.strategy_compiler import compile_strategy, mask_to_bits
 from src.engine.strategy_manager import StrategyManager
 from src.utils.config_manager import ConfigManager
+from src.utils.detections import SkillClassTable
+from src.utils.log_channel import ERROR, INFO, WARNING
 
 class TestStrategyManager(unittest.TestCase):
 
@@ -35,13 +40,15 @@ class TestStrategyManager(unittest.TestCase):
         self.assertIsNotNone(strategy_manager.current_strategy, "当前策略不应为空")
         self.assertEqual(strategy_manager.current_strategy['name'], "Test Strategy", "策略名称不匹配")
         self.assertEqual(strategy_manager.global_cooldown, 1.2, "全局冷却时间不匹配")
+        self.assertEqual(strategy_manager.scheduler_config, {'window_ms': 200}, "调度配置不匹配")
         self.assertTrue(self.log_queue.qsize() > 0, "应有日志消息")
 
         # 验证日志消息
         log_message = self.log_queue.get()
-        self.assertIn("已加载策略: Test Strategy", log_message)
+        self.assertIn("已加载策略: Test Strategy", log_message.message)
+        self.assertEqual(log_message.level, INFO)
         log_message = self.log_queue.get()
-        self.assertIn("全局冷却时间设置为: 1.2秒", log_message)
+        self.assertIn("全局冷却时间设置为: 1.2秒", log_message.message)
 
     @patch('src.engine.strategy_manager.ConfigManager')
     def test_load_nonexistent_strategy(self, MockConfigManager):
@@ -60,7 +67,64 @@ class TestStrategyManager(unittest.TestCase):
 
         # 验证警告日志
         log_message = self.log_queue.get()
-        self.assertIn("警告: 未在 config.yaml 中找到有效策略路径", log_message)
+        self.assertIn("警告: 未在 config.yaml 中找到有效策略路径", log_message.message)
+        self.assertEqual(log_message.level, WARNING)
+
+    @patch('src.engine.strategy_manager.ConfigManager')
+    def test_load_compiles_and_reports_unknown_spells(self, MockConfigManager):
+        """测试加载策略时按模型类别编译，并报告模型中不存在的技能。"""
+        mock_config = {'current_strategy': 'strategies/test_strategy.yaml'}
+        mock_config_instance = MockConfigManager.return_value
+        mock_config_instance.get_config.return_value = mock_config
+        mock_config_instance.get.side_effect = mock_config.get
+        class_table = SkillClassTable(['frostbolt_ready', 'frostbolt_cooldown'])
+
+        strategy_manager = StrategyManager(self.log_queue, class_table)
+
+        self.assertEqual(strategy_manager.compiled.unknown_spells, ['blizzard'])
+        messages = [self.log_queue.get(timeout=1) for _ in range(3)]
+        self.assertIn("blizzard", messages[-1].message)
+        self.assertEqual(messages[-1].level, WARNING)
+        self.assertEqual(strategy_manager.compiled.pick('single_target', mask_to_bits(np.array([True]))), ('frostbolt', 'frostbolt'))
+        self.assertEqual(strategy_manager.compiled.pick('aoe', mask_to_bits(np.array([True]))), (None, None))
+
+    def test_load_failure_is_logged_as_error(self):
+        """测试加载失败以 ERROR 级别记录（消息中没有 “错误” 字样，不能靠字符串推断级别）。"""
+        strategy_manager = StrategyManager(self.log_queue, load_initial=False)
+
+        self.assertFalse(strategy_manager.load_strategy('strategies/nonexistent_strategy.yaml'))
+
+        log_message = self.log_queue.get(timeout=1)
+        self.assertIn("加载策略", log_message.message)
+        self.assertEqual(log_message.level, ERROR)
+
+
+class TestStrategyCompiler(unittest.TestCase):
+
+    def setUp(self):
+        self.class_table = SkillClassTable(['frostbolt_ready', 'ice_lance_ready', 'ice_lance_cooldown', 'frozen_orb_ready'])
+        self.strategy = {
+            'bindings': {'frozen_orb': '2'},
+            'single_target_priority': [
+                {'name': 'frozen_orb', 'key': 'frozen_orb'},
+                {'name': 'ice_lance', 'key': '3'},
+                {'name': 'frostbolt', 'key': '1'},
+            ],
+        }
+
+    def test_pick_follows_priority_order(self):
+        compiled = compile_strategy(self.strategy, self.class_table)
+        ready = np.array([True, True, False])  # frostbolt, ice_lance 可用
+        self.assertEqual(compiled.pick('single_target', mask_to_bits(ready)), ('ice_lance', '3'))
+        ready = np.array([True, True, True])
+        self.assertEqual(compiled.pick('single_target', mask_to_bits(ready)), ('frozen_orb', '2'))
+        self.assertEqual(compiled.pick('single_target', 0), (None, None))
+        self.assertEqual(compiled.skill_ids('single_target').tolist(), [2, 1, 0])
+
+    def test_mask_to_bits(self):
+        mask = np.zeros(70, dtype=bool)
+        mask[[0, 3, 69]] = True
+        self.assertEqual(mask_to_bits(mask), (1 << 0) | (1 << 3) | (1 << 69))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.engine.strategy_manager import StrategyManager
+from src.engine.strategy_reloader import StrategyReloader
+from src.utils.detections import SkillClassTable
+from src.utils.log_channel import ERROR
+from tests.helpers import wait_until
+
+STRATEGY = """
+name: {name}
+global_cooldown: 1.0
+single_target_priority:
+  - name: frostbolt
+    key: '1'
+"""
+
+
+class TestStrategyReloader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'strategy.yaml')
+        self.write(STRATEGY.format(name='Old'))
+        self.log_queue = queue.Queue()
+        with patch('src.engine.strategy_manager.ConfigManager') as MockConfigManager:
+            MockConfigManager.return_value.get_config.return_value = {'current_strategy': self.path}
+            self.manager = StrategyManager(self.log_queue, SkillClassTable(['frostbolt_ready']))
+        self.stop_event = threading.Event()
+
+    def tearDown(self):
+        self.stop_event.set()
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, text, mtime_offset=0):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        # 保证修改时间确实变化，不依赖文件系统的时间精度
+        stat = os.stat(self.path)
+        os.utime(self.path, (stat.st_atime, stat.st_mtime + mtime_offset))
+
+    def wait_applied(self, reloader, timeout=2):
+        return wait_until(reloader.apply_pending, timeout, interval=0.01)
+
+    def test_request_reload_swaps_strategy_only_when_applied(self):
+        old = self.manager.compiled
+        reloader = StrategyReloader(self.manager, self.stop_event, self.log_queue, watch_files=False, poll_interval=0.05)
+        reloader.start()
+        self.write(STRATEGY.format(name='New').replace('1.0', '2.0'))
+        reloader.request_reload()
+
+        time.sleep(0.2)
+        # 新策略已经在后台编译好，但在 apply_pending 之前不生效
+        self.assertIs(self.manager.compiled, old)
+        self.assertTrue(self.wait_applied(reloader))
+        self.assertEqual(self.manager.current_strategy['name'], 'New')
+        self.assertEqual(self.manager.global_cooldown, 2.0)
+        self.assertIsNot(self.manager.compiled, old)
+
+    def test_file_change_is_picked_up_by_watcher(self):
+        reloader = StrategyReloader(self.manager, self.stop_event, self.log_queue, poll_interval=0.02)
+        reloader.start()
+        time.sleep(0.1)
+        self.write(STRATEGY.format(name='Edited'), mtime_offset=5)
+
+        self.assertTrue(self.wait_applied(reloader))
+        self.assertEqual(self.manager.current_strategy['name'], 'Edited')
+
+    def test_invalid_strategy_keeps_current_one(self):
+        old = self.manager.compiled
+        reloader = StrategyReloader(self.manager, self.stop_event, self.log_queue, watch_files=False, poll_interval=0.02)
+        reloader.start()
+        self.write(STRATEGY.format(name='Broken') + "    condition: 'ready(frostbolt'\n")
+        reloader.request_reload()
+
+        self.assertFalse(self.wait_applied(reloader, timeout=0.3))
+        self.assertIs(self.manager.compiled, old)
+        messages = []
+        while not self.log_queue.empty():
+            messages.append(self.log_queue.get())
+        failures = [message for message in messages if "热加载策略" in message.message and "失败" in message.message]
+        self.assertTrue(failures)
+        self.assertTrue(all(message.level == ERROR for message in failures))
+
+
+if __name__ == '__main__':
+    unittest.main()
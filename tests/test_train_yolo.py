@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import yaml
+
+from train_yolo import YOLOTrainer, select_calibration_images
+
+
+class TestCalibrationImages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        val_dir = os.path.join(self.tmp_dir, 'dataset', 'images', 'val')
+        os.makedirs(val_dir)
+        for i in range(20):
+            open(os.path.join(val_dir, f"{i:02d}.png"), 'wb').close()
+        open(os.path.join(val_dir, 'notes.txt'), 'w').close()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmp_dir)
+
+    def make_trainer(self, **quantization):
+        config_path = os.path.join(self.tmp_dir, 'config.yaml')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump({'yolo_training': {
+                'output_dir': os.path.join(self.tmp_dir, 'dataset'),
+                'quantization': dict({'calibration_images': 5}, **quantization),
+            }}, f)
+        return YOLOTrainer(config_path)
+
+    def test_selection_is_deterministic(self):
+        """测试同一数据集、同一种子的两次运行选出相同的校准图片。"""
+        first = self.make_trainer(seed=7)._calibration_images()
+        second = self.make_trainer(seed=7)._calibration_images()
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 5)
+        self.assertTrue(all(path.endswith('.png') for path in first))
+        self.assertNotEqual(self.make_trainer(seed=8)._calibration_images(), first)
+
+    def test_selection_does_not_depend_on_listing_order(self):
+        images = [f"img_{i}.png" for i in range(50)]
+        self.assertEqual(select_calibration_images(images, 10, seed=1),
+                         select_calibration_images(list(reversed(images)), 10, seed=1))
+        self.assertEqual(len(select_calibration_images(images[:3], 10)), 3)
+
+    def test_quantization_is_skipped_without_onnx(self):
+        """测试没有安装 onnx 时跳过量化，而不是让训练流水线失败。"""
+        with patch.dict(sys.modules, {'onnx': None}):
+            self.assertIsNone(self.make_trainer().quantize_model(os.path.join(self.tmp_dir, 'best.onnx')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import ctypes
+import unittest
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.implementations.xshm_source import XImage, XShmFrameSource
+
+
+class TestXShmInitializeFailure(unittest.TestCase):
+    """测试初始化中途失败时释放已经取得的 X 连接和 XImage（用假的 Xlib 句柄，不需要 X 服务器）。"""
+
+    def make_libraries(self, image):
+        x11, xext, libc = MagicMock(), MagicMock(), MagicMock()
+        x11.XOpenDisplay.return_value = 1234
+        x11.XDisplayWidth.return_value = 640
+        x11.XDisplayHeight.return_value = 480
+        xext.XShmQueryExtension.return_value = 1
+        xext.XShmCreateImage.return_value = image
+        libc.shmget.return_value = -1
+        return x11, xext, libc
+
+    def create(self, libraries):
+        def bind(source):
+            source.x11, source.xext, source.libc = libraries
+        with patch.object(XShmFrameSource, '_bind_libraries', bind):
+            return XShmFrameSource({}, [0, 0, 64, 32])
+
+    def test_create_image_failure_closes_display(self):
+        x11, xext, libc = libraries = self.make_libraries(None)
+        with self.assertRaises(RuntimeError):
+            self.create(libraries)
+        x11.XCloseDisplay.assert_called_once_with(1234)
+        x11.XDestroyImage.assert_not_called()
+
+    def test_unsupported_format_and_shmget_failure_destroy_image(self):
+        for bits_per_pixel in (24, 32):
+            image = ctypes.pointer(XImage(bits_per_pixel=bits_per_pixel, bytes_per_line=256))
+            x11, xext, libc = libraries = self.make_libraries(image)
+            with self.assertRaises(RuntimeError):
+                self.create(libraries)
+            x11.XDestroyImage.assert_called_once_with(image)
+            x11.XCloseDisplay.assert_called_once_with(1234)
+            xext.XShmDetach.assert_not_called()
+            libc.shmdt.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()